@@ -2,94 +2,130 @@
 # GEIH5_fixed.py
 # Streamlit dashboard: CASOS LABORATORIO & ACTUACIONES DE CAMPO
 # Run with: streamlit run GEIH5_fixed.py
-# Requires: pip install streamlit pandas plotly unidecode
+# Requires: pip install streamlit pandas plotly
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from unidecode import unidecode
-import re
+
+from geih.agregados import bandera, conteos_por_grupo
+from geih.carga import cargar
+from geih.categorias import categoria
+from geih.componentes import iniciar_perfil, mostrar_perfil
+from geih.cubo import Cubo
+from geih.dialecto import leer_csv_detectado
+from geih.esquema import ESQUEMA
+from geih.geo import IndiceGeo, figura_puntos
+from geih.indicadores import conteo_marcas, marcas_patrones, por_quinquenio, reagrupar
+from geih.mapacalor import figura_mapa_calor
+from geih.perfil import contar_cache, seccion
 
 st.set_page_config(page_title="Tablero de Control V2", page_icon="🧭", layout="wide")
 
+# Opt-in profiling (?perfil=1 or GEIH_PERFIL=1): per-section timings in the sidebar
+perfil = iniciar_perfil("GEIH5")
+
 # ------------------------ Utils ------------------------
-@st.cache_data(show_spinner=False)
-def load_csv(url: str) -> pd.DataFrame:
+# Identifies reader + normalization in the on-disk cache; bump it when
+# read_csv_any, geih.esquema or categorizar change.
+CACHE_TAG = "GEIH5.load_csv/esquema-v5"
+
+def read_csv_any(url: str) -> pd.DataFrame:
+    """Fetch once, sniff BOM/encoding/separator, parse once (geih.dialecto)."""
     try:
-        df = pd.read_csv(url)
-        return df
+        return leer_csv_detectado(url)
     except Exception:
-        # Fallback common encodings
-        for enc in ("utf-8-sig", "latin1", "cp1252"):
-            try:
-                return pd.read_csv(url, encoding=enc)
-            except Exception:
-                continue
-    return pd.DataFrame()
-
-def norm_cols(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize column names: strip, upper, remove accents, collapse spaces."""
-    df = df.copy()
-    mapping = {}
-    for c in df.columns:
-        cc = unidecode(str(c)).upper().strip()
-        cc = re.sub(r"\s+", " ", cc)
-        mapping[c] = cc
-    df.rename(columns=mapping, inplace=True)
-    return df
-
-def get_col(df: pd.DataFrame, candidates):
-    """Return first matching column by normalized name from candidates (list of strings)."""
-    if df.empty:
-        return None
-    norm = {unidecode(c).upper().strip(): c for c in df.columns}
-    for cand in candidates:
-        key = unidecode(cand).upper().strip()
-        if key in norm:
-            return norm[key]
-    # Partial contains match
-    for key, original in norm.items():
-        for cand in candidates:
-            if key.find(unidecode(cand).upper().strip()) != -1:
-                return original
-    return None
-
-def to_top10(s: pd.Series) -> pd.Series:
-    vc = s.fillna("SIN DATO").astype(str).value_counts()
-    return vc.head(10)
+        return pd.DataFrame()
+
+@contar_cache("load_csv", st.cache_data(show_spinner=False))
+def load_csv(url: str) -> pd.DataFrame:
+    """Load and normalize a CSV, served from the on-disk cache when unchanged.
+    Remote URLs are read from the local mirror (data/espejo), revalidated
+    with a conditional GET once its TTL expires. Files above
+    geih.ingesta.UMBRAL_TROZOS are read in chunks, keeping only the columns
+    some schema field can resolve (see Esquema.conservar, geih.carga).
+    Column names come out normalized and mapped to the schema's field names."""
+    return cargar(url, ESQUEMA.nombres, CACHE_TAG, conservar=ESQUEMA.conservar, leer=read_csv_any)
+
+@st.cache_data(show_spinner=False)
+def municipality_counts(df: pd.DataFrame, col_muni, col_estado, col_entregado, col_sirdec) -> pd.DataFrame:
+    """Rows, analyzed and delivered per municipality in one grouped pass, sorted by rows."""
+    flags = {
+        "ANALIZADOS": bandera(df[col_estado], r"\bANALIZADO\b") if col_estado else np.zeros(len(df), dtype=bool),
+        "ENTREGADOS": np.zeros(len(df), dtype=bool),
+    }
+    if col_entregado and col_entregado in df.columns:
+        flags["ENTREGADOS"] = bandera(df[col_entregado], "SI|ENTREG")
+    elif col_sirdec and col_sirdec in df.columns:
+        flags["ENTREGADOS"] = bandera(df[col_sirdec], "ENTREG")
+    return conteos_por_grupo(df[col_muni], flags, nombre="MUNICIPIO EXHUMACION")
+
+@st.cache_data(show_spinner=False)
+def case_flags(df: pd.DataFrame, col_caso) -> dict:
+    """CIH / GEIH / GIH row flags over the case id column, computed once per load."""
+    return marcas_patrones(df[col_caso], {"CIH": "CIH", "GEIH": "GEIH", "GIH": "GIH"})
+
+@st.cache_data(show_spinner=False)
+def year_periods(df: pd.DataFrame, col_anio) -> pd.DataFrame:
+    """Counts per 5-year period (PERIODO, CANTIDAD) from the per-year counts; missing years go to SIN DATO."""
+    return por_quinquenio(df[col_anio].value_counts(dropna=False))
+
+@st.cache_resource(show_spinner=False)
+def geo_index() -> IndiceGeo:
+    """Repaired (DEPARTAMENTO, MUNICIPIO) -> float32 coordinates, built once per process."""
+    return IndiceGeo.desde_archivos()
+
+@st.cache_resource(show_spinner=False)
+def summary_cube(df: pd.DataFrame, dims, measures=()) -> Cubo:
+    """Pre-aggregated counts over the cleaned categorical dims; charts slice it instead of the rows."""
+    dims = [c for c in dims if c]
+    data = pd.DataFrame({c: categoria(df[c]) for c in dims}, index=df.index)
+    for m in measures:
+        if m:
+            data[m] = df[m]
+    return Cubo(data, dims, [m for m in measures if m])
 
 # ------------------------ Data ------------------------
 URL_LAB = "https://github.com/adrianamarcelahdz-cmd/Tablero-de-Control-V2/raw/refs/heads/main/Labmedellin5.csv"
 URL_EXH = "https://github.com/adrianamarcelahdz-cmd/Tablero-de-Control-V2/raw/refs/heads/main/exhmed.csv"
 
+# load_csv already returns normalized column names (geih.esquema)
+seccion("load")
 lab = load_csv(URL_LAB)
 exh = load_csv(URL_EXH)
 
-lab = norm_cols(lab)
-exh = norm_cols(exh)
-
-# Likely column names (normalized, without accents)
-COL_CASO_LIMS = get_col(lab, ["CASO LIMS", "CASO_LIMS", "CASO", "CASO LIMS ID"])
-COL_NOMBRE = get_col(lab, ["NOMBRE OCCISO", "NOMBRE DEL OCCISO", "NOMBRE"])
-COL_MUNI_EXH = get_col(lab, ["MUNICIPIO DE EXHUMACION", "MUNICIPIO EXHUMACION", "MUNICIPIO DE EXHUMACIÓN"])
-COL_ANTRO = get_col(lab, ["ANTROPOLOGO", "ANTROPOLOGO(A)", "ANTROPOLOGA", "ANTROPOLOGO RESPONSABLE"])
-COL_MED = get_col(lab, ["MEDICO", "MEDICO(A)", "MEDICA"])
-COL_ODON = get_col(lab, ["ODONTOLOGO", "ODONTOLOGO(A)", "ODONTOLOGA"])
-COL_SIRDEC = get_col(lab, ["SIRDEC"])
-COL_ESTADO = get_col(lab, ["ESTADO"])
-COL_LEY = get_col(lab, ["LEY"])
+# Dashboard columns from the schema: the field's exact column, else the first
+# one containing a synonym. Each header is resolved once (cached by fingerprint).
+seccion("columns & cubes")
+lab_cols = ESQUEMA.resolver(lab.columns)
+exh_cols = ESQUEMA.resolver(exh.columns)
+COL_CASO_LIMS = lab_cols.columna("CASO LIMS", parcial=True)
+COL_NOMBRE = lab_cols.columna("NOMBRE OCCISO", parcial=True)
+COL_MUNI_EXH = lab_cols.columna("MUNICIPIO EXHUMACION", parcial=True)
+COL_ANTRO = lab_cols.columna("ANTROPOLOGO", parcial=True)
+COL_MED = lab_cols.columna("MEDICO", parcial=True)
+COL_ODON = lab_cols.columna("ODONTOLOGO", parcial=True)
+COL_SIRDEC = lab_cols.columna("SIRDEC", parcial=True)
+COL_ESTADO = lab_cols.columna("ESTADO", parcial=True)
+COL_LEY = lab_cols.columna("LEY", parcial=True)
 
 # Possible delivered indicator columns (best effort)
-COL_ENTREGADO = get_col(lab, ["ENTREGADO", "ENTREGADOS", "ENTREGA", "ENTREGAS"])
+COL_ENTREGADO = lab_cols.columna("ENTREGADOS", parcial=True)
 
 # EXH columns
-COL_ASUNTO = get_col(exh, ["ASUNTO DE LA DILIGENCIA", "ASUNTO", "ASUNTO DILIGENCIA"])
-COL_CUERPOS = get_col(exh, ["CUERPOS", "CANTIDAD DE CUERPOS", "NO. CUERPOS", "NRO CUERPOS"])
-COL_ANIO = get_col(exh, ["AÑO", "ANO", "ANIO", "ANNO", "ANIO DILIGENCIA"])
-COL_TIPO_INH = get_col(exh, ["TIPO INHUMACION", "TIPO DE INHUMACION", "TIPO_INHUMACION"])
-COL_ZONA = get_col(exh, ["ZONA", "ZONA DE LA DILIGENCIA"])
-COL_MUNI_DIL = get_col(exh, ["MUNICIPIO DE LA DILIGENCIA", "MUNICIPIO", "MUNICIPIO DILIGENCIA"])
-COL_DEPTO = get_col(exh, ["DEPARTAMENTO", "DEPTO", "DEPARTAMENTO DE LA DILIGENCIA"])
+COL_ASUNTO = exh_cols.columna("ASUNTO DE LA DILIGENCIA", parcial=True)
+COL_CUERPOS = exh_cols.columna("CUERPOS", parcial=True)
+COL_ANIO = exh_cols.columna("AÑO", parcial=True)
+COL_TIPO_INH = exh_cols.columna("TIPO INHUMACION", parcial=True)
+COL_ZONA = exh_cols.columna("ZONA", parcial=True)
+COL_MUNI_DIL = exh_cols.columna("MUNICIPIO DE LA DILIGENCIA", parcial=True)
+COL_DEPTO = exh_cols.columna("DEPARTAMENTO", parcial=True)
+
+cube_lab = summary_cube(lab, [COL_ESTADO, COL_LEY])
+cube_exh = summary_cube(exh, [COL_TIPO_INH, COL_ZONA, COL_MUNI_DIL, COL_DEPTO], [COL_CUERPOS])
+
+HEATMAP_VIEWS = {"auto": "Automática", "calor": "Mapa de calor", "treemap": "Treemap", "barras": "Barras"}
 
 st.title("🧭 Tablero de Control V2")
 
@@ -103,19 +139,18 @@ with tabs[0]:
         st.warning("No se pudo cargar Labmedellin5.csv desde la URL indicada.")
     else:
         # ---- Tarjetas CIH/GEIH vs GIH ----
+        seccion("lab/cards")
         col1, col2, col3 = st.columns([1,1,2])
+        flags = case_flags(lab, COL_CASO_LIMS) if COL_CASO_LIMS else {}
         with col1:
             if COL_CASO_LIMS:
-                serie = lab[COL_CASO_LIMS].astype(str).str.upper()
-                count_cih = serie.str.contains("CIH", na=False).sum() + serie.str.contains("GEIH", na=False).sum()
-                st.metric("CIH", value=int(count_cih))
+                count_cih = conteo_marcas(flags["CIH"]) + conteo_marcas(flags["GEIH"])
+                st.metric("CIH", value=count_cih)
             else:
                 st.metric("CIH", value="N/D")
         with col2:
             if COL_CASO_LIMS:
-                serie = lab[COL_CASO_LIMS].astype(str).str.upper()
-                count_gih = serie.str.contains("GIH", na=False).sum()
-                st.metric("BUNKER (GIH)", value=int(count_gih))
+                st.metric("BUNKER (GIH)", value=conteo_marcas(flags["GIH"]))
             else:
                 st.metric("BUNKER (GIH)", value="N/D")
         with col3:
@@ -124,6 +159,7 @@ with tabs[0]:
         st.divider()
 
         # ---- Previsualización de tabla ----
+        seccion("lab/preview table")
         st.markdown("#### Previsualización de casos")
         desired_cols = [COL_CASO_LIMS, COL_NOMBRE, COL_MUNI_EXH, COL_ANTRO, COL_MED, COL_ODON, COL_SIRDEC]
         show_cols = [c for c in desired_cols if c in lab.columns and c is not None]
@@ -136,26 +172,26 @@ with tabs[0]:
         st.divider()
 
         # ---- Tarjetas de ESTADO ----
+        seccion("lab/status cards")
         st.markdown("#### Estado de laboratorio")
         estados_principales = ["ANALIZADO", "PENDIENTE", "PERFILADO", "POSITIVO", "NEGATIVO"]
         otros_estados = {"REMITIDOS", "GENETICA", "NO PERFILO", "CANCELADO", "ND"}
         if COL_ESTADO:
-            estado_ser = lab[COL_ESTADO].fillna("SIN DATO").astype(str).str.upper().str.strip()
+            vc_estado = cube_lab.conteo(COL_ESTADO)
             cols = st.columns(len(estados_principales) + 1)
             for i, est in enumerate(estados_principales):
-                cols[i].metric(est.title(), int((estado_ser == est).sum()))
-            mask_otros = estado_ser.isin(otros_estados)
-            cols[-1].metric("OTROS ESTADOS", int(mask_otros.sum()))
+                cols[i].metric(est.title(), int(vc_estado.get(est, 0)))
+            cols[-1].metric("OTROS ESTADOS", int(vc_estado[vc_estado.index.isin(otros_estados)].sum()))
         else:
             st.info("No se encontró la columna ESTADO en el archivo.")
 
         st.divider()
 
         # ---- Gráfico de barras por LEY ----
+        seccion("lab/ley chart")
         st.markdown("#### Distribución por LEY")
         if COL_LEY:
-            ley_series = lab[COL_LEY].fillna("SIN DATO").astype(str)
-            df_ley = ley_series.value_counts().reset_index(name="CANTIDAD").rename(columns={"index": "LEY"})
+            df_ley = cube_lab.conteo(COL_LEY).rename_axis("LEY").reset_index(name="CANTIDAD")
             fig = px.bar(
                 df_ley, x="LEY", y="CANTIDAD",
                 labels={"LEY":"LEY", "CANTIDAD":"CANTIDAD"},
@@ -168,36 +204,19 @@ with tabs[0]:
 
         st.divider()
 
-        # ---- Top 10 municipios vs Analizados/Entregados ----
-        st.markdown("#### Top 10 Municipios de Exhumación: Analizados vs Entregados")
+        # ---- Municipios vs Analizados/Entregados ----
+        seccion("lab/top municipalities")
+        st.markdown("#### Municipios de Exhumación: Analizados vs Entregados")
         if COL_MUNI_EXH:
-            muni_all = lab[COL_MUNI_EXH].fillna("SIN DATO").astype(str).str.upper().str.strip()
-            top10 = to_top10(muni_all).index.tolist()
-            df_top = lab[muni_all.isin(top10)].copy()
-
-            # Flags
-            analyzed_flag = None
-            if COL_ESTADO:
-                analyzed_flag = df_top[COL_ESTADO].fillna("").astype(str).str.upper().str.contains(r"\bANALIZADO\b")
-
-            delivered_flag = None
-            if COL_ENTREGADO and COL_ENTREGADO in df_top.columns:
-                delivered_flag = df_top[COL_ENTREGADO].fillna("").astype(str).str.upper().str.contains("SI|ENTREG")
-            elif COL_SIRDEC and COL_SIRDEC in df_top.columns:
-                delivered_flag = df_top[COL_SIRDEC].fillna("").astype(str).str.upper().str.contains("ENTREG")
-
-            df_top["_MUNICIPIO_"] = muni_all[muni_all.isin(top10)]
-            agg = []
-            for m in top10:
-                sub = df_top[df_top["_MUNICIPIO_"] == m]
-                anal = int(analyzed_flag[sub.index].sum()) if analyzed_flag is not None else 0
-                entr = int(delivered_flag[sub.index].sum()) if delivered_flag is not None else 0
-                agg.append({"MUNICIPIO EXHUMACION": m, "ANALIZADOS": anal, "ENTREGADOS": entr})
-            df_agg = pd.DataFrame(agg)
-
-            df_long = df_agg.melt(id_vars="MUNICIPIO EXHUMACION", var_name="CATEGORIA", value_name="CANTIDAD")
+            df_agg = municipality_counts(lab, COL_MUNI_EXH, COL_ESTADO, COL_ENTREGADO, COL_SIRDEC)
+            n_top = st.selectbox("Municipios a mostrar", [10, 25, 50, "Todos"], index=0)
+            if n_top != "Todos":
+                df_agg = df_agg.head(n_top)
+            title = "Todos los municipios" if n_top == "Todos" else f"Top {len(df_agg)} Municipios"
+
+            df_long = df_agg.drop(columns="TOTAL").melt(id_vars="MUNICIPIO EXHUMACION", var_name="CATEGORIA", value_name="CANTIDAD")
             fig2 = px.bar(df_long, x="MUNICIPIO EXHUMACION", y="CANTIDAD", color="CATEGORIA",
-                          barmode="group", title="Top 10 Municipios: Analizados vs Entregados")
+                          barmode="group", title=f"{title}: Analizados vs Entregados")
             fig2.update_layout(xaxis_tickangle=-45, height=480)
             st.plotly_chart(fig2, use_container_width=True)
         else:
@@ -211,6 +230,7 @@ with tabs[1]:
         st.warning("No se pudo cargar exhmed.csv desde la URL indicada.")
     else:
         # ---- Tarjetas: ASUNTO & CUERPOS ----
+        seccion("field/cards")
         c1, c2, c3 = st.columns(3)
         with c1:
             if COL_ASUNTO:
@@ -220,7 +240,7 @@ with tabs[1]:
                 st.metric("ASUNTO DE LA DILIGENCIA", "N/D")
         with c2:
             if COL_CUERPOS:
-                total_cuerpos = pd.to_numeric(exh[COL_CUERPOS], errors="coerce").fillna(0).sum()
+                total_cuerpos = cube_exh.total(medida=COL_CUERPOS)
                 st.metric("CANTIDAD DE CUERPOS", int(total_cuerpos))
             else:
                 st.metric("CANTIDAD DE CUERPOS", "N/D")
@@ -230,14 +250,10 @@ with tabs[1]:
         st.divider()
 
         # ---- Barras por AÑO agrupado en quinquenios ----
+        seccion("field/5-year periods")
         st.markdown("#### Casos por período de 5 años")
         if COL_ANIO:
-            anio = pd.to_numeric(exh[COL_ANIO], errors="coerce")
-            quinquenio = (anio // 5) * 5
-            labels = quinquenio.fillna(-1).astype(int).astype(str).replace({"-1":"SIN DATO"})
-            df_q = labels.value_counts().sort_index().reset_index()
-            df_q.columns = ["PERIODO_INICIO", "CANTIDAD"]
-            df_q["PERIODO"] = df_q["PERIODO_INICIO"].apply(lambda x: "SIN DATO" if x == "SIN DATO" else f"{x}-{int(x)+4}")
+            df_q = year_periods(exh, COL_ANIO)
             fig3 = px.bar(df_q, x="PERIODO", y="CANTIDAD", title="Distribución por quinquenios (AÑO)")
             fig3.update_layout(xaxis_tickangle=-30, height=420)
             st.plotly_chart(fig3, use_container_width=True)
@@ -247,10 +263,10 @@ with tabs[1]:
         st.divider()
 
         # ---- Barras TIPO INHUMACION (porcentaje) ----
+        seccion("field/burial type")
         st.markdown("#### Tipo de inhumación (porcentaje)")
         if COL_TIPO_INH:
-            tipo = exh[COL_TIPO_INH].fillna("SIN DATO").astype(str).str.upper().str.strip()
-            vc = tipo.value_counts()
+            vc = cube_exh.conteo(COL_TIPO_INH)
             df_tipo = (vc / vc.sum() * 100).reset_index()
             df_tipo.columns = ["TIPO INHUMACION", "PORCENTAJE"]
             fig4 = px.bar(df_tipo, x="TIPO INHUMACION", y="PORCENTAJE",
@@ -263,17 +279,20 @@ with tabs[1]:
         st.divider()
 
         # ---- Pie chart ZONA con agrupación ----
+        seccion("field/zone")
         st.markdown("#### ZONA (agrupada)")
         if COL_ZONA:
-            zona = exh[COL_ZONA].fillna("SIN DATO").astype(str).str.upper().str.strip()
-            zona = zona.replace({
+            grupos_zona = {
                 "ZONA RURAL":"RURAL",
                 "RURAL":"RURAL",
                 "URBANO":"URBANA",
                 "URBANA":"URBANA",
                 "CEMENTERIO":"CEMENTERIO"
-            })
-            fig5 = px.pie(zona.value_counts().reset_index(name="CANTIDAD").rename(columns={"index":"ZONA"}),
+            }
+            # Group the cube counts, not rows
+            vc_zona = cube_exh.conteo(COL_ZONA)
+            vc_zona = reagrupar(vc_zona, lambda z: grupos_zona.get(z, z))
+            fig5 = px.pie(vc_zona.rename_axis("ZONA").reset_index(name="CANTIDAD"),
                           names="ZONA", values="CANTIDAD",
                           title="Distribución por ZONA (agrupada)")
             st.plotly_chart(fig5, use_container_width=True)
@@ -283,13 +302,39 @@ with tabs[1]:
         st.divider()
 
         # ---- Mapa de calor Municipio vs Departamento ----
+        seccion("field/heatmap")
         st.markdown("#### Mapa de calor: Municipio vs Departamento")
         if COL_MUNI_DIL and COL_DEPTO:
-            muni = exh[COL_MUNI_DIL].fillna("SIN DATO").astype(str).str.upper().str.strip()
-            depto = exh[COL_DEPTO].fillna("SIN DATO").astype(str).str.upper().str.strip()
-            piv = pd.crosstab(muni, depto)
-            fig6 = px.imshow(piv, aspect="auto", title="Heatmap MUNICIPIO DE LA DILIGENCIA x DEPARTAMENTO",
-                             labels=dict(x="DEPARTAMENTO", y="MUNICIPIO", color="CANTIDAD"))
+            # Sparse (municipio, departamento) counts: top-N + OTROS, treemap/bars when too large
+            hm1, hm2 = st.columns(2)
+            n_muni = hm1.selectbox("Municipios en el mapa", [20, 50, 100, "Todos"], index=0)
+            view = hm2.selectbox("Vista", list(HEATMAP_VIEWS), format_func=HEATMAP_VIEWS.get, index=0)
+            fig6 = figura_mapa_calor(
+                cube_exh.conteo([COL_MUNI_DIL, COL_DEPTO]),
+                "Heatmap MUNICIPIO DE LA DILIGENCIA x DEPARTAMENTO",
+                etiquetas=dict(x="DEPARTAMENTO", y="MUNICIPIO", color="CANTIDAD"),
+                max_filas=None if n_muni == "Todos" else n_muni,
+                vista=view,
+            )
             st.plotly_chart(fig6, use_container_width=True)
         else:
             st.info("No se encontraron las columnas MUNICIPIO DE LA DILIGENCIA y/o DEPARTAMENTO.")
+
+        st.divider()
+
+        # ---- Mapa de actuaciones por municipio ----
+        seccion("field/map")
+        st.markdown("#### Mapa de actuaciones por municipio")
+        if COL_MUNI_DIL and COL_DEPTO:
+            # One bubble per municipality (repaired coordinate CSVs), not one marker per row
+            points, unlocated = geo_index().agregar(exh, COL_DEPTO, COL_MUNI_DIL)
+            if points.empty:
+                st.info("No hay actuaciones con coordenadas conocidas.")
+            else:
+                st.plotly_chart(figura_puntos(points, etiqueta="Actuaciones"), use_container_width=True)
+                if unlocated:
+                    st.caption(f"{unlocated} actuaciones sin coordenadas para su municipio/departamento.")
+        else:
+            st.info("No se encontraron las columnas MUNICIPIO DE LA DILIGENCIA y/o DEPARTAMENTO.")
+
+mostrar_perfil(perfil)
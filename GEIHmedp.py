@@ -6,7 +6,6 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import unidecode
 from typing import List
 
 st.set_page_config(page_title="Dashboard Forense", layout="wide")
@@ -15,60 +14,54 @@ st.set_page_config(page_title="Dashboard Forense", layout="wide")
 # Utilidades y Normalización
 # =========================
 
-import os
-
-@st.cache_data
+from geih.agregados import conteos_por_grupo
+from geih.carga import cargar
+from geih.categorias import SIN_DATO, categoria, conteos
+from geih.componentes import iniciar_perfil, mostrar_perfil
+from geih.cubo import Cubo
+from geih.filtros import MotorFiltros
+from geih.geo import IndiceGeo, figura_puntos
+from geih.esquema import COLUMNAS_ESTANDAR, ESQUEMA, SINONIMOS
+from geih.indicadores import (
+    conteo_marcas,
+    marcas_patrones,
+    opciones_filtro,
+    por_quinquenio,
+    reagrupar,
+)
+from geih.mapacalor import conteos_pares, figura_mapa_calor
+from geih.perfil import contar_cache, seccion
+
+# Perfil opcional (?perfil=1 o GEIH_PERFIL=1): tiempos por sección en la barra lateral
+perfil = iniciar_perfil("GEIHmedp")
+
+# Identifica lector + normalización en la caché de disco; cambiarla si
+# cambian leer_csv, geih.esquema o categorizar.
+CACHE_ETIQUETA = "GEIHmedp.cargar_csv/esquema-v4"
+
+def leer_csv(path):
+    """Lee un CSV en utf-8 y, si falla la decodificación, en latin-1."""
+    try:
+        return pd.read_csv(path, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding='latin-1')
+    except Exception:
+        return pd.DataFrame()
+
+@contar_cache("cargar_csv", st.cache_data)
 def cargar_csv(path):
-    """Carga un CSV intentando primero la ruta dada y luego en 'data/'. Devuelve DataFrame vacío si no existe."""
-    # Intenta ruta directa
-    if os.path.exists(path):
-        try:
-            return pd.read_csv(path, encoding='utf-8')
-        except UnicodeDecodeError:
-            return pd.read_csv(path, encoding='latin-1')
-        except Exception:
-            pass
-    # Intenta en carpeta data/
-    data_path = os.path.join('data', path)
-    if os.path.exists(data_path):
-        try:
-            return pd.read_csv(data_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            return pd.read_csv(data_path, encoding='latin-1')
-        except Exception:
-            pass
-    # Si no existe, devuelve DataFrame vacío y muestra advertencia
-    st.warning(f"No se encontró el archivo '{path}' ni en 'data/{path}'.")
-    return pd.DataFrame()
-
-def normalizar_cols(df, mapeo):
-    """Estripa, mayusculiza y elimina tildes de columnas. Renombra usando mapeo."""
-    nuevo_cols = []
-    for col in df.columns:
-        clean = unidecode.unidecode(col.strip().upper())
-        clean = mapeo.get(clean, clean)
-        nuevo_cols.append(clean)
-    df.columns = nuevo_cols
-    return df
-
-def safe_column(df, nombre, fill=None):
-    if nombre not in df.columns:
-        df[nombre] = fill
-    return df
-
-def periodizar_anios(df, col='AÑO'):
-    if col in df.columns:
-        miny = int(df[col].min())
-        maxy = int(df[col].max())
-        bins = list(range((miny//5)*5, ((maxy//5)+2)*5, 5))
-        labels = [f"{b}-{b+4}" for b in bins[:-1]]
-        df['PERIODO_5'] = pd.cut(df[col], bins=bins, labels=labels, right=True, include_lowest=True)
-    else:
-        df['PERIODO_5'] = "No especificado"
+    """Carga un CSV intentando primero la ruta dada y luego en 'data/'. Devuelve DataFrame vacío si no existe.
+    Las columnas salen con los nombres de geih.esquema (un encabezado se resuelve una vez),
+    las de baja cardinalidad como "category", y el resultado se guarda en la caché en disco.
+    Los archivos grandes se leen por trozos conservando solo los campos del esquema (ver geih.carga)."""
+    df = cargar(path, ESQUEMA.nombres, CACHE_ETIQUETA,
+                conservar=COLUMNAS_ESTANDAR.__contains__, esperadas=SINONIMOS.keys(), leer=leer_csv)
+    if df.empty:
+        st.warning(f"No se encontró el archivo '{path}' ni en 'data/{path}'.")
     return df
 
 def agrupar_zona(z):
-    if pd.isna(z): return "No especificado"
+    if pd.isna(z) or z == SIN_DATO: return "No especificado"
     z = z.upper()
     if z in ['RURAL', 'ZONA RURAL']:
         return "RURAL"
@@ -78,59 +71,24 @@ def agrupar_zona(z):
 
 def contar_estado(df, estados: List[str], col='ESTADO'):
     if col not in df.columns: return 0
-    return df[df[col].str.upper().isin([e.upper() for e in estados])].shape[0]
-
-# ==============
-# Diccionario Mapeos
-# ==============
-MAPEO_COLS = {
-    "CASO LIMS":"CASO LIMS",
-    "NOMBRE OCCISO":"NOMBRE OCCISO",
-    "MUNICIPIO DE EXHUMACION": "MUNICIPIO DE EXHUMACIÓN",
-    "MUNICIPIO DE EXHUMACIÓN": "MUNICIPIO DE EXHUMACIÓN",
-    "ANTROPOLOGO":"ANTROPOLOGO",
-    "MEDICO":"MEDICO",
-    "ODONTOLOGO":"ODONTOLOGO",
-    "SIRDEC":"SIRDEC",
-    "ESTADO":"ESTADO",
-    "LEY": "LEY",
-    "ENTREGADOS": "ENTREGADOS",
-    "ANALIZADOS": "ANALIZADOS",
-    "ASUNTO DE LA DILIGENCIA": "ASUNTO DE LA DILIGENCIA",
-    "CUERPOS": "CUERPOS",
-    "AÑO": "AÑO",
-    "TIPO INHUMACION": "TIPO INHUMACION",
-    "ZONA": "ZONA",
-    "MUNICIPIO DE LA DILIGENCIA": "MUNICIPIO DE LA DILIGENCIA",
-    "DEPARTAMENTO": "DEPARTAMENTO"
-}
+    return df[categoria(df[col]).isin([e.upper() for e in estados])].shape[0]
+
 
 # =========================
 # Sidebar: Filtros globales
 # =========================
+@st.cache_data(show_spinner=False)
+def opciones_sidebar(df1, df2):
+    """Años (enteros) y departamentos presentes en cualquiera de los dos datasets."""
+    anios = opciones_filtro([df["AÑO"] for df in (df1, df2) if "AÑO" in df.columns], enteros=True)
+    depts = opciones_filtro([df["DEPARTAMENTO"] for df in (df1, df2) if "DEPARTAMENTO" in df.columns])
+    return anios, depts
+
 def filtros_sidebar(df1, df2):
     st.sidebar.header("Filtros globales")
     # Año, departamento, búsqueda texto
-    anios = []
-    if "AÑO" in df1.columns:
-        anios += list(df1["AÑO"].dropna().unique())
-    if "AÑO" in df2.columns:
-        anios += list(df2["AÑO"].dropna().unique())
-    # Solo valores numéricos válidos
-    anios_validos = []
-    for y in anios:
-        try:
-            val = int(y)
-            anios_validos.append(val)
-        except (ValueError, TypeError):
-            continue
-    anios_validos = sorted(set(anios_validos))
+    anios_validos, depts = opciones_sidebar(df1, df2)
     anio = st.sidebar.selectbox("Año", options=["Todos"]+anios_validos, index=0)
-
-    depts = []
-    if "DEPARTAMENTO" in df1.columns: depts += list(df1["DEPARTAMENTO"].dropna().unique())
-    if "DEPARTAMENTO" in df2.columns: depts += list(df2["DEPARTAMENTO"].dropna().unique())
-    depts = sorted([d for d in set(depts) if pd.notna(d)])
     dept = st.sidebar.selectbox("Departamento", options=["Todos"]+depts, index=0)
 
     q = st.sidebar.text_input("Buscar texto...")
@@ -140,51 +98,116 @@ def filtros_sidebar(df1, df2):
 # =========================
 # Data Preparation
 # =========================
-# Cargar y limpiar
-df_lab = normalizar_cols(cargar_csv('Labmedellin5.csv'), MAPEO_COLS)
-df_campo = normalizar_cols(cargar_csv('exhmed.csv'), MAPEO_COLS)
+COLS_LAB = ["CASO LIMS","NOMBRE OCCISO","MUNICIPIO EXHUMACION","ANTROPOLOGO","MEDICO","ODONTOLOGO","SIRDEC"]
+COLS_CAMPO = ["ASUNTO DE LA DILIGENCIA", "CUERPOS", "AÑO","TIPO INHUMACION","ZONA","MUNICIPIO DE LA DILIGENCIA","DEPARTAMENTO"]
+PATRONES_CASO = {"CIH/GEIH": "CIH|GEIH", "BUNKER (GIH)": "GIH"}
+
+# Cargar y limpiar una vez por archivo: los reruns por un control reutilizan el resultado
+# (cargar_csv ya devuelve las columnas con los nombres de geih.esquema; proyectar agrega
+# las que faltan y deja cada campo con su tipo)
+@contar_cache("datos_lab", st.cache_data(show_spinner=False))
+def datos_lab():
+    """Laboratorio con las columnas del tablero y ANALIZADOS/ENTREGADOS según ESTADO."""
+    relleno = {**dict.fromkeys(COLS_LAB, "No especificado"), "ENTREGADOS": 0, "ANALIZADOS": 0}
+    df = ESQUEMA.proyectar(cargar_csv('Labmedellin5.csv'), COLS_LAB + ["ENTREGADOS", "ANALIZADOS"], relleno)
+    if "ESTADO" in df.columns:
+        estado = categoria(df["ESTADO"])
+        df["ANALIZADOS"] = estado.eq("ANALIZADO").astype(int)
+        df["ENTREGADOS"] = estado.eq("ENTREGADO").astype(int)
+    return df
 
-# Completa columnas que pueden faltar
-for col in ["CASO LIMS","NOMBRE OCCISO","MUNICIPIO DE EXHUMACIÓN","ANTROPOLOGO","MEDICO","ODONTOLOGO","SIRDEC"]:
-    df_lab = safe_column(df_lab, col, fill="No especificado")
+@contar_cache("datos_campo", st.cache_data(show_spinner=False))
+def datos_campo():
+    """Actuaciones de campo con las columnas del tablero y CUERPOS entero."""
+    # parcial: sin "MUNICIPIO DE LA DILIGENCIA" exacto se usa la columna que lo contiene
+    relleno = {**dict.fromkeys(COLS_CAMPO, "No especificado"), "CUERPOS": 0}
+    df = ESQUEMA.proyectar(cargar_csv('exhmed.csv'), COLS_CAMPO, relleno, parcial=True)
+    df["CUERPOS"] = df["CUERPOS"].fillna(0).astype(int)
+    return df
 
-for col in ["ASUNTO DE LA DILIGENCIA", "CUERPOS", "AÑO","TIPO INHUMACION","ZONA","MUNICIPIO DE LA DILIGENCIA","DEPARTAMENTO"]:
-    df_campo = safe_column(df_campo, col, fill="No especificado")
+@st.cache_data(show_spinner=False)
+def marcas_caso(df):
+    """Filas CIH/GEIH y BUNKER (GIH) según CASO LIMS, sobre todo el dataset."""
+    return marcas_patrones(df["CASO LIMS"], PATRONES_CASO)
 
-df_campo["CUERPOS"] = pd.to_numeric(df_campo["CUERPOS"], errors='coerce').fillna(0).astype(int)
-df_lab = safe_column(df_lab, "ENTREGADOS", fill=0)
-df_lab = safe_column(df_lab, "ANALIZADOS", fill=0)
-if "ESTADO" in df_lab.columns:
-    df_lab["ANALIZADOS"] = df_lab["ESTADO"].str.upper().eq("ANALIZADO").astype(int)
-    df_lab["ENTREGADOS"] = df_lab["ESTADO"].str.upper().eq("ENTREGADO").astype(int)
+seccion("carga")
+df_lab = datos_lab()
+df_campo = datos_campo()
 
 # Filtros globales
+seccion("filtros")
 anio, dept, query = filtros_sidebar(df_lab, df_campo)
 
+@st.cache_resource(show_spinner=False)
+def motor_filtros(df):
+    """Códigos de AÑO/DEPARTAMENTO, índice de texto y máscaras en caché, uno por dataset."""
+    return MotorFiltros(df, categoricas=("AÑO", "DEPARTAMENTO"))
+
+filtros_activos = {"AÑO": anio, "DEPARTAMENTO": dept}
+
 def aplicar_filtros(df):
-    tmp = df.copy()
-    if anio != "Todos" and "AÑO" in tmp.columns:
-        tmp = tmp[tmp["AÑO"]==anio]
-    if dept != "Todos" and "DEPARTAMENTO" in tmp.columns:
-        tmp = tmp[tmp["DEPARTAMENTO"]==dept]
-    if query:
-        mask = tmp.apply(lambda x: x.astype(str).str.contains(query, case=False, na=False)).any(axis=1)
-        tmp = tmp[mask]
-    return tmp
+    """Vista filtrada: máscaras combinadas con & y una sola materialización (sin df.copy())."""
+    return motor_filtros(df).vista(df, filtros_activos, query)
+
+@st.cache_resource(show_spinner=False)
+def cubo_resumen(df, dimensiones, medidas=()):
+    """Conteos pre-agregados por las dimensiones de los gráficos, uno por dataset."""
+    return Cubo(df, dimensiones, medidas)
+
+def conteo_vista(cubo, dfv, col):
+    """
+    Conteos de 'col' en la vista filtrada. Sin búsqueda de texto se leen
+    del cubo (AÑO/DEPARTAMENTO son dimensiones); el cubo no indexa texto,
+    así que con búsqueda se cuentan las filas de la vista.
+    """
+    if query.strip():
+        return conteos(dfv[col])
+    return cubo.conteo(col, filtros_activos)
+
+@st.cache_data(show_spinner=False)
+def conteos_municipio(df):
+    """ANALIZADOS/ENTREGADOS por municipio en una sola pasada, de mayor a menor ANALIZADOS."""
+    banderas = {c: df[c].to_numpy() for c in ("ANALIZADOS", "ENTREGADOS")}
+    return conteos_por_grupo(df["MUNICIPIO EXHUMACION"], banderas, nombre="MUNICIPIO EXHUMACION", orden="ANALIZADOS")
 
 # =========================
 # App principal (Tabs)
 # =========================
 
+@st.cache_resource(show_spinner=False)
+def indice_geo():
+    """Coordenadas reparadas de los CSV de coordenadas del repo, una vez por proceso."""
+    return IndiceGeo.desde_archivos()
+
+def mapa_municipios(dfv, col_muni, etiqueta):
+    """Un círculo por municipio (no por registro) con el número de registros de la vista."""
+    if "DEPARTAMENTO" not in dfv.columns or col_muni not in dfv.columns:
+        return
+    puntos, sin_coordenadas = indice_geo().agregar(dfv, "DEPARTAMENTO", col_muni)
+    if puntos.empty:
+        st.info("No hay registros con coordenadas para los filtros actuales.")
+        return
+    st.plotly_chart(figura_puntos(puntos, etiqueta=etiqueta), use_container_width=True)
+    if sin_coordenadas:
+        st.caption(f"{sin_coordenadas} registros sin coordenadas para su municipio/departamento.")
+
+VISTAS_MAPA = {"auto": "Automática", "calor": "Mapa de calor", "treemap": "Treemap", "barras": "Barras"}
+
 tab1, tab2 = st.tabs(["CASOS LABORATORIO", "ACTUACIONES DE CAMPO"])
 
 with tab1:
+    seccion("lab/filtros")
     dfl = aplicar_filtros(df_lab)
+    cubo_lab = cubo_resumen(df_lab, ("AÑO", "DEPARTAMENTO", "ESTADO", "LEY"))
     st.subheader("Panel de Casos Laboratorio")
 
     # ---- 1. Tarjetas CIH/BUNKER ----
-    cih_count = dfl["CASO LIMS"].str.upper().fillna("").str.contains("CIH|GEIH").sum()
-    bunker_count = dfl["CASO LIMS"].str.upper().fillna("").str.contains("GIH").sum()
+    seccion("lab/tarjetas")
+    # Marcas calculadas una vez; la vista solo suma las filas que pasan los filtros
+    marcas = marcas_caso(df_lab)
+    mascara_lab = motor_filtros(df_lab).mascara(filtros_activos, query)
+    cih_count = conteo_marcas(marcas["CIH/GEIH"], mascara_lab)
+    bunker_count = conteo_marcas(marcas["BUNKER (GIH)"], mascara_lab)
     total = len(dfl)
 
     cih_pct = (cih_count/total*100) if total else 0
@@ -195,11 +218,9 @@ with tab1:
     col2.metric("BUNKER (GIH)", f"{bunker_count}", f"{bunker_pct:.1f}% del total")
 
     # ---- 2. Tabla previsualización ----
+    seccion("lab/tabla")
     st.markdown("### Previsualización de registros")
-    preview_cols = ["CASO LIMS","NOMBRE OCCISO","MUNICIPIO DE EXHUMACIÓN","ANTROPOLOGO","MEDICO","ODONTOLOGO","SIRDEC"]
-    missing = [c for c in preview_cols if c not in dfl.columns]
-    for c in missing:
-        dfl[c] = "No especificado"
+    preview_cols = COLS_LAB
     num_rows = st.selectbox("Filas a mostrar", [10,25,50,100], index=0)
     search_table = st.text_input("Buscar en la tabla...")
     tdf = dfl[preview_cols]
@@ -209,101 +230,131 @@ with tab1:
     st.dataframe(tdf.head(num_rows))
 
     # ---- 3. Tarjetas Estado ----
+    seccion("lab/estados")
     st.markdown("### Estado de los casos")
     estados_principales = ["ANALIZADO", "PENDIENTE", "PERFILADO", "POSITIVO", "NEGATIVO"]
     otros_estados = ["REMITIDOS", "GENETICA", "NO PERFILO", "CANCELADO", "ND"]
     cols = st.columns(len(estados_principales)+1)
     suma_total = len(dfl)
+    vc_estado = conteo_vista(cubo_lab, dfl, "ESTADO")
     for i, estado in enumerate(estados_principales):
-        c = dfl["ESTADO"].str.upper().eq(estado).sum()
+        c = int(vc_estado.get(estado, 0))
         pct = (c/suma_total)*100 if suma_total else 0
         cols[i].metric(estado, c, f"{pct:.1f}%")
-    otros = dfl["ESTADO"].str.upper().isin([x.upper() for x in otros_estados]).sum()
+    otros = int(vc_estado[vc_estado.index.isin([x.upper() for x in otros_estados])].sum())
     pct_otros = (otros/suma_total)*100 if suma_total else 0
     cols[-1].metric("OTROS ESTADOS", otros, f"{pct_otros:.1f}%")
 
     # ---- 4. Gráfico barras por LEY ----
+    seccion("lab/ley")
     st.markdown("### Casos por Ley")
     if "LEY" in dfl.columns:
-        ley_plot = dfl["LEY"].value_counts().reset_index()
+        ley_plot = conteo_vista(cubo_lab, dfl, "LEY").reset_index()
         ley_plot.columns = ["LEY", "count"]
         fig_ley = px.bar(ley_plot, x="LEY", y="count", labels={"LEY":"LEY","count":"Cantidad"}, text="count")
         fig_ley.update_traces(textposition="outside")
         fig_ley.update_layout(xaxis_title="LEY", yaxis_title="Cantidad")
         st.plotly_chart(fig_ley, use_container_width=True)
 
-    # ---- 5. Top 10 municipios ----
-    st.markdown("### Top 10 Municipios (Analizados vs Entregados)")
-    if "MUNICIPIO DE EXHUMACIÓN" in dfl.columns:
-        muni_plot = dfl.groupby("MUNICIPIO DE EXHUMACIÓN").agg({
-            "ANALIZADOS": "sum",
-            "ENTREGADOS": "sum"
-        }).reset_index()
-        top10 = muni_plot.sort_values('ANALIZADOS', ascending=False).head(10)
+    # ---- 5. Top municipios ----
+    seccion("lab/top municipios")
+    st.markdown("### Municipios (Analizados vs Entregados)")
+    if "MUNICIPIO EXHUMACION" in dfl.columns:
+        muni_plot = conteos_municipio(dfl)
+        n_top = st.selectbox("Municipios a mostrar", [10, 25, 50, "Todos"], index=0)
+        top10 = muni_plot if n_top == "Todos" else muni_plot.head(n_top)
         fig_muni = go.Figure(data=[
-            go.Bar(name='Analizados', x=top10["MUNICIPIO DE EXHUMACIÓN"], y=top10["ANALIZADOS"], text=top10["ANALIZADOS"], textposition='outside'),
-            go.Bar(name='Entregados', x=top10["MUNICIPIO DE EXHUMACIÓN"], y=top10["ENTREGADOS"], text=top10["ENTREGADOS"], textposition='outside')
+            go.Bar(name='Analizados', x=top10["MUNICIPIO EXHUMACION"], y=top10["ANALIZADOS"], text=top10["ANALIZADOS"], textposition='outside'),
+            go.Bar(name='Entregados', x=top10["MUNICIPIO EXHUMACION"], y=top10["ENTREGADOS"], text=top10["ENTREGADOS"], textposition='outside')
         ])
         fig_muni.update_layout(barmode='group', xaxis_title="Municipio", yaxis_title="Casos", legend_title="Tipo")
         st.plotly_chart(fig_muni, use_container_width=True)
 
+    # ---- Mapa de municipios de exhumación ----
+    seccion("lab/mapa")
+    st.markdown("### Mapa de casos por municipio de exhumación")
+    mapa_municipios(dfl, "MUNICIPIO EXHUMACION", "Casos")
+
     # ---- 6. Descarga CSV ----
+    seccion("lab/descarga")
     csv = dfl.to_csv(index=False).encode()
     st.download_button("Descargar datos filtrados (CSV)", csv, "casos_lab_filtrado.csv", "text/csv")
 
 with tab2:
+    seccion("campo/filtros")
     dfc = aplicar_filtros(df_campo)
+    cubo_campo = cubo_resumen(df_campo, ("AÑO", "DEPARTAMENTO", "MUNICIPIO DE LA DILIGENCIA", "ZONA", "TIPO INHUMACION"), ("CUERPOS",))
     st.subheader("Panel de Actuaciones de Campo")
     # ---- 1. Tarjetas ----
+    seccion("campo/tarjetas")
     total_asunto = len(dfc)
     most_common = dfc["ASUNTO DE LA DILIGENCIA"].mode().iloc[0] if not dfc["ASUNTO DE LA DILIGENCIA"].isna().all() else "No especificado"
-    total_cuerpos = dfc["CUERPOS"].sum()
+    total_cuerpos = int(dfc["CUERPOS"].sum() if query.strip() else cubo_campo.total(filtros_activos, "CUERPOS"))
     col1, col2 = st.columns(2)
     col1.metric("Total registros (Asunto de la Diligencia)", total_asunto, f"Frecuente: {most_common}")
     col2.metric("Cantidad de Cuerpos", total_cuerpos)
 
     # ---- 2. Barras por AÑO en periodos de 5 ----
-    dfc = periodizar_anios(dfc, 'AÑO')
+    seccion("campo/quinquenios")
     st.markdown("### Casos por periodo de 5 años")
-    if "PERIODO_5" in dfc.columns:
-        per5 = dfc["PERIODO_5"].value_counts().sort_index().reset_index()
-        fig_p = px.bar(per5, x="index", y="PERIODO_5", labels={"index":"Periodo (5 años)", "PERIODO_5":"Cantidad"}, text="PERIODO_5")
+    # Quinquenios a partir de los conteos por AÑO (cubo o vista), no de las filas
+    per5 = por_quinquenio(conteo_vista(cubo_campo, dfc, "AÑO"))
+    if not per5.empty:
+        fig_p = px.bar(per5, x="PERIODO", y="CANTIDAD", labels={"PERIODO":"Periodo (5 años)", "CANTIDAD":"Cantidad"}, text="CANTIDAD")
         fig_p.update_traces(textposition="outside")
         fig_p.update_layout(xaxis_title="Periodo", yaxis_title="Casos")
         st.plotly_chart(fig_p, use_container_width=True)
 
     # ---- 3. Barras por Tipo Inhumación (%) ----
+    seccion("campo/tipo inhumacion")
     st.markdown("### Tipos de Inhumación (%)")
     if "TIPO INHUMACION" in dfc.columns:
-        tipo_plot = dfc["TIPO INHUMACION"].value_counts(normalize=True).mul(100).round(1).reset_index().rename(columns={"TIPO INHUMACION":"%","index":"TIPO"})
+        vc_tipo = conteo_vista(cubo_campo, dfc, "TIPO INHUMACION")
+        tipo_plot = pd.DataFrame({"TIPO": vc_tipo.index.astype(object), "%": (vc_tipo / vc_tipo.sum() * 100).round(1).to_numpy()})
         fig_tipo = px.bar(tipo_plot, y="TIPO", x="%", orientation="h", text="%", labels={"TIPO":"Tipo de Inhumación","%":"Porcentaje"})
         fig_tipo.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Porcentaje")
         st.plotly_chart(fig_tipo, use_container_width=True)
 
     # ---- 4. Pie chart por ZONA ----
+    seccion("campo/zona")
     st.markdown("### Distribución por Zona")
-    dfc["ZONA_NORMAL"] = dfc["ZONA"].apply(agrupar_zona)
-    zona_plot = dfc["ZONA_NORMAL"].value_counts(normalize=True).mul(100).round(1).reset_index().rename(columns={"index":"ZONA","ZONA_NORMAL":"%"})
+    # Se agrupan los conteos por categoría, no las filas
+    vc_zona = conteo_vista(cubo_campo, dfc, "ZONA")
+    vc_zona = reagrupar(vc_zona, agrupar_zona).sort_values(ascending=False)
+    zona_plot = pd.DataFrame({"ZONA": vc_zona.index, "%": (vc_zona / vc_zona.sum() * 100).round(1).to_numpy()})
     fig_z = px.pie(zona_plot, values="%", names="ZONA", title="Zona", hole=0.3)
     fig_z.update_traces(textinfo='percent+label')
     st.plotly_chart(fig_z, use_container_width=True)
 
     # ---- 5. Heatmap municipio vs departamento ----
+    seccion("campo/heatmap")
     st.markdown("### Mapa de calor: Municipio vs Departamento")
-    pc = pd.pivot_table(dfc, index="DEPARTAMENTO", columns="MUNICIPIO DE LA DILIGENCIA", aggfunc="size", fill_value=0)
-    fig_hm = go.Figure(data=go.Heatmap(
-        z=pc.values,
-        x=pc.columns,
-        y=pc.index,
-        colorscale='Blues',
-        hoverongaps=False,
-        colorbar_title="N° de Registros",
-        text=pc.values,
-        texttemplate="%{text}"
-    ))
-    fig_hm.update_layout(xaxis_title="Municipio", yaxis_title="Departamento", title="Heatmap Departamento vs Municipio")
+    # Conteos dispersos (departamento, municipio): top-N + OTROS; treemap/barras si no cabe
+    if query.strip():
+        pares = conteos_pares(dfc, "DEPARTAMENTO", "MUNICIPIO DE LA DILIGENCIA")
+    else:
+        pares = cubo_campo.conteo(["DEPARTAMENTO", "MUNICIPIO DE LA DILIGENCIA"], filtros_activos)
+    hm1, hm2 = st.columns(2)
+    n_muni = hm1.selectbox("Municipios en el mapa", [20, 50, 100, "Todos"], index=0)
+    vista = hm2.selectbox("Vista", list(VISTAS_MAPA), format_func=VISTAS_MAPA.get, index=0)
+    fig_hm = figura_mapa_calor(
+        pares,
+        "Heatmap Departamento vs Municipio",
+        etiquetas=dict(x="Municipio", y="Departamento", color="N° de Registros"),
+        max_columnas=None if n_muni == "Todos" else n_muni,
+        vista=vista,
+        colorscale="Blues",
+    )
     st.plotly_chart(fig_hm, use_container_width=True)
 
+    # ---- Mapa de actuaciones ----
+    seccion("campo/mapa")
+    st.markdown("### Mapa de actuaciones por municipio")
+    mapa_municipios(dfc, "MUNICIPIO DE LA DILIGENCIA", "Actuaciones")
+
     # ---- 6. Descarga CSV ----
+    seccion("campo/descarga")
     csv2 = dfc.to_csv(index=False).encode()
     st.download_button("Descargar datos filtrados (CSV)", csv2, "actuaciones_campo_filtrado.csv", "text/csv")
+
+mostrar_perfil(perfil)
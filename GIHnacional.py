@@ -1,8 +1,27 @@
 # --- Salvaguardas previas ---
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 
+from geih.combinacion import clave_combinacion, combinar_con_cache, formatos_fecha, parsear_fechas
+from geih.componentes import tabla_paginada
+
+# --- Carga y combinación de exportaciones regionales ---
+# Encabezados alineados con los sinónimos del esquema y fechas parseadas con
+# formato explícito; el resultado queda en la caché Arrow y en session_state,
+# así un rerun con los mismos archivos no vuelve a leer nada.
+archivos = st.file_uploader(
+    "Sube las exportaciones regionales (CSV o XLSX)", type=["csv", "xlsx"], accept_multiple_files=True
+)
+if archivos:
+    subidos = [(a.name, a.getvalue()) for a in archivos]
+    clave = clave_combinacion(subidos)
+    if st.session_state.get("df_combined_clave") != clave:
+        with st.spinner("Combinando archivos..."):
+            st.session_state["df_combined"] = combinar_con_cache(subidos, clave)
+        st.session_state["df_combined_clave"] = clave
+
 # Recuperar df_combined si no está en variables locales (por ejemplo, tras un rerun)
 if 'df_combined' not in locals():
     df_combined = st.session_state.get('df_combined', None)
@@ -14,51 +33,51 @@ if not isinstance(df_combined, pd.DataFrame):
 
 # --- Mostrar un resumen básico ---
 st.write(f"DataFrame combinado: {df_combined.shape[0]} filas y {df_combined.shape[1]} columnas.")
-st.dataframe(df_combined.head())
+# Paginada: al navegador solo llega la página actual, con orden y búsqueda en el servidor
+tabla_combinada = tabla_paginada(df_combined, "combinado")
 
 # --- Dashboard ---
 st.header("Dashboard")
 
-# Línea de tiempo - Las fechas están en las columnas J, K y L (índices 9, 10, 11)
-st.subheader("Línea de tiempo (columnas J, K y L)")
-date_cols = []
-for idx in [9, 10, 11]:
-    if idx < len(df_combined.columns):
-        date_cols.append(df_combined.columns[idx])
+# Línea de tiempo - columnas de fecha (datetime64 desde la combinación)
+st.subheader("Línea de tiempo (columnas de fecha)")
+date_cols = df_combined.select_dtypes(include="datetime").columns.tolist()
+if not date_cols:
+    # DataFrame armado por otra vía: fechas en las columnas J, K y L (índices 9, 10, 11)
+    for idx in [9, 10, 11]:
+        if idx < len(df_combined.columns):
+            col = df_combined.columns[idx]
+            texto = df_combined[col].astype("str")
+            formatos = formatos_fecha(texto)
+            if formatos:
+                df_combined[col] = parsear_fechas(texto, formatos)
+                date_cols.append(col)
 
 if date_cols:
-    # Convertir a datetime con coerción
-    for col in date_cols:
-        df_combined[col] = pd.to_datetime(df_combined[col], errors='coerce')
-
     # Unir todas las fechas en una sola serie para el gráfico
-    fechas_list = [df_combined[c].dropna() for c in date_cols if c in df_combined.columns]
-    if fechas_list:
-        fechas = pd.concat(fechas_list) if len(fechas_list) > 1 else fechas_list[0]
-        timeline = fechas.value_counts().sort_index().reset_index()
-        timeline.columns = ['Fecha', 'Conteo']
+    fechas = pd.Series(np.concatenate([df_combined[c].dropna().to_numpy() for c in date_cols]))
+    timeline = fechas.value_counts().sort_index().reset_index()
+    timeline.columns = ['Fecha', 'Conteo']
 
-        if not timeline.empty:
-            fig, ax = plt.subplots()
-            ax.plot(timeline['Fecha'], timeline['Conteo'], marker='o')
-            ax.set_title("Línea de Tiempo - Conteo por Fecha (J, K, L)")
-            ax.set_xlabel("Fecha")
-            ax.set_ylabel("Conteo")
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
-        else:
-            st.info("No hay datos de fecha válidos en las columnas J, K o L.")
+    if not timeline.empty:
+        fig, ax = plt.subplots()
+        ax.plot(timeline['Fecha'], timeline['Conteo'], marker='o')
+        ax.set_title("Línea de Tiempo - Conteo por Fecha")
+        ax.set_xlabel("Fecha")
+        ax.set_ylabel("Conteo")
+        plt.xticks(rotation=45)
+        st.pyplot(fig)
     else:
-        st.info("No se pudieron consolidar fechas para la línea de tiempo.")
+        st.info("No hay datos de fecha válidos en las columnas de fecha.")
 else:
-    st.info("No se encontraron las columnas J, K y L para la línea de tiempo.")
+    st.info("No se encontraron columnas de fecha para la línea de tiempo.")
 
 # --- Tarjetas con insights ---
 st.subheader("Insights destacados")
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Filas totales", df_combined.shape[0])
 col2.metric("Columnas totales", df_combined.shape[1])
-col3.metric("Datos nulos (%)", round(df_combined.isnull().mean().mean() * 100, 2))
+col3.metric("Datos nulos (%)", round(tabla_combinada.porcentaje_nulos(), 2))
 col4.metric("Valores únicos cols.", int((df_combined.nunique() > 1).sum()))
 
 # --- Top 10 value counts ---
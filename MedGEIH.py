@@ -5,8 +5,6 @@
 # -------------------------------------------------------------
 
 import os
-import re
-import unicodedata
 from typing import Dict, List
 
 import numpy as np
@@ -14,6 +12,12 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from geih.busqueda import IndiceBusqueda
+from geih.carga import cargar
+from geih.esquema import COLUMNAS_ESTANDAR, ESQUEMA, SINONIMOS
+from geih.indicadores import completar_columnas
+from geih.texto import normalizar_texto
+
 # ----------------------------
 # Configuración de página
 # ----------------------------
@@ -36,16 +40,9 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 # ----------------------------
 # Utilidades generales
 # ----------------------------
-def strip_accents(s: str) -> str:
-    """Elimina tildes/diacríticos sin dependencias externas."""
-    if s is None:
-        return ""
-    nfkd = unicodedata.normalize("NFD", str(s))
-    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
-
 def norm_text(x) -> str:
     """
-    Normaliza texto (acentos, espacios, mayúsculas).
+    Normaliza texto (acentos, espacios, mayúsculas) con geih.texto.
     Blindado para no romper si llega una Serie por error.
     """
     if isinstance(x, pd.Series):
@@ -56,53 +53,21 @@ def norm_text(x) -> str:
                 break
         else:
             return ""
-    if pd.isna(x):
-        return ""
-    s = strip_accents(str(x).strip())
-    s = re.sub(r"\s+", " ", s)
-    return s.upper()
+    return normalizar_texto(x)
+
+def normalize_name(c) -> str:
+    return normalizar_texto(c)
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
-    new_cols = {}
-    for c in df.columns:
-        base = strip_accents(str(c)).strip().upper()
-        base = re.sub(r"\s+", " ", base)
-        new_cols[c] = base
-    return df.rename(columns=new_cols)
-
-# Mapeo de sinónimos -> nombre estándar esperado
-COLUMN_MAP: Dict[str, str] = {
-    # Laboratorio
-    "CASO LIMS": "CASO LIMS",
-    "CASO": "CASO LIMS",
-    "NOMBRE OCCISO": "NOMBRE OCCISO",
-    "MUNICIPIO DE EXHUMACION": "MUNICIPIO EXHUMACION",
-    "MUNICIPIO DE EXHUMACIÓN": "MUNICIPIO EXHUMACION",
-    "MUNICIPIO EXHUMACION": "MUNICIPIO EXHUMACION",
-    "ANTROPOLOGO": "ANTROPOLOGO",
-    "ANTROPÓLOGO": "ANTROPOLOGO",
-    "MEDICO": "MEDICO",
-    "ODONTOLOGO": "ODONTOLOGO",
-    "ODONTÓLOGO": "ODONTOLOGO",
-    "SIRDEC": "SIRDEC",
-    "ESTADO": "ESTADO",
-    "LEY": "LEY",
-    "ANALIZADOS": "ANALIZADOS",
-    "ENTREGADOS": "ENTREGADOS",
-    # Campo
-    "ASUNTO DE LA DILIGENCIA": "ASUNTO DE LA DILIGENCIA",
-    "CUERPOS": "CUERPOS",
-    "ANIO": "AÑO",
-    "ANO": "AÑO",
-    "AÑO": "AÑO",
-    "TIPO INHUMACION": "TIPO INHUMACION",
-    "TIPO INHUMACIÓN": "TIPO INHUMACION",
-    "ZONA": "ZONA",
-    "MUNICIPIO DE LA DILIGENCIA": "MUNICIPIO DE LA DILIGENCIA",
-    "DEPARTAMENTO": "DEPARTAMENTO",
-}
+    return df.rename(columns={c: normalize_name(c) for c in df.columns})
+
+# Mapeo de sinónimos -> nombre estándar esperado (registro geih.esquema, compartido con los demás tableros)
+COLUMN_MAP: Dict[str, str] = SINONIMOS
+
+# Columnas que se conservan al leer por trozos
+MAPPED_COLUMNS = COLUMNAS_ESTANDAR
 
 LAB_PREVIEW_COLS = [
     "CASO LIMS",
@@ -114,26 +79,26 @@ LAB_PREVIEW_COLS = [
     "SIRDEC",
 ]
 
+def standard_name(c) -> str:
+    """Nombre normalizado y remapeado con el esquema (una sola columna)."""
+    return ESQUEMA.nombre(c)
+
 def standardize_and_remap(df: pd.DataFrame) -> pd.DataFrame:
-    df = normalize_columns(df)
-    remapped = {col: COLUMN_MAP.get(col, col) for col in df.columns}
-    return df.rename(columns=remapped)
+    """Encabezado completo resuelto con el esquema (una pasada, en caché por encabezado)."""
+    return df.set_axis(ESQUEMA.nombres(df.columns), axis=1)
 
 def ensure_columns(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
-    for c in cols:
-        if c not in df.columns:
-            df[c] = np.nan
-    return df
+    return completar_columnas(df, cols, np.nan)
 
-def filter_by_search(df: pd.DataFrame, query: str) -> pd.DataFrame:
+@st.cache_resource(show_spinner=False)
+def search_index(df: pd.DataFrame) -> IndiceBusqueda:
+    """Índice de búsqueda sobre columnas 'object'/'string', uno por dataset cargado."""
+    return IndiceBusqueda(df)
+
+def filter_by_search(df: pd.DataFrame, query: str, whole_words: bool = False) -> pd.DataFrame:
     if not query:
         return df
-    query_norm = norm_text(query)
-    mask = pd.Series(False, index=df.index)
-    # incluir 'object' y 'string' (pandas dtype moderno)
-    for c in df.select_dtypes(include=["object", "string"]).columns:
-        mask |= df[c].astype(str).apply(norm_text).str.contains(query_norm, na=False)
-    return df[mask]
+    return df[search_index(df).buscar(query, palabras=whole_words)]
 
 def download_button_csv(df: pd.DataFrame, label: str, filename: str):
     csv = df.to_csv(index=False).encode("utf-8")
@@ -142,45 +107,29 @@ def download_button_csv(df: pd.DataFrame, label: str, filename: str):
 # ----------------------------
 # Carga robusta desde URL o ruta
 # ----------------------------
+# Identifica el lector + normalización en la caché de disco; cambiarla
+# si cambia el lector, el esquema o categorizar.
+CACHE_ETIQUETA = "MedGEIH.cargar_csv/standardize_and_remap-v5"
+
 @st.cache_data(show_spinner=False)
 def cargar_csv(src: str) -> pd.DataFrame:
     """
     Carga CSV desde:
-      - URL http(s)
+      - URL http(s), vía la copia local en data/espejo (geih.espejo)
       - ruta absoluta o relativa
       - 'data/<src>' si es relativa y existe
-    Intenta (utf-8, latin-1) x (sep=';', sep=',').
-    Devuelve DF vacío si falla.
+    Detecta BOM, codificación y separador sobre una sola lectura y valida
+    el encabezado contra COLUMN_MAP antes de parsear (geih.carga).
+    Devuelve el DF ya estandarizado (geih.esquema) y con las columnas de
+    baja cardinalidad como 'category' (categorizar), servido desde la
+    caché en disco si el archivo no cambió; DF vacío si falla.
+    Los archivos grandes (geih.ingesta.UMBRAL_TROZOS) se leen por trozos
+    y solo con las columnas de COLUMN_MAP.
     """
     if not src:
         return pd.DataFrame()
-
-    def try_read(read_src: str):
-        for enc in ("utf-8", "latin-1"):
-            for sep in (";", ","):
-                try:
-                    return pd.read_csv(read_src, encoding=enc, sep=sep)
-                except Exception:
-                    pass
-        return None
-
-    # 1) URL
-    if src.startswith("http://") or src.startswith("https://"):
-        df = try_read(src)
-        if df is not None:
-            return df
-        st.warning(f"No se pudo leer la URL: {src}")
-        return pd.DataFrame()
-
-    # 2) Ruta local tal cual o dentro de /data
-    candidates = []
-    if os.path.isabs(src) or os.path.exists(src):
-        candidates.append(src)
-    if not os.path.isabs(src):
-        candidates.append(os.path.join(DATA_DIR, src))
-
-    for path in candidates:
-        if os.path.exists(path):
-            df = try_read(path)
-            if df is not None:
-                ret
+    df = cargar(src, ESQUEMA.nombres, CACHE_ETIQUETA, conservar=MAPPED_COLUMNS.__contains__,
+                esperadas=COLUMN_MAP.keys(), data_dir=DATA_DIR)
+    if df.empty:
+        st.warning(f"No se encontró o no se pudo leer el archivo: {src}")
+    return df
@@ -1,34 +1,51 @@
+import numpy as np
 import pandas as pd
 import streamlit as st 
 import plotly.express as px 
 
+from geih.componentes import tabla_paginada
+from geih.cubo import Cubo
+from geih.espejo import POLITICA, obtener
+from geih.puntos import agrupar_en_celdas
+
+#Lee la copia local en data/espejo; solo consulta GitHub (GET condicional) al vencer el TTL
+@st.cache_data(ttl=POLITICA.ttl, show_spinner=False)
+def cargar_remoto(url, **kwargs):
+    return pd.read_csv(obtener(url), **kwargs)
+
 url = 'https://github.com/juliandariogiraldoocampo/ia_taltech/raw/refs/heads/main/fiscalia/datos_generales_ficticios.csv'
-df = pd.read_csv(url, sep=';', encoding='utf-8')
+df = cargar_remoto(url, sep=';', encoding='utf-8')
 
 url_mapa = "https://github.com/juliandariogiraldoocampo/ia_taltech/raw/refs/heads/main/fiscalia/datos_mapa.csv"
-df_mapa = pd.read_csv(url_mapa)
+df_mapa = cargar_remoto(url_mapa)
 
 #st.dataframe(df)
 
 #Crea lista de las columnas que me interasan en su propio orden:
 selected_columns = ['FECHA_HECHOS', 'DELITO', 'ETAPA', 'FISCAL_ASIGNADO', 'DEPARTAMENTO', 'MUNICIPIO_HECHOS']
-#Actualizar el dtaframe -df- con las columnas de interes ordendas por fecha y reseteo de indice: 
-df = df[selected_columns].sort_values(by='FECHA_HECHOS', ascending=True). reset_index(drop=True)
 
-#Convertir fecha object a fecha 
-df['FECHA_HECHOS'] = pd.to_datetime(df['FECHA_HECHOS'], errors='coerce')
+#Preparación una vez por carga (no en cada rerun): columnas de interes ordendas por fecha,
+#reseteo de indice y fecha sin hora
+@st.cache_data(show_spinner=False)
+def preparar_delitos(df):
+    df = df[selected_columns].sort_values(by='FECHA_HECHOS', ascending=True).reset_index(drop=True)
+    #Convertir fecha object a fecha y extraigo solo la fecha sin hora
+    df['FECHA_HECHOS'] = pd.to_datetime(df['FECHA_HECHOS'], errors='coerce').dt.date
+    return df
 
-df_serie_tiempo = df.copy()
-#Extraigo solo la fecha sin hora
-df['FECHA_HECHOS'] = df['FECHA_HECHOS'].dt.date
+df = preparar_delitos(df)
 
 
-#Cálculo de los municipio con mas delitos 
-max_municipio = df['MUNICIPIO_HECHOS'].value_counts().index[0].upper() #para poner en mayuscula 
-max_municipio = df ['MUNICIPIO_HECHOS'].value_counts().index[0].upper()
+#Cubo de resumen: los conteos se calculan una vez por carga y luego solo se consultan
+@st.cache_resource(show_spinner=False)
+def cubo_delitos(df):
+    return Cubo(df, ['DELITO', 'ETAPA', 'FISCAL_ASIGNADO', 'DEPARTAMENTO', 'MUNICIPIO_HECHOS'])
 
+cubo = cubo_delitos(df)
 
-max_cantidad_municipio = df ['MUNICIPIO_HECHOS'].value_counts().iloc[0]
+#Cálculo de los municipio con mas delitos 
+max_municipio, max_cantidad_municipio = cubo.moda('MUNICIPIO_HECHOS')
+max_municipio = max_municipio.upper() #para poner en mayuscula 
 #st.write(f'## Cantidad de Eventos: {max_cantidad_municipio}')
 
 #________________________________________Construcción de página
@@ -48,18 +65,30 @@ st.markdown(
 
 st.image('img/encabezado.png', use_container_width=True)
 
-#Mapa
+#Mapa: solo marcadores agregados por celda; la rejilla depende del zoom y se hace más gruesa
+#si pasan de geih.puntos.MAX_MARCADORES, así el mapa se puede desplazar sin huecos
+@st.cache_data(show_spinner=False)
+def marcadores_mapa(df_mapa, zoom):
+    return agrupar_en_celdas(df_mapa, zoom, lat="Lat", lon="Long", categoria="CATEGORIA", nombre="NOMBRE")
+
+zoom_mapa = st.slider("Zoom del mapa", min_value=4, max_value=16, value=12)
+centro_mapa = dict(lat=float(df_mapa['Lat'].median()), lon=float(df_mapa['Long'].median()))
+df_marcadores = marcadores_mapa(df_mapa, zoom_mapa)
+
 fig = px.scatter_map(
-    df_mapa,
+    df_marcadores,
     lat="Lat",
     lon="Long",
     color="CATEGORIA",
+    size=np.log2(df_marcadores['N']) + 1, #un punto suelto sigue siendo visible junto a celdas con miles
+    hover_data={'N': True},
     color_discrete_sequence=px.colors.qualitative.Antique,
 	# color_discrete_sequence=px.colors.sequential.Viridis,
 	hover_name="NOMBRE",
 	size_max=25,
 	height=700,
-    zoom=12,
+    zoom=zoom_mapa,
+    center=centro_mapa,
 	# map_style="open-street-map"
 	map_style="carto-darkmatter"
 	# map_style="carto-positron"
@@ -67,7 +96,8 @@ fig = px.scatter_map(
 st.plotly_chart(fig)
 
 #st.header("Dashboard de Delitos - Fiscalía")
-st.dataframe(df)
+#Tabla paginada: solo viajan al navegador 50 filas por página
+tabla_paginada(df, 'delitos')
 
 st.write(f"## Municipio con más delitos: {max_municipio} con {max_cantidad_municipio} reportes")
 
@@ -77,23 +107,23 @@ st.write(f"## Municipio con más delitos: {max_municipio} con {max_cantidad_muni
 
 #Cálculo etapa mas recurrente 
 #.upper() para poner en mayuscula 
-etapa_max_frecuente = df ['ETAPA'].value_counts().index[0].upper()
-cant_etapa_max_frecuente = df ['ETAPA'].value_counts().iloc[0]
+etapa_max_frecuente, cant_etapa_max_frecuente = cubo.moda('ETAPA')
+etapa_max_frecuente = etapa_max_frecuente.upper()
 st.write(f"## Etapa más frecuente: {etapa_max_frecuente} con {cant_etapa_max_frecuente} registros")
 
 #Graficar: 
 st.subheader('Comportamiento Delitos')
-delitos = df['DELITO'].value_counts()
+delitos = cubo.conteo('DELITO')
 #st.write(delitos)
 st.bar_chart(delitos)
 
 #Departamentos con más casos 
-max_casos_dep = df ['DEPARTAMENTO'].value_counts().index[0].upper()
-cant_max_casos_dep = df ['DEPARTAMENTO'].value_counts().iloc[0]
+max_casos_dep, cant_max_casos_dep = cubo.moda('DEPARTAMENTO')
+max_casos_dep = max_casos_dep.upper()
 st.write(f"Departamento con más registros: {max_casos_dep} con {cant_max_casos_dep} registros")
 
 st.subheader('Departamento con más registros')
-departamento = df['DEPARTAMENTO'].value_counts()
+departamento = cubo.conteo('DEPARTAMENTO')
 #st.write(departamento)
 st.subheader('Grafica departamento')
 st.bar_chart(departamento)
@@ -108,10 +138,10 @@ fig.update_layout(showlegend=False, height=400)
 st.plotly_chart(fig)
 
 #Grafico de barras apiladas 
-df_delitos = df.groupby(['DEPARTAMENTO', 'DELITO']).size().reset_index(name='conteo')
+df_delitos = cubo.conteo(['DEPARTAMENTO', 'DELITO']).sort_index().reset_index(name='conteo')
 fig = px.bar(df_delitos, x='DEPARTAMENTO', y='conteo', color='DELITO', barmode='stack')
 st.plotly_chart(fig)
-st.write(df_delitos)
+tabla_paginada(df_delitos, 'delitos_departamento')
 
 #Crar columnas xra tarjetas 
 col1, col2, col3, col4 = st.columns(4)
@@ -160,12 +190,12 @@ col5, col6 = st.columns(2)
 
 with col5:
     st.subheader('TIPO DELITOS')
-    tipo_delitos = df ['DELITO'].value_counts()
+    tipo_delitos = cubo.conteo('DELITO')
     st.bar_chart(tipo_delitos)
 
 with col6:
     st.subheader('Distribución por departamentos')
-    departamento =df['DEPARTAMENTO'].value_counts()
+    departamento = cubo.conteo('DEPARTAMENTO')
     fig = px.pie(
         values=departamento.values, 
         names=departamento.index,
@@ -175,25 +205,24 @@ with col6:
     st.plotly_chart(fig, key='torta_departamento')
 
 cols_grafico = ['DELITO', 'ETAPA', 'FISCAL_ASIGNADO', 'DEPARTAMENTO', 'MUNICIPIO_HECHOS']
-df_grafico = df[cols_grafico]
   
 #Selección de datos para viualizar 
 st.subheader('Selección de datos para visualizar')
 variable = st.selectbox(
     'Seleccione la variable para el análisis',
-    options = df_grafico.columns
+    options = cols_grafico
 )
-grafico = df_grafico[variable].value_counts()
+grafico = cubo.conteo(variable)
 st.bar_chart(grafico)
 
 if st.checkbox('Mostrar matriz de datos'):
     st.subheader('Matriz de datos')
-    st.dataframe(df_grafico)
+    tabla_paginada(df, 'matriz', columnas=cols_grafico)
     
 fiscal_consulta = st.selectbox(
     'Seleccione fiscal a consultar:',
     options = df['FISCAL_ASIGNADO'].unique()
 )
 
-df_fiscal = df[df['FISCAL_ASIGNADO'] == fiscal_consulta]
-st.dataframe(df_fiscal)
+#El filtro por fiscal se aplica sobre la tabla en caché, sin copiar df
+tabla_paginada(df, 'fiscal', filtros={'FISCAL_ASIGNADO': fiscal_consulta})
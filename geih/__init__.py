@@ -0,0 +1,6 @@
+# -------------------------------------------------------------
+# geih — capa de datos compartida por los tableros GEIH
+# Funciones puras (sin Streamlit) para cargar, normalizar,
+# cruzar y agregar los registros de laboratorio y exhumaciones;
+# los controles de Streamlit compartidos viven en geih.componentes.
+# -------------------------------------------------------------
@@ -0,0 +1,55 @@
+# -------------------------------------------------------------
+# Agregaciones agrupadas de una sola pasada para los gráficos
+# -------------------------------------------------------------
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from geih.categorias import SIN_DATO, categoria
+
+
+def bandera(serie: pd.Series, patron: str, regex: bool = True) -> np.ndarray:
+    """
+    Marca las filas cuyo valor contiene 'patron'. El patrón se evalúa una
+    vez por categoría y se reparte a las filas por sus códigos.
+    """
+    s = categoria(serie)
+    categorias = pd.Series(s.cat.categories, dtype=object)
+    por_categoria = categorias.str.contains(patron, regex=regex).fillna(False)
+    # SIN DATO es un nulo: nunca cumple el patrón (p. ej. "SI|ENTREG")
+    por_categoria = (por_categoria & (categorias != SIN_DATO)).to_numpy(dtype=bool)
+    codigos = s.cat.codes.to_numpy()
+    marcas = np.zeros(len(s), dtype=bool)
+    validos = codigos >= 0
+    marcas[validos] = por_categoria[codigos[validos]]
+    return marcas
+
+
+def conteos_por_grupo(
+    grupo: pd.Series,
+    banderas: Optional[Dict[str, np.ndarray]] = None,
+    nombre: str = "MUNICIPIO",
+    orden: str = "TOTAL",
+) -> pd.DataFrame:
+    """
+    Una fila por valor de 'grupo' con TOTAL de filas y la suma de cada
+    bandera, todo con np.bincount sobre los códigos (una pasada por
+    columna, sin filtrar el DataFrame por grupo). Ordena de mayor a menor
+    por 'orden' y omite grupos sin filas.
+    """
+    s = categoria(grupo)
+    codigos = s.cat.codes.to_numpy()
+    validos = codigos >= 0
+    codigos = codigos[validos]
+    n = len(s.cat.categories)
+
+    datos = {nombre: s.cat.categories.astype(object), "TOTAL": np.bincount(codigos, minlength=n)}
+    for columna, marcas in (banderas or {}).items():
+        pesos = np.asarray(marcas, dtype=np.int64)[validos]
+        datos[columna] = np.bincount(codigos, weights=pesos, minlength=n).astype(np.int64)
+
+    res = pd.DataFrame(datos)
+    res = res[res["TOTAL"] > 0]
+    return res.sort_values([orden, nombre], ascending=[False, True], kind="stable").reset_index(drop=True)
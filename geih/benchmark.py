@@ -0,0 +1,386 @@
+# -------------------------------------------------------------
+# Benchmark de las rutas de datos de los tableros (sin Streamlit)
+# Genera CSV sintéticos de laboratorio y exhumaciones con el esquema
+# real a 1x, 10x, 100x... el tamaño de Labmedellin5.csv/exhmed.csv y
+# mide carga, normalización, filtros, cruce exacto, difuso y las
+# agregaciones de los gráficos: segundos, filas/s y memoria pico.
+# Uso:  python -m geih.benchmark --escalas 1 10 100 --salida bench.json
+#       python -m geih.benchmark --comparar bench_anterior.json
+#       (sin --salida: data/.cache/benchmark/resultados.json)
+# -------------------------------------------------------------
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from geih.agregados import bandera, conteos_por_grupo
+from geih.busqueda import IndiceBusqueda
+from geih.cache import BASE_DIR, CACHE_DIR, leer_con_cache, pa
+from geih.categorias import categorizar
+from geih.combinacion import alinear_encabezados
+from geih.cruce import IndiceClaves, cruzar, unir
+from geih.cubo import Cubo
+from geih.dialecto import leer_csv_detectado
+from geih.emparejamiento import PoolCandidatos, claves_bloqueo, emparejar_difuso, texto_concatenado
+from geih.esquema import COLUMNAS_ESTANDAR, ESQUEMA, SINONIMOS
+from geih.filtros import MotorFiltros
+from geih.ingesta import cargar_por_trozos
+from geih.mapacalor import agrupar_otros, conteos_pares
+from geih.texto import normalizar_serie
+
+try:
+    import resource
+except ImportError:  # Windows: sin RSS máximo del proceso
+    resource = None
+
+T = TypeVar("T")
+
+PLANTILLA_LAB = os.path.join(BASE_DIR, "Labmedellin5.csv")
+PLANTILLA_EXH = os.path.join(BASE_DIR, "exhmed.csv")
+CARPETA_DATOS = os.path.join(CACHE_DIR, "benchmark")
+# Resultados por defecto junto a los datos sintéticos (ignorado por git)
+SALIDA = os.path.join(CARPETA_DATOS, "resultados.json")
+# Columnas que identifican la fila: en cada réplica llevan sufijo para que
+# el cruce exacto conserve la proporción de coincidencias del original
+CLAVES_LAB = ("CONSECUTIVO", "CASO LIMS", "CASO", "RADICADO")
+CLAVES_EXH = ("CARPETA", "CASO LABORATORIO", "CASO LAB HISTORIO", "RADICADO")
+# Columnas de texto libre que se alteran en las réplicas (el difuso no
+# debe encontrar siempre un candidato idéntico)
+VARIABLES = ("NOMBRE OCCISO",)
+FRACCION_VARIADA = 0.5
+SENSIBILIDAD = 0.85
+MAX_FILAS_DIFUSO = 5_000
+CONSULTA = "ENTREGADO"
+ETIQUETA = "benchmark-v1"
+
+
+# ----------------------------
+# Datos sintéticos
+# ----------------------------
+def _variar(valores: pd.Series, rng: np.random.Generator) -> pd.Series:
+    """Cambia una letra al azar en FRACCION_VARIADA de los valores no vacíos."""
+    letras = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    salida = valores.to_numpy(dtype=object).copy()
+    elegidos = np.flatnonzero((valores != "").to_numpy() & (rng.random(len(valores)) < FRACCION_VARIADA))
+    for i, letra, u in zip(elegidos, rng.choice(letras, len(elegidos)), rng.random(len(elegidos))):
+        texto = salida[i]
+        pos = int(u * len(texto))
+        salida[i] = texto[:pos] + letra + texto[pos + 1:]
+    return pd.Series(salida, index=valores.index)
+
+
+def escalar(plantilla: pd.DataFrame, factor: int, claves: Sequence[str], semilla: int = 0) -> pd.DataFrame:
+    """
+    'factor' réplicas de la plantilla (leída como texto). La réplica 0 es
+    el original; en las demás las claves llevan sufijo "-r" y parte de los
+    nombres cambia una letra.
+    """
+    rng = np.random.default_rng(semilla)
+    replicas = [plantilla]
+    for r in range(1, factor):
+        copia = plantilla.copy()
+        for c in claves:
+            if c in copia.columns:
+                copia[c] = copia[c].where(copia[c] == "", copia[c] + f"-{r}")
+        for c in VARIABLES:
+            if c in copia.columns:
+                copia[c] = _variar(copia[c], rng)
+        replicas.append(copia)
+    return pd.concat(replicas, ignore_index=True)
+
+
+def generar(factor: int, carpeta: str = CARPETA_DATOS, semilla: int = 0) -> Dict[str, str]:
+    """Rutas de los CSV sintéticos a 'factor'x; se generan solo si no existen."""
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = {}
+    for nombre, plantilla, claves in (("lab", PLANTILLA_LAB, CLAVES_LAB), ("exh", PLANTILLA_EXH, CLAVES_EXH)):
+        ruta = os.path.join(carpeta, f"{nombre}_{factor}x_s{semilla}.csv")
+        if not os.path.exists(ruta):
+            base = pd.read_csv(plantilla, dtype=str, keep_default_na=False)
+            tmp = ruta + ".tmp"
+            escalar(base, factor, claves, semilla).to_csv(tmp, index=False)
+            os.replace(tmp, ruta)
+        rutas[nombre] = ruta
+    return rutas
+
+
+# ----------------------------
+# Medición
+# ----------------------------
+MODOS_MEMORIA = ("rss", "tracemalloc", "no")
+_STATM = "/proc/self/statm"
+
+
+def _rss() -> int:
+    """RSS actual del proceso en bytes (Linux)."""
+    with open(_STATM, "r") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class _PicoRSS(threading.Thread):
+    """Muestrea el RSS cada 'intervalo' segundos mientras corre un paso."""
+
+    def __init__(self, intervalo: float = 0.005):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.base = self.pico = _rss()
+        self._fin = threading.Event()
+
+    def run(self) -> None:
+        while not self._fin.wait(self.intervalo):
+            self.pico = max(self.pico, _rss())
+
+    def detener(self) -> int:
+        """Bytes de RSS por encima del valor al empezar el paso."""
+        self._fin.set()
+        self.join()
+        self.pico = max(self.pico, _rss())
+        return self.pico - self.base
+
+
+class Medidor:
+    """
+    Tiempo, filas/s y memoria pico de cada paso de una escala. La memoria
+    se mide por defecto muestreando el RSS (ve también los búferes de
+    Arrow y no frena los pasos; sin /proc no se mide). "tracemalloc"
+    funciona en cualquier sistema pero solo ve la memoria de Python/NumPy
+    y multiplica los tiempos, así que solo sirve para comparar memoria.
+    """
+
+    def __init__(self, memoria: str = "rss"):
+        if memoria == "rss" and not os.path.exists(_STATM):
+            memoria = "no"
+        self.memoria = memoria
+        self.pasos: Dict[str, Dict[str, Any]] = {}
+
+    def medir(self, nombre: str, filas: Optional[int], funcion: Callable[[], T]) -> T:
+        """Ejecuta y mide 'funcion'; con filas=None se usa len() del resultado."""
+        gc.collect()
+        muestreo = None
+        if self.memoria == "rss":
+            muestreo = _PicoRSS()
+            muestreo.start()
+        elif self.memoria == "tracemalloc":
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        pico = None
+        try:
+            resultado = funcion()
+        finally:
+            segundos = time.perf_counter() - inicio
+            if muestreo is not None:
+                pico = muestreo.detener()
+            elif self.memoria == "tracemalloc":
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        if filas is None:
+            filas = len(resultado)
+        self.pasos[nombre] = {
+            "segundos": round(segundos, 4),
+            "filas": int(filas),
+            "filas_por_s": round(filas / segundos) if segundos > 0 else None,
+            "memoria_pico_mb": round(pico / 2**20, 1) if pico is not None else None,
+        }
+        return resultado
+
+
+def rss_max_mb() -> Optional[float]:
+    """RSS máximo del proceso hasta ahora (incluye memoria de Arrow, que tracemalloc no ve)."""
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(kb / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _moda(serie: pd.Series) -> Any:
+    vc = serie.value_counts()
+    return vc.index[0] if len(vc) else None
+
+
+def _leer(ruta: str, cache_dir: str) -> pd.DataFrame:
+    df = leer_csv_detectado(ruta, esperadas=SINONIMOS.keys(), cache_dir=cache_dir, low_memory=False)
+    df.columns = alinear_encabezados(df.columns)
+    return df
+
+
+def medir_escala(
+    factor: int,
+    memoria: str = "rss",
+    max_difuso: int = MAX_FILAS_DIFUSO,
+    semilla: int = 0,
+) -> Dict[str, Any]:
+    """Todos los pasos sobre los CSV sintéticos a 'factor'x, con caché en un directorio temporal."""
+    rutas = generar(factor, semilla=semilla)
+    m = Medidor(memoria)
+    cache_dir = tempfile.mkdtemp(prefix="geih-bench-")
+    try:
+        # Carga
+        lab = m.medir("carga_lab", None, lambda: _leer(rutas["lab"], cache_dir))
+        exh = m.medir("carga_exh", None, lambda: _leer(rutas["exh"], cache_dir))
+        n_lab, n_exh = len(lab), len(exh)
+
+        if pa is not None:
+            procesar = lambda src: categorizar(_leer(src, cache_dir))
+            m.medir("carga_cache_fria", n_lab, lambda: leer_con_cache(rutas["lab"], procesar, ETIQUETA, cache_dir))
+            m.medir("carga_cache_caliente", n_lab, lambda: leer_con_cache(rutas["lab"], procesar, ETIQUETA, cache_dir))
+            m.medir("carga_trozos", n_lab, lambda: cargar_por_trozos(
+                rutas["lab"], ESQUEMA.nombres, COLUMNAS_ESTANDAR.__contains__, ETIQUETA + "-trozos",
+                esperadas=SINONIMOS.keys(), cache_dir=cache_dir,
+            ))
+
+        # Normalización
+        m.medir("normalizacion_texto", n_lab + n_exh, lambda: (
+            normalizar_serie(lab["NOMBRE OCCISO"]), normalizar_serie(exh["NOMBRE OCCISO"])
+        ))
+        m.medir("categorizar", n_lab + n_exh, lambda: (categorizar(lab), categorizar(exh)))
+
+        # Filtros y búsqueda
+        filtros = {"AÑO": _moda(exh["AÑO"]), "DEPARTAMENTO": _moda(exh["DEPARTAMENTO"])}
+        motor = m.medir("filtros_motor", n_exh, lambda: MotorFiltros(exh, categoricas=("AÑO", "DEPARTAMENTO")))
+        m.medir("filtros_mascara", n_exh, lambda: motor.vista(exh, filtros))
+        indice = m.medir("busqueda_indice", n_lab, lambda: IndiceBusqueda(lab))
+        m.medir("busqueda_subcadena", n_lab, lambda: indice.buscar(CONSULTA))
+        m.medir("busqueda_palabras", n_lab, lambda: indice.buscar(CONSULTA, palabras=True))
+
+        # Cruce exacto (CASO LIMS / RADICADO contra CASO LABORATORIO / RADICADO)
+        indice_lab = m.medir("cruce_claves", n_lab + n_exh, lambda: IndiceClaves(lab["CASO LIMS"], lab["RADICADO"]))
+        indice_exh = IndiceClaves(exh["CASO LABORATORIO"], exh["RADICADO"])
+        cruce = m.medir("cruce_join", n_lab + n_exh, lambda: cruzar(indice_lab, indice_exh))
+        m.medir("cruce_unir", len(cruce.izquierda), lambda: unir(lab, exh, cruce, indice_lab))
+
+        # Difuso (muestra de laboratorio contra todas las exhumaciones, bloqueo por municipio)
+        columnas = ["NOMBRE OCCISO", "MUNICIPIO EXHUMACION"]
+        muestra = lab.iloc[:max_difuso]
+
+        def candidatos():
+            pool = PoolCandidatos(exh, columnas)
+            pool.bloquear(claves_bloqueo(exh["MUNICIPIO EXHUMACION"].tolist(), "columna"))
+            return pool
+        pool = m.medir("difuso_candidatos", n_exh, candidatos)
+        valores = texto_concatenado(muestra, columnas)
+        bloques = claves_bloqueo(muestra["MUNICIPIO EXHUMACION"].tolist(), "columna")
+        pares = m.medir("difuso_emparejar", len(muestra), lambda: emparejar_difuso(valores, pool, SENSIBILIDAD, bloques_lab=bloques))
+
+        # Agregaciones de los gráficos
+        m.medir("agregado_municipio", n_lab, lambda: conteos_por_grupo(
+            lab["MUNICIPIO EXHUMACION"],
+            {"ANALIZADOS": bandera(lab["ESTADO"], r"\bANALIZADO\b"), "ENTREGADOS": bandera(lab["ESTADO"], "ENTREG")},
+            nombre="MUNICIPIO EXHUMACION",
+        ))
+        dimensiones = ["AÑO", "DEPARTAMENTO", "MUNICIPIO EXHUMACION", "ZONA", "TIPO INHUMACION"]
+        cubo = m.medir("agregado_cubo", n_exh, lambda: Cubo(exh, dimensiones, ["CUERPOS"]))
+        m.medir("agregado_cubo_consultas", n_exh, lambda: [
+            (cubo.conteo(d), cubo.conteo(d, filtros), cubo.total(filtros, "CUERPOS")) for d in dimensiones
+        ])
+        m.medir("agregado_mapa_calor", n_exh, lambda: agrupar_otros(
+            conteos_pares(exh, "DEPARTAMENTO", "MUNICIPIO EXHUMACION"), max_filas=30, max_columnas=30
+        ))
+
+        return {
+            "filas_lab": n_lab,
+            "filas_exh": n_exh,
+            "bytes_lab": os.path.getsize(rutas["lab"]),
+            "bytes_exh": os.path.getsize(rutas["exh"]),
+            "coincidencias_exactas": int(len(cruce.izquierda)),
+            "pares_difusos": len(pares),
+            "memoria": m.memoria,
+            "pasos": m.pasos,
+            "rss_max_mb": rss_max_mb(),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def _commit() -> Optional[str]:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10,
+        )
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def ejecutar(
+    escalas: Sequence[int],
+    memoria: str = "rss",
+    max_difuso: int = MAX_FILAS_DIFUSO,
+    semilla: int = 0,
+) -> Dict[str, Any]:
+    """Resultados de todas las escalas con los datos del entorno (versión, librerías)."""
+    resultados = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__ if pa is not None else None,
+        "max_filas_difuso": max_difuso,
+        "semilla": semilla,
+        "escalas": {},
+    }
+    for factor in escalas:
+        print(f"Escala {factor}x...", file=sys.stderr)
+        resultados["escalas"][str(factor)] = medir_escala(factor, memoria, max_difuso, semilla)
+    return resultados
+
+
+def comparar(actual: Dict[str, Any], previo: Dict[str, Any]) -> List[str]:
+    """Líneas 'escala paso: antes -> ahora (cociente)' de los pasos presentes en ambos resultados."""
+    lineas = []
+    for escala, datos in actual["escalas"].items():
+        anteriores = previo.get("escalas", {}).get(escala, {}).get("pasos", {})
+        for paso, medida in datos["pasos"].items():
+            antes = anteriores.get(paso, {}).get("segundos")
+            if antes:
+                ahora = medida["segundos"]
+                lineas.append(f"{escala}x {paso}: {antes:.3f}s -> {ahora:.3f}s ({ahora / antes:.2f}x)")
+    return lineas
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de carga, filtros, cruces y agregaciones.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--salida", default=SALIDA, help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    parser.add_argument("--max-difuso", type=int, default=MAX_FILAS_DIFUSO, help="filas de laboratorio en el difuso")
+    parser.add_argument("--memoria", choices=MODOS_MEMORIA, default="rss",
+                        help="rss: muestreo del proceso (Linux); tracemalloc: portable pero frena los pasos")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.escalas, args.memoria, args.max_difuso, args.semilla)
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as fh:
+        json.dump(resultados, fh, ensure_ascii=False, indent=1)
+
+    for escala, datos in resultados["escalas"].items():
+        print(f"\n{escala}x — laboratorio {datos['filas_lab']} filas, exhumaciones {datos['filas_exh']} filas")
+        for paso, medida in datos["pasos"].items():
+            pico = medida["memoria_pico_mb"]
+            print(f"  {paso:<26} {medida['segundos']:>9.3f} s  {medida['filas_por_s'] or 0:>12,} filas/s"
+                  + (f"  {pico:>8.1f} MB" if pico is not None else ""))
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as fh:
+            previo = json.load(fh)
+        print("\nComparación con", args.comparar)
+        print("\n".join(comparar(resultados, previo)) or "  (sin pasos en común)")
+    print(f"\nResultados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -------------------------------------------------------------
+# Índice de búsqueda de texto completo sobre un DataFrame cargado
+# Texto normalizado una sola vez; consultas vectorizadas.
+# -------------------------------------------------------------
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from geih.texto import normalizar_serie, normalizar_texto
+
+# Separa columnas en el texto concatenado: una consulta no cruza columnas
+SEPARADOR = "\x1f"
+_NO_PALABRA = r"[^A-Z0-9]+"
+
+
+class IndiceBusqueda:
+    """
+    Índice construido una vez por dataset:
+      - texto: columna con todas las columnas de texto normalizadas
+        (sin tildes, mayúsculas) y concatenadas por fila;
+      - índice invertido palabra -> posiciones, creado al primer uso,
+        para consultas de palabras completas.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas: Optional[Sequence[str]] = None):
+        if columnas is None:
+            columnas = df.select_dtypes(include=["object", "string"]).columns
+        partes = [normalizar_serie(df[c]) for c in columnas]
+        if partes:
+            texto = partes[0].str.cat(partes[1:], sep=SEPARADOR) if len(partes) > 1 else partes[0]
+        else:
+            texto = pd.Series("", index=df.index)
+        self.n = len(df)
+        self.texto = texto.reset_index(drop=True)
+        self._invertido: Optional[Dict[str, np.ndarray]] = None
+
+    def _indice_invertido(self) -> Dict[str, np.ndarray]:
+        if self._invertido is None:
+            palabras = self.texto.str.split(_NO_PALABRA, regex=True).explode()
+            palabras = palabras[palabras.notna() & (palabras != "")]
+            pares = pd.DataFrame({"palabra": palabras.to_numpy(), "pos": palabras.index.to_numpy()})
+            pares = pares.drop_duplicates()
+            self._invertido = {
+                palabra: np.sort(pares["pos"].to_numpy()[posiciones])
+                for palabra, posiciones in pares.groupby("palabra").indices.items()
+            }
+        return self._invertido
+
+    def buscar(self, consulta: str, palabras: bool = False) -> np.ndarray:
+        """
+        Máscara booleana de las filas que contienen la consulta.
+        palabras=False: subcadena (un solo escaneo vectorizado).
+        palabras=True: todas las palabras de la consulta, como palabras
+        completas (intersección de listas de posiciones).
+        """
+        q = normalizar_texto(consulta)
+        if not q:
+            return np.ones(self.n, dtype=bool)
+        if not palabras:
+            return self.texto.str.contains(q, regex=False).fillna(False).to_numpy(dtype=bool)
+
+        invertido = self._indice_invertido()
+        posiciones = None
+        for palabra in pd.Series([q]).str.split(_NO_PALABRA, regex=True)[0]:
+            if not palabra:
+                continue
+            lista = invertido.get(palabra, np.empty(0, dtype=np.int64))
+            posiciones = lista if posiciones is None else np.intersect1d(posiciones, lista, assume_unique=True)
+        mascara = np.zeros(self.n, dtype=bool)
+        if posiciones is not None:
+            mascara[posiciones] = True
+        return mascara
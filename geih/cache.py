@@ -0,0 +1,183 @@
+# -------------------------------------------------------------
+# Caché persistente en disco (Arrow IPC) de los CSV ya procesados
+# Clave: ruta/URL + etiqueta del procesamiento; validación por
+# mtime/tamaño, ETag y hash del contenido.
+# -------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import urllib.request
+from typing import Callable, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401  (registra pa.ipc)
+except ImportError:  # sin pyarrow se procesa siempre el CSV
+    pa = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("GEIH_CACHE_DIR", os.path.join(BASE_DIR, "data", ".cache"))
+
+# Se incrementa si cambia el formato del archivo de caché
+VERSION_FORMATO = 1
+
+
+def es_url(src: str) -> bool:
+    return src.startswith("http://") or src.startswith("https://")
+
+
+def hash_archivo(path: str, bloque: int = 1 << 20) -> str:
+    """SHA-256 del contenido, leído por bloques."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for trozo in iter(lambda: fh.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def validador_remoto(url: str, timeout: float = 5.0) -> Optional[str]:
+    """ETag (o Last-Modified) de una URL vía HEAD; None si no hay red."""
+    try:
+        req = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    except Exception:
+        return None
+
+
+def _rutas(src: str, etiqueta: str, cache_dir: str):
+    fuente = src if es_url(src) else os.path.abspath(src)
+    clave = hashlib.sha1(f"{fuente}|{etiqueta}".encode("utf-8")).hexdigest()[:20]
+    base = os.path.join(cache_dir, clave)
+    return fuente, base + ".arrow", base + ".json"
+
+
+def _leer_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_json(path: str, datos: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(datos, fh, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _serializable(s: pd.Series) -> pd.Series:
+    # Columnas object con tipos mezclados (números y texto) -> texto
+    if s.dtype == object:
+        return s.where(s.isna(), s.astype(str))
+    return s
+
+
+def escribir_arrow(df: pd.DataFrame, path: str) -> None:
+    """Guarda el DataFrame sin comprimir para poder mapearlo en memoria."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = [pa.array(_serializable(df.iloc[:, i]), from_pandas=True) for i in range(df.shape[1])]
+    tabla = pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(tmp, path)
+
+
+def leer_arrow(path: str) -> pd.DataFrame:
+    """Lee el archivo de caché mapeándolo en memoria (sin re-parsear)."""
+    tabla = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return tabla.to_pandas()
+
+
+def leer_con_cache(
+    src: str,
+    procesar: Callable[[str], pd.DataFrame],
+    etiqueta: str,
+    cache_dir: Optional[str] = None,
+    volcar: Optional[Callable[[str, str], None]] = None,
+) -> pd.DataFrame:
+    """
+    Devuelve procesar(src) usando la caché en disco cuando sigue vigente.
+
+    - Archivo local: vigente si coinciden mtime y tamaño; si no, se compara
+      el hash del contenido antes de volver a procesar.
+    - URL: vigente si coincide el ETag/Last-Modified; sin red se usa la copia.
+
+    'etiqueta' identifica el procesamiento (lector + normalización); si ese
+    código cambia, basta con cambiar la etiqueta para invalidar la caché.
+
+    Con 'volcar(src, ruta_arrow)' el archivo de caché lo escribe el propio
+    lector (p. ej. por trozos, ver geih.ingesta) y el DataFrame se lee
+    después mapeado en memoria; 'procesar' queda como respaldo si no se
+    puede escribir en disco.
+    """
+    if pa is None:
+        return procesar(src)
+
+    cache_dir = cache_dir or CACHE_DIR
+    fuente, ruta_arrow, ruta_meta = _rutas(src, etiqueta, cache_dir)
+    meta = _leer_json(ruta_meta)
+    hay_copia = meta.get("formato") == VERSION_FORMATO and os.path.exists(ruta_arrow)
+
+    nueva = {"formato": VERSION_FORMATO, "fuente": fuente, "etiqueta": etiqueta}
+    if es_url(src):
+        nueva["etag"] = validador_remoto(src)
+        vigente = hay_copia and (nueva["etag"] is None or nueva["etag"] == meta.get("etag"))
+        if nueva["etag"] is None:
+            nueva["etag"] = meta.get("etag")
+    else:
+        if not os.path.exists(src):
+            return procesar(src)
+        st_src = os.stat(src)
+        nueva.update(mtime_ns=st_src.st_mtime_ns, tamano=st_src.st_size)
+        vigente = hay_copia and meta.get("mtime_ns") == st_src.st_mtime_ns and meta.get("tamano") == st_src.st_size
+        if not vigente:
+            nueva["sha256"] = hash_archivo(src)
+            vigente = hay_copia and meta.get("sha256") == nueva["sha256"]
+            if vigente:
+                # Mismo contenido con otra fecha: solo se actualiza el manifiesto
+                _guardar_silencioso(_escribir_json, ruta_meta, {**meta, **nueva})
+
+    if vigente:
+        try:
+            return leer_arrow(ruta_arrow)
+        except Exception:
+            pass  # copia dañada: se vuelve a procesar
+
+    if volcar is not None:
+        if _guardar_silencioso(_volcar, volcar, src, ruta_arrow):
+            _guardar_silencioso(_escribir_json, ruta_meta, nueva)
+            return leer_arrow(ruta_arrow)
+
+    df = procesar(src)
+    if df is not None and not df.empty:
+        if _guardar_silencioso(escribir_arrow, df, ruta_arrow):
+            _guardar_silencioso(_escribir_json, ruta_meta, nueva)
+    return df
+
+
+def _volcar(volcar: Callable[[str, str], None], src: str, ruta_arrow: str) -> None:
+    # Escribe en .tmp y renombra: un volcado interrumpido no deja copia a medias
+    tmp = ruta_arrow + ".volcado"
+    os.makedirs(os.path.dirname(ruta_arrow), exist_ok=True)
+    try:
+        volcar(src, tmp)
+        os.replace(tmp, ruta_arrow)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _guardar_silencioso(funcion, *args) -> bool:
+    # La caché es opcional: un disco de solo lectura no debe romper el tablero
+    try:
+        funcion(*args)
+        return True
+    except Exception:
+        return False
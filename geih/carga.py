@@ -0,0 +1,92 @@
+# -------------------------------------------------------------
+# Carga normalizada de las exportaciones (sin Streamlit)
+# Fuente (URL vía espejo local, ruta o data/<ruta>) -> lector ->
+# encabezados renombrados -> columnas 'category', a través de la
+# caché en disco; los archivos grandes se leen por trozos.
+# -------------------------------------------------------------
+
+import os
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from geih.cache import BASE_DIR, es_url, leer_con_cache
+from geih.categorias import categorizar
+from geih.dialecto import leer_csv_detectado
+from geih.espejo import obtener
+from geih.ingesta import cargar_por_trozos, usar_trozos
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+
+def resolver_fuente(src: str, data_dir: str = DATA_DIR) -> Optional[str]:
+    """
+    Ruta local de 'src': la copia en data/espejo si es URL (revalidada
+    con GET condicional, ver geih.espejo), la ruta tal cual o dentro de
+    data_dir si es relativa. None si no existe.
+    """
+    if es_url(src):
+        return obtener(src)
+    candidatas = [src]
+    if not os.path.isabs(src):
+        candidatas.append(os.path.join(data_dir, src))
+    for ruta in candidatas:
+        if os.path.exists(ruta):
+            return ruta
+    return None
+
+
+# Nombres finales de un encabezado completo (p. ej. geih.esquema.ESQUEMA.nombres)
+Renombrar = Callable[[Sequence[str]], List[str]]
+
+
+def renombrar_columnas(df: pd.DataFrame, renombrar: Renombrar) -> pd.DataFrame:
+    """Renombra el encabezado completo con 'renombrar' (en sitio) y devuelve df."""
+    df.columns = renombrar(list(df.columns))
+    return df
+
+
+def cargar(
+    src: str,
+    renombrar: Renombrar,
+    etiqueta: str,
+    conservar: Optional[Callable[[str], bool]] = None,
+    esperadas: Iterable[str] = (),
+    leer: Optional[Callable[[str], pd.DataFrame]] = None,
+    data_dir: str = DATA_DIR,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    DataFrame normalizado de 'src' (ver resolver_fuente), servido desde la
+    caché en disco si el archivo no cambió. 'leer(ruta)' es el lector (por
+    defecto leer_csv_detectado validando 'esperadas'); 'etiqueta' identifica
+    lector + renombrar en la caché. Con 'conservar', los archivos grandes
+    (geih.ingesta.UMBRAL_TROZOS) se leen por trozos y solo con las columnas
+    cuyo nombre renombrado lo cumple. DataFrame vacío si no se encuentra o
+    no se puede leer: el aviso lo muestra la vista.
+    """
+    esperadas = list(esperadas)
+    try:
+        ruta = resolver_fuente(src, data_dir) if src else None
+    except Exception:
+        ruta = None
+    if ruta is None:
+        return pd.DataFrame()
+
+    if conservar is not None and usar_trozos(ruta):
+        try:
+            return cargar_por_trozos(ruta, renombrar, conservar, etiqueta, esperadas=esperadas, cache_dir=cache_dir)
+        except Exception:
+            return pd.DataFrame()
+
+    def procesar(r: str) -> pd.DataFrame:
+        try:
+            df = leer(r) if leer is not None else leer_csv_detectado(r, esperadas=esperadas)
+        except Exception:
+            return pd.DataFrame()
+        return categorizar(renombrar_columnas(df, renombrar))
+
+    try:
+        return leer_con_cache(ruta, procesar, etiqueta, cache_dir)
+    except Exception:
+        return pd.DataFrame()
@@ -0,0 +1,64 @@
+# -------------------------------------------------------------
+# Columnas de baja cardinalidad como pandas 'category'
+# Se limpian una vez al cargar; los gráficos trabajan sobre códigos.
+# -------------------------------------------------------------
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from geih.texto import normalizar_unicos
+
+SIN_DATO = "SIN DATO"
+
+# Nombres tal como quedan tras la normalización de cada tablero
+COLUMNAS_CATEGORICAS = (
+    "ESTADO",
+    "LEY",
+    "DEPARTAMENTO",
+    "MUNICIPIO EXHUMACION",
+    "MUNICIPIO DE EXHUMACIÓN",
+    "MUNICIPIO DE LA DILIGENCIA",
+    "ZONA",
+    "TIPO INHUMACION",
+    "TIPO INHUMACIÓN",
+)
+
+
+def categoria(serie: pd.Series) -> pd.Series:
+    """
+    Vocabulario canónico: texto en mayúsculas, sin espacios sobrantes,
+    vacíos/nulos como SIN DATO. Si la Serie ya es categórica se devuelve
+    tal cual, de modo que los gráficos pueden llamarla en cada rerun.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+        serie = serie.astype("Int64")  # LEY 600.0 -> "600"
+    # Se limpia cada valor distinto una vez (con tildes: solo espacios y mayúsculas)
+    codigos, valores = normalizar_unicos(serie, quitar_tildes=False)
+    valores[valores == ""] = SIN_DATO
+    if (codigos < 0).any():
+        valores = np.append(valores, SIN_DATO)  # los nulos (código -1) toman el último
+    categorias, por_valor = np.unique(valores, return_inverse=True)
+    return pd.Series(
+        pd.Categorical.from_codes(por_valor[codigos], categories=categorias),
+        index=serie.index,
+        name=serie.name,
+    )
+
+
+def categorizar(df: pd.DataFrame, columnas: Iterable[str] = COLUMNAS_CATEGORICAS) -> pd.DataFrame:
+    """Convierte a 'category' las columnas presentes (en sitio) y devuelve df."""
+    for col in columnas:
+        if col in df.columns and isinstance(df[col], pd.Series):
+            df[col] = categoria(df[col])
+    return df
+
+
+def conteos(serie: pd.Series, normalizar: bool = False) -> pd.Series:
+    """value_counts sin las categorías ausentes (p. ej. tras filtrar)."""
+    vc = serie.value_counts()
+    vc = vc[vc > 0]
+    return vc / vc.sum() if normalizar and vc.sum() else vc
@@ -0,0 +1,206 @@
+# -------------------------------------------------------------
+# Consolidación nacional: N exportaciones regionales (CSV/XLSX)
+# Cada archivo se lee como texto, sus encabezados se alinean con
+# los sinónimos del esquema, las columnas de fecha se parsean con
+# un formato explícito y todo se copia a columnas ya reservadas.
+# El resultado se guarda en la caché Arrow por contenido.
+# -------------------------------------------------------------
+
+import hashlib
+import io
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from geih.cache import CACHE_DIR, escribir_arrow, leer_arrow, pa
+from geih.categorias import categorizar
+from geih.dialecto import detectar_dialecto
+from geih.esquema import ESQUEMA, SINONIMOS
+
+CARPETA = "combinado"
+# Identifica la lectura + alineación en la caché; cambiarla si cambia este módulo
+ETIQUETA = "combinacion-v5"
+COLUMNA_ARCHIVO = "ARCHIVO"
+PREFIJO_FECHA = "FECHA"
+# Día antes que mes: el orden decide los casos ambiguos (04/01/1996)
+FORMATOS_FECHA = (
+    "%d/%m/%Y",
+    "%Y-%m-%d",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%y",
+    "%d-%m-%y",
+)
+TAM_MUESTRA_FECHAS = 500
+# Fracción mínima de la muestra que debe parsear un formato para aceptarlo
+MIN_FECHAS_VALIDAS = 0.9
+
+Archivo = Tuple[str, bytes]
+
+
+def es_excel(nombre: str) -> bool:
+    return nombre.lower().endswith((".xlsx", ".xlsm", ".xls"))
+
+
+def leer_archivo(nombre: str, datos: bytes) -> pd.DataFrame:
+    """Un archivo subido como texto (sin inferir tipos); el dialecto de los CSV se detecta."""
+    if es_excel(nombre):
+        return pd.read_excel(io.BytesIO(datos), dtype=str)
+    dialecto = detectar_dialecto(datos, SINONIMOS.keys())
+    return pd.read_csv(io.BytesIO(datos), encoding=dialecto.encoding, sep=dialecto.sep, dtype=str)
+
+
+def alinear_encabezados(columnas: Sequence) -> List[str]:
+    """
+    Nombres estándar de un encabezado (geih.esquema, resuelto una vez por
+    encabezado). Si dos columnas del archivo llevan al mismo campo (p. ej.
+    "CASO LIMS" y "CASO"), solo el sinónimo preferido se renombra; las
+    demás conservan su nombre normalizado.
+    """
+    return ESQUEMA.nombres(columnas)
+
+
+def tiene_valores(serie: pd.Series) -> bool:
+    """True si la columna trae algún valor no nulo ni en blanco."""
+    return bool(serie.dropna().str.strip().ne("").any())
+
+
+def formatos_fecha(serie: pd.Series, formatos: Sequence[str] = FORMATOS_FECHA) -> Optional[List[str]]:
+    """
+    Formatos, en orden, que cubren al menos MIN_FECHAS_VALIDAS de una muestra
+    de valores distintos: cada uno se prueba sobre lo que los anteriores no
+    parsearon (exportaciones con "19/06/2014" y "10-03-2014" mezclados).
+    None si no se alcanza (la columna se deja como texto).
+    """
+    muestra = serie.dropna().str.strip().drop_duplicates()
+    muestra = muestra[muestra != ""].head(TAM_MUESTRA_FECHAS)
+    if muestra.empty:
+        return None
+    elegidos, pendientes = [], muestra
+    for formato in formatos:
+        validas = pd.to_datetime(pendientes, format=formato, errors="coerce").notna()
+        if validas.any():
+            elegidos.append(formato)
+            pendientes = pendientes[~validas]
+        if len(pendientes) <= (1 - MIN_FECHAS_VALIDAS) * len(muestra):
+            return elegidos
+    return None
+
+
+def parsear_fechas(serie: pd.Series, formatos: Sequence[str]) -> pd.Series:
+    """datetime64 con los formatos dados, en orden; lo que ninguno parsea queda NaT."""
+    texto = serie.str.strip()
+    fechas = pd.to_datetime(texto, format=formatos[0], errors="coerce")
+    for formato in formatos[1:]:
+        faltan = fechas.isna() & texto.notna()
+        if not faltan.any():
+            break
+        fechas[faltan] = pd.to_datetime(texto[faltan], format=formato, errors="coerce")
+    return fechas
+
+
+def combinar(archivos: Sequence[Archivo]) -> pd.DataFrame:
+    """
+    Une las exportaciones en un solo DataFrame:
+      - columnas: unión de los encabezados estándar en orden de aparición,
+        más ARCHIVO (origen de cada fila);
+      - FECHA*: datetime64 con el formato detectado por archivo y columna
+        (texto si en algún archivo con valores ningún formato la cubre);
+      - resto: texto, y 'category' en las columnas de COLUMNAS_CATEGORICAS.
+    Las columnas se reservan con el total de filas y cada archivo se copia
+    en su tramo, sin concatenaciones intermedias.
+    """
+    partes = []
+    for nombre, datos in archivos:
+        df = leer_archivo(nombre, datos)
+        df.columns = alinear_encabezados(df.columns)
+        partes.append((nombre, df))
+
+    columnas: Dict[str, None] = {}
+    for _, df in partes:
+        columnas.update(dict.fromkeys(df.columns))
+    total = sum(len(df) for _, df in partes)
+
+    # Fecha o texto se decide por columna antes de copiar: si algún archivo
+    # trae valores sin formato reconocible, la columna queda como texto en
+    # todos (con los valores originales de cada archivo). Un archivo con la
+    # columna vacía no decide nada: sus filas quedan NaT.
+    formatos: List[Dict[str, List[str]]] = [{} for _ in partes]
+    fechas = {c for c in columnas if c.startswith(PREFIJO_FECHA)}
+    for i, (_, df) in enumerate(partes):
+        for c in fechas.intersection(df.columns):
+            if not tiene_valores(df[c]):
+                continue
+            encontrados = formatos_fecha(df[c])
+            if encontrados is None:
+                fechas.discard(c)
+            else:
+                formatos[i][c] = encontrados
+    # Sin valores en ningún archivo: texto, como antes
+    fechas = {c for c in fechas if any(c in f for f in formatos)}
+
+    salida = {
+        c: np.full(total, np.datetime64("NaT"), dtype="datetime64[ns]") if c in fechas
+        else np.full(total, None, dtype=object)
+        for c in columnas
+    }
+    origen = np.empty(total, dtype=object)
+    inicio = 0
+    for i, (nombre, df) in enumerate(partes):
+        fin = inicio + len(df)
+        origen[inicio:fin] = nombre
+        for c in df.columns:
+            col = df[c]
+            if c in fechas:
+                if c in formatos[i]:
+                    salida[c][inicio:fin] = parsear_fechas(col, formatos[i][c]).to_numpy(dtype="datetime64[ns]")
+            else:
+                salida[c][inicio:fin] = col.to_numpy(dtype=object)
+        inicio = fin
+
+    combinado = pd.DataFrame({
+        c: valores if c in fechas else pd.Series(valores, dtype="str")
+        for c, valores in salida.items()
+    })
+    combinado[COLUMNA_ARCHIVO] = pd.Categorical(origen)
+    return categorizar(combinado)
+
+
+def clave_combinacion(archivos: Sequence[Archivo]) -> str:
+    """Clave del resultado: contenido y nombre de cada archivo, en orden."""
+    h = hashlib.sha1(ETIQUETA.encode("utf-8"))
+    for nombre, datos in archivos:
+        h.update(nombre.encode("utf-8"))
+        h.update(hashlib.sha256(datos).digest())
+    return h.hexdigest()[:20]
+
+
+def combinar_con_cache(
+    archivos: Sequence[Archivo],
+    clave: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    combinar() guardado en la caché Arrow por clave de contenido (la de
+    clave_combinacion si no se pasa): la misma selección de archivos se
+    lee mapeada en memoria, sin volver a parsear.
+    """
+    if pa is None:
+        return combinar(archivos)
+    clave = clave or clave_combinacion(archivos)
+    ruta = os.path.join(cache_dir or CACHE_DIR, CARPETA, clave + ".arrow")
+    if os.path.exists(ruta):
+        try:
+            return leer_arrow(ruta)
+        except (OSError, pa.ArrowInvalid):
+            pass
+    combinado = combinar(archivos)
+    try:
+        escribir_arrow(combinado, ruta)
+    except OSError:
+        pass  # sin disco se sigue con el resultado en memoria
+    return combinado
@@ -0,0 +1,95 @@
+# -------------------------------------------------------------
+# Componentes de Streamlit compartidos por los tableros
+# Único módulo de geih que importa streamlit: la lógica está en
+# los módulos puros (geih.tabla) y aquí solo se dibujan controles.
+# -------------------------------------------------------------
+
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+import streamlit as st
+
+from geih import perfil as _perfil
+from geih.tabla import TAM_PAGINA, TablaPaginada, paginas
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _tabla(df: pd.DataFrame, filtrables: tuple) -> TablaPaginada:
+    return TablaPaginada(df, filtrables)
+
+
+def tabla_paginada(
+    df: pd.DataFrame,
+    clave: str,
+    filtros: Optional[Dict[str, Any]] = None,
+    columnas: Optional[Sequence[str]] = None,
+    tam: int = TAM_PAGINA,
+) -> TablaPaginada:
+    """
+    Muestra df de a 'tam' filas con búsqueda, orden y selector de página.
+    'filtros' ({columna: valor}, "Todos" no filtra) y 'columnas' se aplican
+    sobre la misma tabla en caché, sin copiar df. 'clave' distingue los
+    controles de cada tabla en la página. Devuelve la TablaPaginada para
+    reutilizar sus índices (p. ej. porcentaje_nulos).
+    """
+    tabla = _tabla(df, tuple(filtros or {}))
+    visibles = [i for i, c in enumerate(df.columns) if columnas is None or c in columnas]
+
+    c_buscar, c_orden, c_sentido, c_pagina = st.columns([3, 2, 1, 1])
+    consulta = c_buscar.text_input("Buscar", key=f"{clave}_buscar")
+    orden = c_orden.selectbox(
+        "Ordenar por",
+        options=[None] + visibles,
+        format_func=lambda i: "(sin orden)" if i is None else str(df.columns[i]),
+        key=f"{clave}_orden",
+    )
+    descendente = c_sentido.checkbox("Descendente", key=f"{clave}_desc")
+
+    posiciones = tabla.posiciones(filtros, consulta, orden, not descendente)
+    total = len(posiciones)
+    n_paginas = paginas(total, tam)
+    # Si el filtro dejó menos páginas, se vuelve a la última antes de crear el control
+    clave_pagina = f"{clave}_pagina"
+    if st.session_state.get(clave_pagina, 1) > n_paginas:
+        st.session_state[clave_pagina] = n_paginas
+    pagina = c_pagina.number_input("Página", min_value=1, max_value=n_paginas, step=1, key=clave_pagina)
+
+    st.dataframe(tabla.ventana(posiciones, pagina, tam, columnas), use_container_width=True)
+    inicio = (pagina - 1) * tam
+    resumen = f"Filas {min(inicio + 1, total):,}–{min(inicio + tam, total):,} de {total:,}"
+    if total != tabla.n:
+        resumen += f" (filtradas de {tabla.n:,})"
+    st.caption(f"{resumen} · página {pagina} de {n_paginas}")
+    return tabla
+
+
+def iniciar_perfil(tablero: str) -> Optional[_perfil.Perfil]:
+    """
+    Perfil de esta ejecución si se pidió con ?perfil=1 en la URL o con la
+    variable de entorno GEIH_PERFIL; None (y sin costo) en otro caso.
+    """
+    pedido = str(st.query_params.get(_perfil.PARAMETRO_URL, "")).strip().lower()
+    activo = pedido not in ("", "0", "false", "no") or _perfil.activado_por_entorno()
+    return _perfil.iniciar(tablero, activo)
+
+
+def mostrar_perfil(perfil: Optional[_perfil.Perfil]) -> None:
+    """Cierra el perfil, muestra el desglose en la barra lateral y lo agrega al JSONL."""
+    if perfil is None:
+        return
+    resumen = perfil.terminar()
+    ruta = perfil.escribir()
+    total = resumen["total_ms"] or 1.0
+    secciones = pd.DataFrame(
+        {"ms": list(resumen["secciones"].values())},
+        index=pd.Index(list(resumen["secciones"]), name="sección"),
+    ).sort_values("ms", ascending=False)
+    secciones["%"] = (secciones["ms"] / total * 100).round(1)
+    with st.sidebar.expander(f"⏱ Perfil: {resumen['total_ms']:,.0f} ms", expanded=True):
+        st.dataframe(secciones, use_container_width=True)
+        if resumen["caches"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(resumen["caches"], orient="index")[["llamadas", "aciertos", "fallos"]],
+                use_container_width=True,
+            )
+        st.caption(f"Registrado en {ruta}" if ruta else "No se pudo escribir el registro JSONL.")
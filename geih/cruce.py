@@ -0,0 +1,118 @@
+# -------------------------------------------------------------
+# Cruce exacto laboratorio / exhumaciones por claves normalizadas
+# Las claves (criterio 1 tipo "caso", criterio 2 tipo "radicado")
+# se normalizan una vez por archivo y par de columnas y se resumen
+# en un hash int64; coincidencias y no coincidentes salen de un
+# solo hash join.
+# -------------------------------------------------------------
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from geih.texto import normalizar_serie
+
+CLAVE_1 = "_key_crit1"
+CLAVE_2 = "_key_crit2"
+
+
+def _por_valor(serie: pd.Series, normalizar: Callable[[pd.Series], pd.Series]) -> np.ndarray:
+    # Se normaliza cada valor distinto una vez y se reparte a las filas
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    unicos = pd.Series(unicos, dtype=object)
+    # Los nulos quedan como str(NaN) = "nan", igual que al normalizar fila por
+    # fila: cruzan con otros nulos pero no con celdas en blanco
+    unicos = unicos.where(unicos.notna(), "nan")
+    return normalizar(unicos).to_numpy(dtype=object)[codigos]
+
+
+def clave_caso(serie: pd.Series) -> np.ndarray:
+    """Criterio 1: sin saltos de línea ni espacios repetidos, minúsculas y sin tildes."""
+    return _por_valor(serie, lambda s: normalizar_serie(s, mayusculas=False))
+
+
+def clave_radicado(serie: pd.Series) -> np.ndarray:
+    """Criterio 2: el valor como texto, sin espacios a los lados."""
+    return _por_valor(serie, lambda s: s.astype(str).str.strip())
+
+
+class IndiceClaves:
+    """
+    Claves de cruce de un archivo para un par de columnas:
+      - crit1 / crit2: claves normalizadas (texto) por fila;
+      - hash: int64 de la pareja de claves, lo único que compara el join;
+      - orden: posiciones ordenadas por hash (estable), creado al usar el
+        archivo como lado de búsqueda.
+    """
+
+    def __init__(self, crit1: pd.Series, crit2: pd.Series):
+        self.n = len(crit1)
+        self.crit1 = clave_caso(crit1)
+        self.crit2 = clave_radicado(crit2)
+        claves = pd.DataFrame({CLAVE_1: self.crit1, CLAVE_2: self.crit2})
+        self.hash = pd.util.hash_pandas_object(claves, index=False).to_numpy().view(np.int64)
+        self._orden: Optional[np.ndarray] = None
+
+    @property
+    def orden(self) -> np.ndarray:
+        if self._orden is None:
+            self._orden = np.argsort(self.hash, kind="stable")
+        return self._orden
+
+    def claves(self, posiciones: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Columnas _key_crit1 / _key_crit2 de las filas pedidas (todas si None)."""
+        pos = slice(None) if posiciones is None else np.asarray(posiciones, dtype=np.int64)
+        return pd.DataFrame({CLAVE_1: self.crit1[pos], CLAVE_2: self.crit2[pos]})
+
+
+@dataclass(frozen=True)
+class Cruce:
+    """Resultado del hash join como posiciones: pares (izquierda, derecha) y anti-join."""
+    izquierda: np.ndarray
+    derecha: np.ndarray
+    sin_pareja: np.ndarray
+
+
+def cruzar(izq: IndiceClaves, der: IndiceClaves) -> Cruce:
+    """
+    Join interno por (crit1, crit2) en el orden de merge(how="inner"):
+    filas de la izquierda en su orden y, para cada una, sus parejas de la
+    derecha en el orden original. Los pares cuyo texto no coincide
+    (colisión de hash) se descartan.
+    """
+    ordenadas = der.hash[der.orden]
+    inicio = np.searchsorted(ordenadas, izq.hash, side="left")
+    cuantos = np.searchsorted(ordenadas, izq.hash, side="right") - inicio
+
+    pares_izq = np.repeat(np.arange(izq.n), cuantos)
+    desfase = np.arange(len(pares_izq)) - np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+    pares_der = der.orden[np.repeat(inicio, cuantos) + desfase]
+
+    iguales = (izq.crit1[pares_izq] == der.crit1[pares_der]) & (izq.crit2[pares_izq] == der.crit2[pares_der])
+    pares_izq, pares_der = pares_izq[iguales], pares_der[iguales]
+
+    con_pareja = np.zeros(izq.n, dtype=bool)
+    con_pareja[pares_izq] = True
+    return Cruce(pares_izq, pares_der, np.flatnonzero(~con_pareja))
+
+
+def unir(
+    df_izq: pd.DataFrame,
+    df_der: pd.DataFrame,
+    cruce: Cruce,
+    indice_izq: IndiceClaves,
+    sufijos: Sequence[str] = ("_lab", "_exh"),
+) -> pd.DataFrame:
+    """
+    Materializa los pares como merge(on=[_key_crit1, _key_crit2],
+    suffixes=sufijos): columnas de la izquierda, las dos claves y las de
+    la derecha; los nombres repetidos llevan sufijo.
+    """
+    repetidas = set(df_izq.columns) & set(df_der.columns)
+    izq = df_izq.iloc[cruce.izquierda].reset_index(drop=True)
+    der = df_der.iloc[cruce.derecha].reset_index(drop=True)
+    izq.columns = [f"{c}{sufijos[0]}" if c in repetidas else c for c in izq.columns]
+    der.columns = [f"{c}{sufijos[1]}" if c in repetidas else c for c in der.columns]
+    return pd.concat([izq, indice_izq.claves(cruce.izquierda), der], axis=1)
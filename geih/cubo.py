@@ -0,0 +1,123 @@
+# -------------------------------------------------------------
+# Cubo de resumen: conteos pre-agregados por dimensiones
+# Se construye una vez por carga; los KPI y gráficos se responden
+# rebanando el cubo en lugar de recorrer las filas.
+# -------------------------------------------------------------
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from geih.filtros import TODOS
+
+Dimensiones = Union[str, Sequence[str]]
+
+
+class Cubo:
+    """
+    Agrupa el DataFrame por todas las dimensiones a la vez (una celda por
+    combinación observada) con el número de filas 'N' y la suma de cada
+    medida. Las etiquetas se guardan aparte, las celdas solo llevan códigos.
+    Los valores nulos de una dimensión tienen código -1 y no se cuentan
+    al consultar esa dimensión (como value_counts).
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        dimensiones: Sequence[str],
+        medidas: Sequence[str] = (),
+        max_resultados: int = 128,
+    ):
+        self.dimensiones = [d for d in dimensiones if d in df.columns]
+        self.medidas = [m for m in medidas if m in df.columns]
+        self.etiquetas: Dict[str, pd.Index] = {}
+        codigos = {}
+        for d in self.dimensiones:
+            if isinstance(df[d].dtype, pd.CategoricalDtype):
+                codigos[d] = df[d].cat.codes.to_numpy()
+                self.etiquetas[d] = df[d].cat.categories
+            else:
+                codigos[d], self.etiquetas[d] = pd.factorize(df[d])
+        base = pd.DataFrame(codigos, index=df.index)
+        for m in self.medidas:
+            base[m] = pd.to_numeric(df[m], errors="coerce").fillna(0)
+        base["N"] = 1
+        if self.dimensiones:
+            self.celdas = base.groupby(self.dimensiones, sort=False).sum().reset_index()
+        else:
+            self.celdas = base[["N"] + self.medidas].sum().to_frame().T
+        # Resultados por (consulta, filtros): el cubo vive entre sesiones, así que se acota (LRU)
+        self._resultados: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._max = max_resultados
+
+    def _memo(self, clave: Hashable, calcular) -> Any:
+        if clave in self._resultados:
+            self._resultados.move_to_end(clave)
+            return self._resultados[clave]
+        resultado = calcular()
+        self._resultados[clave] = resultado
+        if len(self._resultados) > self._max:
+            self._resultados.popitem(last=False)
+        return resultado
+
+    def _codigo(self, dim: str, valor: Any) -> int:
+        return int(self.etiquetas[dim].get_indexer([valor])[0])
+
+    def _activos(self, filtros: Optional[Dict[str, Any]]) -> tuple:
+        return tuple(sorted(
+            (d, v) for d, v in (filtros or {}).items()
+            if v is not None and v != TODOS and d in self.etiquetas
+        ))
+
+    def _rebanada(self, activos: tuple) -> pd.DataFrame:
+        celdas = self.celdas
+        for d, v in activos:
+            codigo = self._codigo(d, v)
+            if codigo < 0:
+                # Valor ausente: vacío, como MotorFiltros (-1 es el código de los nulos)
+                return celdas.iloc[0:0]
+            celdas = celdas[celdas[d].to_numpy() == codigo]
+        return celdas
+
+    def conteo(
+        self,
+        dims: Dimensiones,
+        filtros: Optional[Dict[str, Any]] = None,
+        medida: str = "N",
+    ) -> pd.Series:
+        """
+        Conteos (o suma de 'medida') por una o varias dimensiones, de mayor
+        a menor y sin combinaciones vacías; equivale a
+        df[filtros][dims].value_counts() sin recorrer las filas.
+        """
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        activos = self._activos(filtros)
+        def calcular():
+            celdas = self._rebanada(activos)
+            validas = np.ones(len(celdas), dtype=bool)
+            for d in dims:
+                validas &= celdas[d].to_numpy() >= 0
+            agrupado = celdas[validas].groupby(dims, sort=False)[medida].sum()
+            agrupado = agrupado[agrupado > 0].sort_values(ascending=False, kind="stable")
+            if len(dims) == 1:
+                indice = pd.Index(self.etiquetas[dims[0]].take(agrupado.index.to_numpy()), name=dims[0])
+            else:
+                indice = pd.MultiIndex.from_arrays(
+                    [self.etiquetas[d].take(agrupado.index.get_level_values(d).to_numpy()) for d in dims],
+                    names=dims,
+                )
+            nombre = "count" if medida == "N" else medida  # como value_counts
+            return pd.Series(agrupado.to_numpy(), index=indice, name=nombre)
+        return self._memo(("conteo", tuple(dims), activos, medida), calcular)
+
+    def total(self, filtros: Optional[Dict[str, Any]] = None, medida: str = "N") -> float:
+        activos = self._activos(filtros)
+        return self._memo(("total", activos, medida), lambda: self._rebanada(activos)[medida].sum())
+
+    def moda(self, dim: str, filtros: Optional[Dict[str, Any]] = None) -> Tuple[Any, int]:
+        """Valor más frecuente de 'dim' y su conteo (None, 0 si no hay datos)."""
+        vc = self.conteo(dim, filtros)
+        return (vc.index[0], int(vc.iloc[0])) if len(vc) else (None, 0)
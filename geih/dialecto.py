@@ -0,0 +1,194 @@
+# -------------------------------------------------------------
+# Detección de dialecto CSV (BOM, codificación, separador)
+# Se descarga/lee el archivo una sola vez y se parsea una sola vez.
+# -------------------------------------------------------------
+
+import codecs
+import csv
+import io
+import json
+import os
+import urllib.request
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from geih.cache import CACHE_DIR, es_url
+from geih.texto import normalizar_texto
+
+SEPARADORES = (";", ",", "\t", "|")
+TAM_MUESTRA = 64 * 1024
+REGISTRO_DIALECTOS = "dialectos.json"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass
+class Dialecto:
+    encoding: str
+    sep: str
+
+
+def leer_bytes(src: str, timeout: float = 30.0) -> bytes:
+    """Contenido completo de una URL o ruta local (una sola lectura)."""
+    if es_url(src):
+        with urllib.request.urlopen(src, timeout=timeout) as resp:
+            return resp.read()
+    with open(src, "rb") as fh:
+        return fh.read()
+
+
+def _decodificar_muestra(datos: bytes, encoding: str) -> str:
+    # Decodificador incremental: un carácter multibyte cortado al final
+    # de la muestra no cuenta como error
+    dec = codecs.getincrementaldecoder(encoding)()
+    return dec.decode(datos[:TAM_MUESTRA], final=len(datos) <= TAM_MUESTRA)
+
+
+def detectar_encoding(datos: bytes) -> str:
+    for bom, encoding in _BOMS:
+        if datos.startswith(bom):
+            return encoding
+    try:
+        _decodificar_muestra(datos, "utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _registros(texto: str, sep: str, n: int = 20) -> List[List[str]]:
+    lector = csv.reader(io.StringIO(texto), delimiter=sep)
+    filas = []
+    try:
+        for fila in lector:
+            filas.append(fila)
+            if len(filas) >= n:
+                break
+    except csv.Error:
+        pass
+    # La última fila puede venir cortada por el tamaño de la muestra
+    return filas[:-1] if len(filas) > 2 else filas
+
+
+def coincidencias(encabezado: Iterable[str], esperadas: Iterable[str]) -> int:
+    """Cuántas columnas del encabezado están entre las esperadas (normalizadas)."""
+    objetivo = {normalizar_texto(c) for c in esperadas}
+    return sum(normalizar_texto(c) in objetivo for c in encabezado)
+
+
+def detectar_dialecto(datos: bytes, esperadas: Iterable[str] = ()) -> Dialecto:
+    """
+    Elige codificación y separador a partir de una muestra. Gana el
+    separador cuyo encabezado reconoce más columnas esperadas; luego el
+    que da filas de ancho constante y, por último, más columnas.
+    Lanza ValueError si hay columnas esperadas y ninguna aparece.
+    """
+    esperadas = list(esperadas)
+    encoding = detectar_encoding(datos)
+    texto = _decodificar_muestra(datos, encoding).lstrip("\ufeff")
+
+    mejor, mejor_puntaje = None, None
+    for sep in SEPARADORES:
+        filas = _registros(texto, sep)
+        if not filas:
+            continue
+        ancho = len(filas[0])
+        constantes = sum(len(f) == ancho for f in filas[1:]) / max(len(filas) - 1, 1)
+        puntaje = (coincidencias(filas[0], esperadas), constantes, ancho)
+        if mejor_puntaje is None or puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = sep, puntaje
+
+    if mejor is None:
+        raise ValueError("El archivo está vacío.")
+    if esperadas and mejor_puntaje[0] == 0:
+        raise ValueError("Ningún separador produce las columnas esperadas.")
+    return Dialecto(encoding=encoding, sep=mejor)
+
+
+# ----------------------------
+# Registro de dialectos ya detectados
+# ----------------------------
+def _ruta_registro(cache_dir: Optional[str]) -> str:
+    return os.path.join(cache_dir or CACHE_DIR, REGISTRO_DIALECTOS)
+
+
+def dialecto_registrado(src: str, cache_dir: Optional[str] = None) -> Optional[Dialecto]:
+    try:
+        with open(_ruta_registro(cache_dir), "r", encoding="utf-8") as fh:
+            datos = json.load(fh).get(src)
+        return Dialecto(**datos) if datos else None
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def registrar_dialecto(src: str, dialecto: Dialecto, cache_dir: Optional[str] = None) -> None:
+    ruta = _ruta_registro(cache_dir)
+    try:
+        with open(ruta, "r", encoding="utf-8") as fh:
+            registro = json.load(fh)
+    except (OSError, ValueError):
+        registro = {}
+    registro[src] = asdict(dialecto)
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        tmp = ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(registro, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp, ruta)
+    except OSError:
+        pass  # el registro es solo una optimización
+
+
+def leer_muestra(src: str, tam: int = TAM_MUESTRA + 1) -> bytes:
+    """Primeros bytes de un archivo local, suficientes para detectar el dialecto."""
+    with open(src, "rb") as fh:
+        return fh.read(tam)
+
+
+def resolver_dialecto(
+    src: str,
+    datos: bytes,
+    esperadas: Iterable[str] = (),
+    cache_dir: Optional[str] = None,
+) -> Dialecto:
+    """
+    Dialecto registrado para src si su encabezado sigue reconociéndose en
+    'datos' (contenido o muestra); si no, se detecta y se registra.
+    """
+    esperadas = list(esperadas)
+    dialecto = dialecto_registrado(src, cache_dir)
+    if dialecto is not None:
+        # Comprobación barata: el encabezado sigue siendo reconocible
+        try:
+            texto = _decodificar_muestra(datos, dialecto.encoding).lstrip("\ufeff")
+            filas = _registros(texto, dialecto.sep, n=2)
+            if not filas or (esperadas and coincidencias(filas[0], esperadas) == 0):
+                dialecto = None
+        except UnicodeDecodeError:
+            dialecto = None
+
+    if dialecto is None:
+        dialecto = detectar_dialecto(datos, esperadas)
+        registrar_dialecto(src, dialecto, cache_dir)
+    return dialecto
+
+
+def leer_csv_detectado(
+    src: str,
+    esperadas: Iterable[str] = (),
+    cache_dir: Optional[str] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Lee el CSV una sola vez: bytes -> dialecto (registrado o detectado y
+    validado contra 'esperadas') -> un único pd.read_csv. Los kwargs se
+    pasan a read_csv.
+    """
+    datos = leer_bytes(src)
+    dialecto = resolver_dialecto(src, datos, esperadas, cache_dir)
+    return pd.read_csv(io.BytesIO(datos), encoding=dialecto.encoding, sep=dialecto.sep, **kwargs)
@@ -0,0 +1,228 @@
+# -------------------------------------------------------------
+# Coincidencia aproximada (difusa) entre laboratorio y exhumaciones
+# Poda vectorizada con rapidfuzz + bloqueo de candidatos; la
+# puntuación final es la de difflib, como el cruce original
+# -------------------------------------------------------------
+
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from geih.texto import normalizar_serie
+
+# Modos de bloqueo disponibles (clave -> descripción para la interfaz)
+MODOS_BLOQUEO: Dict[str, str] = {
+    "inicial": "Primera letra del texto normalizado",
+    "token": "Primera palabra del texto normalizado",
+    "columna": "Valor de una columna (p. ej. municipio)",
+    "ninguno": "Sin bloqueo (comparación exhaustiva)",
+}
+
+# Filas de laboratorio puntuadas por lote (limita la matriz en memoria)
+TAM_LOTE = 2048
+# Holgura de la poda (puntos de 0–100) por el redondeo de float32 en cdist
+HOLGURA_PODA = 0.01
+
+
+def texto_concatenado(df: pd.DataFrame, columnas: Sequence[str]) -> np.ndarray:
+    """Une las columnas elegidas con espacios, igual que el cruce original."""
+    if not columnas:
+        return np.full(len(df), "", dtype=object)
+    partes = [df[c].astype(str).fillna("nan") for c in columnas]
+    valores = partes[0].str.cat(partes[1:], sep=" ") if len(partes) > 1 else partes[0]
+    return valores.to_numpy(dtype=object)
+
+
+def claves_bloqueo(valores: Sequence[str], modo: str = "inicial") -> np.ndarray:
+    """
+    Calcula la clave de bloqueo de cada valor. Solo se comparan filas
+    que comparten clave; con modo 'ninguno' todas caen en el mismo bloque.
+    """
+    serie = normalizar_serie(pd.Series(list(valores), dtype=object))
+    if modo == "inicial":
+        claves = serie.str[:1]
+    elif modo == "token":
+        claves = serie.str.split(" ", n=1).str[0]
+    elif modo == "columna":
+        # 'valores' ya trae el contenido de la columna de bloqueo
+        claves = serie
+    else:
+        claves = pd.Series("", index=serie.index)
+    return claves.fillna("").to_numpy(dtype=object)
+
+
+def _agrupar(claves: np.ndarray) -> Dict[str, np.ndarray]:
+    codigos, uniques = pd.factorize(claves)
+    orden = np.argsort(codigos, kind="stable")
+    cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+    return {uniques[codigos[g[0]]]: g for g in np.split(orden, cortes) if len(g)}
+
+
+class PoolCandidatos:
+    """
+    Candidatos de exhumaciones preparados una sola vez: texto concatenado,
+    máscara de disponibles y grupos por bloque. El emparejamiento devuelve
+    posiciones directamente, sin buscar la fila por su valor; retirar una
+    fila ya emparejada es O(1) y reiniciar() la vuelve a habilitar.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas: Sequence[str]):
+        self.df = df
+        self.valores = texto_concatenado(df, columnas)
+        self.disponibles = np.ones(len(df), dtype=bool)
+        self.grupos = _agrupar(np.zeros(len(df), dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def bloquear(self, bloques: Sequence[str]) -> None:
+        """Agrupa los candidatos por clave de bloqueo (ver claves_bloqueo)."""
+        self.grupos = _agrupar(np.asarray(bloques, dtype=object))
+
+    def retirar(self, pos: int) -> None:
+        self.disponibles[pos] = False
+
+    def reiniciar(self) -> None:
+        """Vuelve a marcar todos los candidatos como disponibles."""
+        self.disponibles[:] = True
+
+    def filas(self, posiciones: Sequence[int]) -> pd.DataFrame:
+        return self.df.iloc[list(posiciones)]
+
+
+def emparejar_difuso(
+    valores_lab: Sequence[str],
+    pool: PoolCandidatos,
+    sensibilidad: float,
+    bloques_lab: Optional[Sequence[str]] = None,
+    workers: int = -1,
+    progreso: Optional[Callable[[float], None]] = None,
+) -> List[Tuple[int, int, float]]:
+    """
+    Asignación voraz uno a uno: cada fila de laboratorio, en su orden,
+    toma el candidato disponible del pool con mayor similitud
+    (>= sensibilidad) y lo retira para las filas siguientes, como hacía
+    el bucle con difflib y 'usados_exh'. La similitud es la de
+    difflib.get_close_matches (un umbral significa lo mismo que antes):
+    fuzz.ratio (LCS) nunca es menor que el ratio de difflib, así que
+    solo poda los candidatos que no pueden alcanzar el umbral. Los
+    empates se resuelven como get_close_matches (el texto mayor) y,
+    entre textos iguales, gana la primera fila disponible.
+
+    Devuelve tuplas (posición lab, posición exh, similitud 0–1) ordenadas
+    por posición de laboratorio. Las posiciones son enteras (iloc).
+    """
+    lab = np.asarray(valores_lab, dtype=object)
+    if len(lab) == 0 or len(pool) == 0:
+        return []
+
+    if bloques_lab is None:
+        bloques_lab = np.zeros(len(lab), dtype=object)
+    grupos_lab = _agrupar(np.asarray(bloques_lab, dtype=object))
+
+    corte = float(sensibilidad) * 100.0
+    pares: List[Tuple[int, int, float]] = []
+    procesadas = 0
+    for clave, pos_lab in grupos_lab.items():
+        pos_exh = pool.grupos.get(clave)
+        if pos_exh is not None:
+            pares.extend(_voraz_bloque(lab, pool, pos_lab, pos_exh, corte, workers))
+        procesadas += len(pos_lab)
+        if progreso is not None:
+            progreso(procesadas / len(lab))
+
+    pares.sort(key=lambda par: par[0])
+    return pares
+
+
+def _voraz_bloque(
+    lab: np.ndarray,
+    pool: PoolCandidatos,
+    pos_lab: np.ndarray,
+    pos_exh: np.ndarray,
+    corte: float,
+    workers: int,
+) -> List[Tuple[int, int, float]]:
+    """Poda un bloque por lotes con cdist, puntúa con difflib y asigna de forma voraz."""
+    candidatos = pool.valores[pos_exh].tolist()
+    sensibilidad = corte / 100.0
+    pares: List[Tuple[int, int, float]] = []
+    for inicio in range(0, len(pos_lab), TAM_LOTE):
+        usados = ~pool.disponibles[pos_exh]
+        if usados.all():
+            break
+        lote = pos_lab[inicio:inicio + TAM_LOTE]
+        puntajes = process.cdist(
+            lab[lote].tolist(),
+            candidatos,
+            scorer=fuzz.ratio,
+            processor=None,
+            score_cutoff=max(corte - HOLGURA_PODA, 0.0),
+            dtype=np.float32,
+            workers=workers,
+        )
+        for i, p_lab in enumerate(lote):
+            fila = puntajes[i]
+            fila[usados] = -1.0
+            posibles = np.flatnonzero(fila >= corte - HOLGURA_PODA)
+            j = _mejor_difflib(lab[p_lab], candidatos, posibles, sensibilidad)
+            if j is not None:
+                usados[j] = True
+                pool.retirar(int(pos_exh[j]))
+                # Misma similitud que mostraba el cruce original (lab contra exh)
+                similitud = SequenceMatcher(None, lab[p_lab], candidatos[j]).ratio()
+                pares.append((int(p_lab), int(pos_exh[j]), similitud))
+    return pares
+
+
+def _mejor_difflib(valor: str, candidatos: List[str], posiciones: np.ndarray, sensibilidad: float) -> Optional[int]:
+    """
+    Candidato que elegiría difflib.get_close_matches(valor, ..., n=1):
+    mayor ratio >= sensibilidad y, a igual ratio, el texto mayor; entre
+    textos iguales, la primera posición.
+    """
+    comparador = SequenceMatcher()
+    comparador.set_seq2(valor)
+    mejor: Optional[Tuple[float, str]] = None
+    elegido = None
+    for j in posiciones:
+        texto = candidatos[j]
+        comparador.set_seq1(texto)
+        ratio = comparador.ratio()
+        if ratio >= sensibilidad and (mejor is None or (ratio, texto) > mejor):
+            mejor, elegido = (ratio, texto), int(j)
+    return elegido
+
+
+def armar_aproximados(
+    df_lab: pd.DataFrame,
+    pool: PoolCandidatos,
+    pares: Sequence[Tuple[int, int, float]],
+) -> pd.DataFrame:
+    """
+    Une las filas emparejadas de ambos archivos en un solo DataFrame.
+    Las columnas comunes llevan sufijo _lab/_exh, como en el cruce exacto.
+    """
+    if not pares:
+        return pd.DataFrame()
+    pos_lab, pos_exh, similitudes = (list(t) for t in zip(*pares))
+    comunes = df_lab.columns.intersection(pool.df.columns)
+    parte_lab = df_lab.iloc[pos_lab].rename(columns={c: f"{c}_lab" for c in comunes})
+    parte_exh = pool.filas(pos_exh).rename(columns={c: f"{c}_exh" for c in comunes})
+    df_aprox = pd.concat(
+        [parte_lab.reset_index(drop=True), parte_exh.reset_index(drop=True)],
+        axis=1,
+    )
+    df_aprox["similitud"] = similitudes
+    return df_aprox
+
+
+def total_comparaciones(bloques_lab: Sequence[str], bloques_exh: Sequence[str]) -> int:
+    """Número de pares que se puntúan tras aplicar el bloqueo."""
+    n_lab = pd.Series(bloques_lab, dtype=object).value_counts()
+    n_exh = pd.Series(bloques_exh, dtype=object).value_counts()
+    comunes = n_lab.index.intersection(n_exh.index)
+    return int((n_lab[comunes] * n_exh[comunes]).sum())
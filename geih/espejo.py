@@ -0,0 +1,113 @@
+# -------------------------------------------------------------
+# Espejo local de los CSV remotos con GET condicional
+# (ETag / If-Modified-Since) y uso de la copia sin conexión.
+# -------------------------------------------------------------
+
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from typing import Optional
+
+from geih.cache import BASE_DIR
+
+ESPEJO_DIR = os.environ.get("GEIH_ESPEJO_DIR", os.path.join(BASE_DIR, "data", "espejo"))
+
+
+@dataclass(frozen=True)
+class PoliticaRefresco:
+    """
+    ttl: segundos durante los que la copia se sirve sin consultar la red.
+    timeout: segundos de espera de la petición condicional.
+    solo_espejo: no tocar la red si ya existe copia local.
+    """
+    ttl: float = float(os.environ.get("GEIH_ESPEJO_TTL", 600))
+    timeout: float = 10.0
+    solo_espejo: bool = False
+
+
+POLITICA = PoliticaRefresco()
+
+
+def ruta_espejo(url: str, espejo_dir: Optional[str] = None) -> str:
+    """Ruta local de la copia: data/espejo/<nombre del archivo en la URL>."""
+    nombre = os.path.basename(urllib.parse.urlparse(url).path) or "descarga"
+    return os.path.join(espejo_dir or ESPEJO_DIR, urllib.parse.unquote(nombre))
+
+
+def _leer_meta(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_meta(path: str, meta: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def obtener(
+    url: str,
+    politica: PoliticaRefresco = POLITICA,
+    espejo_dir: Optional[str] = None,
+    forzar: bool = False,
+) -> str:
+    """
+    Devuelve la ruta local de la copia de 'url', revalidándola con el
+    servidor solo si venció el TTL (o con forzar=True):
+      - 304 Not Modified: se conserva la copia y se renueva el TTL.
+      - 200: se reemplaza la copia de forma atómica.
+      - error de red: se sirve la copia existente; si no hay, se relanza.
+    """
+    destino = ruta_espejo(url, espejo_dir)
+    ruta_meta = destino + ".json"
+    meta = _leer_meta(ruta_meta)
+    hay_copia = os.path.exists(destino) and meta.get("url") == url
+
+    if hay_copia and not forzar:
+        if politica.solo_espejo or time.time() - meta.get("revisado", 0) < politica.ttl:
+            return destino
+
+    req = urllib.request.Request(url)
+    if hay_copia:
+        if meta.get("etag"):
+            req.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            req.add_header("If-Modified-Since", meta["last_modified"])
+
+    try:
+        with urllib.request.urlopen(req, timeout=politica.timeout) as resp:
+            datos = resp.read()
+            cabeceras = resp.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and hay_copia:
+            meta["revisado"] = time.time()
+            _escribir_meta(ruta_meta, meta)
+            return destino
+        if hay_copia:
+            return destino
+        raise
+    except (urllib.error.URLError, OSError):
+        if hay_copia:
+            return destino  # sin conexión: se sirve la copia
+        raise
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    tmp = destino + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(datos)
+    os.replace(tmp, destino)
+    _escribir_meta(ruta_meta, {
+        "url": url,
+        "etag": cabeceras.get("ETag"),
+        "last_modified": cabeceras.get("Last-Modified"),
+        "revisado": time.time(),
+    })
+    return destino
@@ -0,0 +1,228 @@
+# -------------------------------------------------------------
+# Esquema común de las exportaciones (laboratorio y campo)
+# Registro declarativo de campos: nombre estándar, sinónimos de
+# encabezado y tipo. Los sinónimos se compilan en un solo dict;
+# cada encabezado se resuelve una vez (caché por huella) y de ahí
+# salen los nombres al cargar y la proyección tipada de los tableros.
+# -------------------------------------------------------------
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from geih.categorias import categoria
+from geih.texto import normalizar_texto
+
+# Resoluciones de encabezado que se recuerdan (una por archivo distinto)
+MAX_RESOLUCIONES = 64
+
+
+@dataclass(frozen=True)
+class Campo:
+    """
+    nombre: nombre estándar con el que lo usan los tableros.
+    sinonimos: encabezados aceptados, en orden de preferencia (se comparan
+    normalizados; el propio nombre es siempre el primero).
+    tipo: "texto", "categoria", "entero" o "numero" (ver Esquema.proyectar).
+    """
+    nombre: str
+    sinonimos: Tuple[str, ...] = ()
+    tipo: str = "texto"
+
+
+def _entero(serie: pd.Series) -> pd.Series:
+    num = pd.to_numeric(serie, errors="coerce")
+    return num.where(num % 1 == 0).astype("Int64")
+
+
+CONVERSIONES = {
+    "texto": lambda s: s,
+    "categoria": categoria,
+    "entero": _entero,
+    "numero": lambda s: pd.to_numeric(s, errors="coerce"),
+}
+
+
+def huella(encabezado: Sequence) -> str:
+    """Clave de un encabezado: los nombres tal cual y su orden."""
+    return hashlib.sha1("\x1f".join(map(str, encabezado)).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Resolucion:
+    """
+    Un encabezado resuelto contra el esquema:
+      - nombres: nombre final de cada columna (estándar si es la mejor
+        coincidencia exacta de su campo; si no, normalizado y sin repetir);
+      - exactas: campo -> columna original por sinónimo exacto;
+      - parciales: campo -> primera columna que contiene un sinónimo, para
+        los campos sin coincidencia exacta.
+    """
+    nombres: Tuple[str, ...]
+    exactas: Mapping[str, str]
+    parciales: Mapping[str, str]
+
+    def columna(self, campo: str, parcial: bool = False) -> Optional[str]:
+        """Columna original del campo (o None); con parcial=True también por contenido."""
+        if campo in self.exactas:
+            return self.exactas[campo]
+        return self.parciales.get(campo) if parcial else None
+
+
+class Esquema:
+    """
+    Campos compilados en un dict sinónimo normalizado -> (campo, prioridad).
+    resolver() recorre un encabezado una sola vez y guarda el resultado por
+    huella, así cada archivo se resuelve una vez por proceso.
+    """
+
+    def __init__(self, campos: Sequence[Campo], max_resoluciones: int = MAX_RESOLUCIONES):
+        self.campos: Dict[str, Campo] = {c.nombre: c for c in campos}
+        self._indice: Dict[str, Tuple[str, int]] = {}
+        self._claves: Dict[str, Tuple[str, ...]] = {}
+        for c in campos:
+            claves = tuple(dict.fromkeys(normalizar_texto(s) for s in (c.nombre,) + tuple(c.sinonimos)))
+            self._claves[c.nombre] = claves
+            for prioridad, clave in enumerate(claves):
+                self._indice.setdefault(clave, (c.nombre, prioridad))
+        self._resoluciones: "OrderedDict[str, Resolucion]" = OrderedDict()
+        self._max = max_resoluciones
+
+    @property
+    def sinonimos(self) -> Dict[str, str]:
+        """Sinónimo normalizado -> nombre estándar (para validar encabezados)."""
+        return {clave: campo for clave, (campo, _) in self._indice.items()}
+
+    def nombre(self, columna) -> str:
+        """Nombre estándar de un encabezado suelto (normalizado si no es un sinónimo)."""
+        base = normalizar_texto(columna)
+        return self._indice[base][0] if base in self._indice else base
+
+    def resolver(self, encabezado: Sequence) -> Resolucion:
+        clave = huella(encabezado)
+        if clave in self._resoluciones:
+            self._resoluciones.move_to_end(clave)
+            return self._resoluciones[clave]
+        resolucion = self._resolver(list(encabezado))
+        self._resoluciones[clave] = resolucion
+        if len(self._resoluciones) > self._max:
+            self._resoluciones.popitem(last=False)
+        return resolucion
+
+    def _resolver(self, encabezado: List) -> Resolucion:
+        normalizados = [normalizar_texto(c) for c in encabezado]
+        mejor: Dict[str, Tuple[int, int]] = {}  # campo -> (prioridad, posición)
+        for pos, n in enumerate(normalizados):
+            if n in self._indice:
+                campo, prioridad = self._indice[n]
+                if campo not in mejor or prioridad < mejor[campo][0]:
+                    mejor[campo] = (prioridad, pos)
+        exactas = {campo: encabezado[pos] for campo, (_, pos) in mejor.items()}
+
+        # Sin coincidencia exacta: primera columna que contiene algún sinónimo
+        parciales = {}
+        for campo, claves in self._claves.items():
+            if campo in exactas:
+                continue
+            for pos, n in enumerate(normalizados):
+                if any(clave in n for clave in claves):
+                    parciales[campo] = encabezado[pos]
+                    break
+
+        estandar = {pos: campo for campo, (_, pos) in mejor.items()}
+        nombres, usados = [], set()
+        for pos, n in enumerate(normalizados):
+            nombre = estandar.get(pos, n)
+            while nombre in usados or (pos not in estandar and nombre in mejor):
+                nombre += "_"
+            usados.add(nombre)
+            nombres.append(nombre)
+        return Resolucion(tuple(nombres), exactas, parciales)
+
+    def nombres(self, encabezado: Sequence) -> List[str]:
+        """Nombres finales de un encabezado completo (ver Resolucion.nombres)."""
+        return list(self.resolver(encabezado).nombres)
+
+    def conservar(self, nombre: str) -> bool:
+        """True si la columna puede resolver algún campo (exacta o por contenido)."""
+        n = normalizar_texto(nombre)
+        return n in self._indice or any(clave in n for clave in self._indice)
+
+    def proyectar(
+        self,
+        df: pd.DataFrame,
+        campos: Optional[Sequence[str]] = None,
+        relleno: Any = np.nan,
+        resto: bool = True,
+        parcial: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Vista tipada de df: cada campo pedido (todos por defecto) desde su
+        columna resuelta y convertido según su tipo; los que faltan se
+        agregan con 'relleno' (valor o dict campo -> valor). Con resto=True
+        se conservan además las demás columnas en su orden; con parcial=True
+        un campo sin columna exacta toma la que contiene un sinónimo.
+        Las columnas no se copian (copy-on-write).
+        """
+        campos = list(self.campos if campos is None else campos)
+        resolucion = self.resolver(df.columns)
+        # Columna original -> campo: se renombran y convierten en su lugar
+        exactas = {resolucion.exactas[c]: c for c in campos if c in resolucion.exactas}
+        datos: Dict[Any, pd.Series] = {}
+        if resto:
+            for col in df.columns:
+                campo = exactas.get(col)
+                datos[campo or col] = self._convertir(campo, df[col]) if campo else df[col]
+        for campo in campos:
+            if campo in datos:
+                continue
+            col = resolucion.columna(campo, parcial)
+            if col is not None:
+                datos[campo] = self._convertir(campo, df[col])
+            else:
+                valor = relleno.get(campo, np.nan) if isinstance(relleno, Mapping) else relleno
+                datos[campo] = pd.Series(valor, index=df.index)
+        if not resto:
+            datos = {campo: datos[campo] for campo in campos}
+        return pd.DataFrame(datos, index=df.index, copy=False)
+
+    def _convertir(self, campo: str, serie: pd.Series) -> pd.Series:
+        return CONVERSIONES[self.campos[campo].tipo](serie)
+
+
+ESQUEMA = Esquema([
+    # Laboratorio
+    Campo("CASO LIMS", ("CASO_LIMS", "CASO", "CASO LIMS ID")),
+    Campo("NOMBRE OCCISO", ("NOMBRE DEL OCCISO", "NOMBRE")),
+    Campo("MUNICIPIO EXHUMACION", ("MUNICIPIO DE EXHUMACION",), "categoria"),
+    Campo("ANTROPOLOGO", ("ANTROPOLOGO(A)", "ANTROPOLOGA", "ANTROPOLOGO RESPONSABLE")),
+    Campo("MEDICO", ("MEDICO(A)", "MEDICA")),
+    Campo("ODONTOLOGO", ("ODONTOLOGO(A)", "ODONTOLOGA")),
+    Campo("SIRDEC"),
+    Campo("ESTADO", tipo="categoria"),
+    Campo("LEY", tipo="categoria"),
+    Campo("ANALIZADOS"),
+    Campo("ENTREGADOS", ("ENTREGADO", "ENTREGA", "ENTREGAS")),
+    # Campo
+    Campo("ASUNTO DE LA DILIGENCIA", ("ASUNTO", "ASUNTO DILIGENCIA")),
+    Campo("CUERPOS", ("CANTIDAD DE CUERPOS", "NO. CUERPOS", "NRO CUERPOS"), "entero"),
+    Campo("AÑO", ("ANIO", "ANNO", "ANIO DILIGENCIA"), "entero"),
+    Campo("TIPO INHUMACION", ("TIPO DE INHUMACION", "TIPO_INHUMACION"), "categoria"),
+    Campo("ZONA", ("ZONA DE LA DILIGENCIA",), "categoria"),
+    Campo("MUNICIPIO DE LA DILIGENCIA", ("MUNICIPIO", "MUNICIPIO DILIGENCIA"), "categoria"),
+    Campo("DEPARTAMENTO", ("DEPTO", "DEPARTAMENTO DE LA DILIGENCIA"), "categoria"),
+])
+
+# Sinónimo normalizado -> nombre estándar (validación de encabezados, GIHnacional)
+SINONIMOS: Dict[str, str] = ESQUEMA.sinonimos
+
+COLUMNAS_ESTANDAR = frozenset(ESQUEMA.campos)
+
+
+def nombre_estandar(c) -> str:
+    """Encabezado normalizado (sin tildes, espacios colapsados, mayúsculas) y remapeado con el esquema."""
+    return ESQUEMA.nombre(c)
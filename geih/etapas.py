@@ -0,0 +1,65 @@
+# -------------------------------------------------------------
+# Cadena de etapas con memo por contenido (lectura -> claves ->
+# cruce exacto -> difuso -> conciliación)
+# Cada etapa se identifica por la clave de sus entradas y sus
+# parámetros: cambiar un control solo recalcula las etapas que
+# dependen de él.
+# -------------------------------------------------------------
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Hashable, MutableMapping, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def hash_bytes(datos: bytes) -> str:
+    """SHA-256 del contenido subido: la clave de la primera etapa."""
+    return hashlib.sha256(datos).hexdigest()
+
+
+def clave_etapa(nombre: str, entradas: Sequence[str], parametros: Hashable = ()) -> str:
+    """Clave estable de una etapa: su nombre, las claves de sus entradas y sus parámetros."""
+    texto = repr((nombre, tuple(entradas), parametros))
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class Tuberia:
+    """
+    Memo de etapas guardado en un mapeo que sobrevive a los reruns
+    (st.session_state). Por etapa se conservan los 'max_por_etapa'
+    resultados más recientes, así volver a un valor anterior de un
+    control tampoco recalcula. Como las claves encadenan las de las
+    entradas, un cambio aguas arriba invalida todo lo que sigue.
+    """
+
+    def __init__(self, almacen: MutableMapping, nombre: str = "_etapas", max_por_etapa: int = 2):
+        if nombre not in almacen:
+            almacen[nombre] = {}
+        self._memo = almacen[nombre]
+        self._max = max_por_etapa
+        self.recalculadas = []
+
+    def ejecutar(
+        self,
+        nombre: str,
+        entradas: Sequence[str],
+        parametros: Hashable,
+        calcular: Callable[[], T],
+    ) -> Tuple[T, str]:
+        """
+        Resultado de la etapa y su clave (para las etapas siguientes).
+        Solo llama a 'calcular' si esa combinación de entradas y
+        parámetros no está en el memo; si 'calcular' falla no se guarda nada.
+        """
+        clave = clave_etapa(nombre, entradas, parametros)
+        memo = self._memo.setdefault(nombre, OrderedDict())
+        if clave in memo:
+            memo.move_to_end(clave)
+            return memo[clave], clave
+        valor = calcular()
+        memo[clave] = valor
+        while len(memo) > self._max:
+            memo.popitem(last=False)
+        self.recalculadas.append(nombre)
+        return valor, clave
@@ -0,0 +1,62 @@
+# -------------------------------------------------------------
+# Exportación de resultados a CSV y XLSX
+# El XLSX se escribe en modo constant_memory de xlsxwriter (fila a
+# fila, por lotes), sin el formateo celda a celda de to_excel; los
+# bytes se guardan por versión del resultado en la tubería.
+# -------------------------------------------------------------
+
+from io import BytesIO
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+MIME_CSV = "text/csv"
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Filas convertidas a objetos de Python a la vez (acota la memoria por hoja)
+TAM_LOTE_FILAS = 10_000
+
+
+def a_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def _valores(col: pd.Series) -> list:
+    # Tipos de Python para xlsxwriter; nulos (NaN, NaT, None) como celda vacía
+    # e infinitos como texto "inf" / "-inf", igual que to_excel
+    if isinstance(col.dtype, pd.DatetimeTZDtype):
+        col = col.dt.tz_localize(None)
+    valores = col.astype(object).where(col.notna(), None)
+    if col.dtype.kind == "f":
+        infinitos = np.isinf(col.to_numpy())
+        if infinitos.any():
+            valores[infinitos] = col[infinitos].map(str)
+    return valores.tolist()
+
+
+def a_xlsx(hojas: Dict[str, pd.DataFrame], zoom: int = 90) -> bytes:
+    """
+    Libro con una hoja por DataFrame (nombre -> datos), encabezado en
+    negrita como to_excel(index=False). En modo constant_memory cada fila
+    se vuelca al disco temporal en cuanto se escribe, así la memoria no
+    crece con el tamaño del resultado.
+    """
+    salida = BytesIO()
+    libro = xlsxwriter.Workbook(salida, {
+        "constant_memory": True,
+        "nan_inf_to_errors": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    encabezado = libro.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for nombre, df in hojas.items():
+        hoja = libro.add_worksheet(nombre[:31])
+        hoja.set_zoom(zoom)
+        hoja.write_row(0, 0, [str(c) for c in df.columns], encabezado)
+        for inicio in range(0, len(df), TAM_LOTE_FILAS):
+            lote = df.iloc[inicio:inicio + TAM_LOTE_FILAS]
+            columnas = [_valores(lote.iloc[:, i]) for i in range(lote.shape[1])]
+            for fila, valores in enumerate(zip(*columnas), start=inicio + 1):
+                hoja.write_row(fila, 0, valores)
+    libro.close()
+    return salida.getvalue()
@@ -0,0 +1,98 @@
+# -------------------------------------------------------------
+# Motor de filtros: códigos categóricos + máscaras booleanas en caché
+# -------------------------------------------------------------
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from geih.busqueda import IndiceBusqueda
+
+# Valor de los selectbox que significa "sin filtro"
+TODOS = "Todos"
+
+
+class MotorFiltros:
+    """
+    Precalcula una vez por dataset los códigos categóricos de las columnas
+    filtrables y el índice de búsqueda de texto. Cada filtro produce una
+    máscara booleana (sin copiar el DataFrame) que se guarda por clave;
+    las máscaras se combinan con & y solo el resultado final se usa para
+    materializar la vista.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        categoricas: Sequence[str] = ("AÑO", "DEPARTAMENTO"),
+        max_mascaras: int = 128,
+    ):
+        self.n = len(df)
+        self._df = df
+        self._codigos: Dict[str, tuple] = {}
+        for col in categoricas:
+            if col in df.columns:
+                cat = pd.Categorical(df[col])
+                self._codigos[col] = (cat.codes, cat.categories)
+        self._indice: Optional[IndiceBusqueda] = None
+        self._mascaras: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._max = max_mascaras
+
+    def _memo(self, clave: Hashable, calcular) -> np.ndarray:
+        if clave in self._mascaras:
+            self._mascaras.move_to_end(clave)
+            return self._mascaras[clave]
+        mascara = calcular()
+        self._mascaras[clave] = mascara
+        if len(self._mascaras) > self._max:
+            self._mascaras.popitem(last=False)
+        return mascara
+
+    def _mascara_valor(self, col: str, valor: Any) -> np.ndarray:
+        def calcular():
+            if col not in self._codigos:
+                return np.ones(self.n, dtype=bool)
+            codigos, categorias = self._codigos[col]
+            pos = categorias.get_indexer([valor])[0]
+            if pos < 0:
+                return np.zeros(self.n, dtype=bool)
+            return codigos == pos
+        return self._memo(("col", col, valor), calcular)
+
+    def _mascara_texto(self, consulta: str) -> np.ndarray:
+        def calcular():
+            if self._indice is None:
+                # Todas las columnas, como el str.contains original sobre astype(str)
+                self._indice = IndiceBusqueda(self._df, columnas=self._df.columns)
+            return self._indice.buscar(consulta)
+        return self._memo(("q", consulta), calcular)
+
+    def mascara(self, filtros: Dict[str, Any], consulta: str = "") -> Optional[np.ndarray]:
+        """
+        Máscara combinada para {columna: valor} y la consulta de texto.
+        Los valores None o "Todos" no filtran. Devuelve None si ningún
+        filtro está activo (la vista es el DataFrame completo).
+        """
+        activos = tuple(sorted(
+            ((c, v) for c, v in filtros.items() if v is not None and v != TODOS),
+            key=lambda cv: cv[0],
+        ))
+        consulta = (consulta or "").strip()
+        if not activos and not consulta:
+            return None
+
+        def calcular():
+            m = np.ones(self.n, dtype=bool)
+            for col, valor in activos:
+                m &= self._mascara_valor(col, valor)
+            if consulta:
+                m &= self._mascara_texto(consulta)
+            return m
+        return self._memo(("combinada", activos, consulta), calcular)
+
+    def vista(self, df: pd.DataFrame, filtros: Dict[str, Any], consulta: str = "") -> pd.DataFrame:
+        """Materializa la vista filtrada de df (el mismo dataset del motor)."""
+        m = self.mascara(filtros, consulta)
+        return df if m is None else df[m]
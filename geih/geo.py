@@ -0,0 +1,253 @@
+# -------------------------------------------------------------
+# Capa geográfica: coordenadas por (DEPARTAMENTO, MUNICIPIO)
+# Los CSV de coordenadas del repo se reparan una vez (filas
+# envueltas en comillas, mojibake, separadores de miles rotos) y
+# quedan como arreglos float32; el cruce con los registros es
+# vectorizado y el mapa dibuja un punto por ubicación, no por fila.
+# -------------------------------------------------------------
+
+import csv
+import io
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from geih.cache import BASE_DIR
+from geih.dialecto import detectar_encoding, leer_bytes
+from geih.texto import normalizar_serie, normalizar_texto
+
+FUENTES = (
+    "municipios_coords.csv",              # centroides municipales (números dañados)
+    "Coordenadas GEIH - stadistica.csv",  # puntos por caso con LATITUD/LONGITUD
+    "Coordenadas_exhmed.csv",             # copia de exhmed; columnas de coordenadas vacías
+)
+
+# Colombia continental más San Andrés
+RANGO_LAT = (-4.3, 13.6)
+RANGO_LON = (-82.0, -66.8)
+
+NOMBRES_LAT = {"LAT", "LATITUD"}
+NOMBRES_LON = {"LON", "LONG", "LONGITUD"}
+NOMBRES_DEPTO = {"DEPARTAMENTO", "DEPTO"}
+NOMBRES_MUNI = {"MUNICIPIO", "MUNICIPIO EXHUMACION", "MUNICIPIO DE LA DILIGENCIA"}
+
+SEPARADOR = "\x1f"
+
+
+# ----------------------------
+# Reparación de texto y números
+# ----------------------------
+def reparar_mojibake(texto: str) -> str:
+    """UTF-8 leído como cp1252/latin-1 ("BRICEÃ‘O" -> "BRICEÑO"); si no aplica, igual."""
+    if "Ã" not in texto and "Â" not in texto:
+        return texto
+    try:
+        crudo = bytes(ord(ch) if ord(ch) < 256 else ch.encode("cp1252")[0] for ch in texto)
+        return crudo.decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return texto
+
+
+def reparar_coordenada(texto, rango: Tuple[float, float]) -> float:
+    """
+    Valor numérico de una coordenada dentro de 'rango'; NaN si no se puede.
+    Acepta decimales con punto o coma y repara cifras a las que una hoja
+    de cálculo quitó la coma decimal y agregó puntos de miles
+    ("5.789.675.525.963.370,00" -> 5.7896...). Para esas se prueba primero
+    la parte entera que indica el primer grupo y luego 1-3 dígitos, y se
+    acepta la primera que cae en el rango.
+    """
+    if texto is None or (isinstance(texto, float) and np.isnan(texto)):
+        return np.nan
+    s = str(texto).strip().replace(" ", "")
+    if not s:
+        return np.nan
+    if s.count(".") + s.count(",") <= 1:
+        try:
+            valor = float(s.replace(",", "."))
+        except ValueError:
+            return np.nan
+        return valor if rango[0] <= valor <= rango[1] else np.nan
+
+    s = re.sub(r",0+$", "", s)  # ",00" final de la hoja de cálculo
+    signo = -1.0 if s.startswith("-") else 1.0
+    grupos = re.findall(r"\d+", s)
+    digitos = "".join(grupos)
+    if not digitos:
+        return np.nan
+    for enteros in dict.fromkeys([len(grupos[0]), 1, 2, 3]):
+        if enteros >= len(digitos):
+            continue
+        valor = signo * float(f"{digitos[:enteros]}.{digitos[enteros:]}")
+        if rango[0] <= valor <= rango[1]:
+            return valor
+    return np.nan
+
+
+def filas_csv(path: str) -> List[List[str]]:
+    """
+    Filas de un CSV con los defectos de estos archivos reparados: filas
+    completas envueltas en comillas (un solo campo con comas) se vuelven a
+    partir, y el texto con mojibake se corrige.
+    """
+    datos = leer_bytes(path)
+    texto = datos.decode(detectar_encoding(datos), errors="replace").lstrip("\ufeff")
+    filas = []
+    for fila in csv.reader(io.StringIO(texto)):
+        if len(fila) == 1 and "," in fila[0]:
+            fila = next(csv.reader([fila[0]]))
+        filas.append([reparar_mojibake(c) for c in fila])
+    return filas
+
+
+def _columna(encabezado: List[str], nombres: set) -> Optional[int]:
+    for i, c in enumerate(encabezado):
+        if normalizar_texto(c) in nombres:
+            return i
+    return None
+
+
+def leer_coordenadas(path: str) -> pd.DataFrame:
+    """
+    DEPARTAMENTO, MUNICIPIO, LAT, LON de un archivo de coordenadas.
+    Si el encabezado no tiene esas columnas (o no hay ningún valor
+    válido) devuelve un DataFrame vacío.
+    """
+    columnas = ["DEPARTAMENTO", "MUNICIPIO", "LAT", "LON"]
+    filas = filas_csv(path)
+    if not filas:
+        return pd.DataFrame(columns=columnas)
+    encabezado = filas[0]
+    pos = [_columna(encabezado, n) for n in (NOMBRES_DEPTO, NOMBRES_MUNI, NOMBRES_LAT, NOMBRES_LON)]
+    if None in pos:
+        return pd.DataFrame(columns=columnas)
+    ancho = max(pos) + 1
+    datos = pd.DataFrame([[f[i] for i in pos] for f in filas[1:] if len(f) >= ancho], columns=columnas)
+    for col, rango in (("LAT", RANGO_LAT), ("LON", RANGO_LON)):
+        # Una reparación por valor distinto, no por fila
+        codigos, unicos = pd.factorize(datos[col])
+        reparados = np.array([reparar_coordenada(u, rango) for u in unicos], dtype=np.float64)
+        datos[col] = np.where(codigos >= 0, reparados[codigos] if len(unicos) else np.nan, np.nan)
+    return datos.dropna(subset=["LAT", "LON"]).reset_index(drop=True)
+
+
+# ----------------------------
+# Índice (DEPARTAMENTO, MUNICIPIO) -> (LAT, LON)
+# ----------------------------
+def _municipio(serie: pd.Series) -> pd.Series:
+    # "ANTIOQUIA - CAREPA" -> "CAREPA"
+    return normalizar_serie(serie).str.replace(r"^.* - ", "", regex=True)
+
+
+def claves(deptos: pd.Series, munis: pd.Series) -> pd.Series:
+    """Clave normalizada DEPARTAMENTO + MUNICIPIO (sin tildes, mayúsculas)."""
+    return normalizar_serie(deptos).str.cat(_municipio(munis), sep=SEPARADOR)
+
+
+class IndiceGeo:
+    """
+    Búsqueda compacta de coordenadas por ubicación:
+      - claves: Index de "DEPARTAMENTO\\x1fMUNICIPIO" normalizados;
+      - lat/lon: float32 alineados con las claves.
+    Cada ubicación toma la primera fuente que la tenga (centroides
+    municipales antes que la mediana de los puntos por caso). Los
+    municipios cuyo nombre es único en el país también se encuentran
+    sin departamento.
+    """
+
+    def __init__(self, coordenadas: Iterable[pd.DataFrame]):
+        partes = []
+        for prioridad, df in enumerate(coordenadas):
+            if df.empty:
+                continue
+            mediana = df.assign(CLAVE=claves(df["DEPARTAMENTO"], df["MUNICIPIO"])).groupby("CLAVE")[["LAT", "LON"]].median()
+            partes.append(mediana.assign(PRIORIDAD=prioridad))
+        tabla = pd.concat(partes) if partes else pd.DataFrame(columns=["LAT", "LON", "PRIORIDAD"])
+        tabla = tabla.sort_values("PRIORIDAD", kind="stable")
+        tabla = tabla[~tabla.index.duplicated(keep="first")]
+
+        self.claves = pd.Index(tabla.index.astype(str))
+        self.lat = tabla["LAT"].to_numpy(dtype=np.float32)
+        self.lon = tabla["LON"].to_numpy(dtype=np.float32)
+        self.deptos = self.claves.str.split(SEPARADOR).str[0]
+        self.munis = self.claves.str.split(SEPARADOR).str[1]
+        # Municipio -> posición, solo para nombres sin homónimos
+        munis = pd.Series(np.arange(len(self.claves)), index=self.munis)
+        self._por_municipio = munis[~munis.index.duplicated(keep=False)]
+
+    @classmethod
+    def desde_archivos(cls, rutas: Iterable[str] = FUENTES, base_dir: str = BASE_DIR) -> "IndiceGeo":
+        fuentes = []
+        for ruta in rutas:
+            ruta = ruta if os.path.isabs(ruta) else os.path.join(base_dir, ruta)
+            if os.path.exists(ruta):
+                fuentes.append(leer_coordenadas(ruta))
+        return cls(fuentes)
+
+    def __len__(self) -> int:
+        return len(self.claves)
+
+    def posiciones(self, deptos: pd.Series, munis: pd.Series) -> np.ndarray:
+        """Posición en el índice de cada fila (-1 si no se encuentra), sin bucles por fila."""
+        pos = self.claves.get_indexer(claves(deptos, munis))
+        faltan = pos < 0
+        if faltan.any():
+            por_muni = self._por_municipio.reindex(_municipio(munis[faltan]).to_numpy())
+            pos[faltan] = por_muni.fillna(-1).to_numpy(dtype=np.int64)
+        return pos
+
+    def unir(self, df: pd.DataFrame, col_depto: str, col_muni: str) -> pd.DataFrame:
+        """Columnas LAT/LON (float32, NaN si no hay coordenadas) alineadas con df."""
+        pos = self.posiciones(df[col_depto], df[col_muni])
+        validas = pos >= 0
+        lat = np.full(len(df), np.nan, dtype=np.float32)
+        lon = np.full(len(df), np.nan, dtype=np.float32)
+        lat[validas] = self.lat[pos[validas]]
+        lon[validas] = self.lon[pos[validas]]
+        return pd.DataFrame({"LAT": lat, "LON": lon}, index=df.index)
+
+    def agregar(self, df: pd.DataFrame, col_depto: str, col_muni: str, peso: Optional[str] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Una fila por ubicación con datos (DEPARTAMENTO, MUNICIPIO, LAT, LON, N)
+        y el número de registros sin coordenadas. N cuenta filas o suma 'peso'.
+        """
+        pos = self.posiciones(df[col_depto], df[col_muni])
+        validas = pos >= 0
+        pesos = None if peso is None else pd.to_numeric(df[peso], errors="coerce").fillna(0).to_numpy()[validas]
+        n = np.bincount(pos[validas], weights=pesos, minlength=len(self.claves))
+        hay = np.flatnonzero(n > 0)
+        puntos = pd.DataFrame({
+            "DEPARTAMENTO": self.deptos[hay],
+            "MUNICIPIO": self.munis[hay],
+            "LAT": self.lat[hay],
+            "LON": self.lon[hay],
+            "N": n[hay],
+        }).sort_values("N", ascending=False, kind="stable").reset_index(drop=True)
+        return puntos, int((~validas).sum())
+
+
+def figura_puntos(puntos: pd.DataFrame, titulo: str = "", etiqueta: str = "Registros", height: int = 600) -> go.Figure:
+    """Un círculo por ubicación, con área proporcional a N (en vez de un punto por registro)."""
+    n = puntos["N"].to_numpy(dtype=np.float64)
+    tam = 6 + 34 * np.sqrt(n / n.max()) if len(n) else n
+    fig = go.Figure(go.Scattermap(
+        lat=puntos["LAT"],
+        lon=puntos["LON"],
+        mode="markers",
+        marker=dict(size=tam, color=n, colorscale="YlOrRd", showscale=True, colorbar_title=etiqueta, opacity=0.8),
+        text=puntos["MUNICIPIO"] + " (" + puntos["DEPARTAMENTO"] + ")",
+        customdata=n,
+        hovertemplate="%{text}<br>" + etiqueta + ": %{customdata:,.0f}<extra></extra>",
+    ))
+    centro = dict(lat=float(puntos["LAT"].mean()), lon=float(puntos["LON"].mean())) if len(puntos) else dict(lat=6.25, lon=-75.56)
+    fig.update_layout(
+        title=titulo,
+        height=height,
+        map=dict(style="carto-positron", center=centro, zoom=5),
+        margin=dict(t=40 if titulo else 0, l=0, r=0, b=0),
+    )
+    return fig
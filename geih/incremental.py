@@ -0,0 +1,206 @@
+# -------------------------------------------------------------
+# Conciliación incremental entre exportaciones sucesivas
+# Se guarda en disco la clave (CASO LIMS / RADICADO) y el hash de
+# cada fila, más las decisiones de la última conciliación; con la
+# siguiente exportación solo se vuelven a emparejar las filas
+# nuevas o modificadas.
+# -------------------------------------------------------------
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from geih.cache import CACHE_DIR
+from geih.cruce import IndiceClaves
+from geih.emparejamiento import PoolCandidatos, emparejar_difuso
+
+CARPETA = "conciliacion"
+
+
+def claves_filas(df: pd.DataFrame, col_caso: str, col_radicado: str) -> np.ndarray:
+    """Clave int64 de cada fila: CASO LIMS y RADICADO normalizados como en el cruce exacto."""
+    return IndiceClaves(df[col_caso], df[col_radicado]).hash
+
+
+def hash_filas(df: pd.DataFrame) -> np.ndarray:
+    """Hash int64 del contenido de cada fila (todas las columnas)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().view(np.int64)
+
+
+def identidades(claves: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    """
+    Identidad int64 de cada fila: clave, hash del contenido y número de
+    aparición entre filas idénticas. Una fila sin cambios conserva su
+    identidad aunque se borren, agreguen o reordenen otras filas.
+    """
+    partes = pd.DataFrame({"clave": claves, "hash": hashes})
+    partes["aparicion"] = partes.groupby(["clave", "hash"], sort=False).cumcount()
+    return pd.util.hash_pandas_object(partes, index=False).to_numpy().view(np.int64)
+
+
+def identificar(df: pd.DataFrame, col_caso: str, col_radicado: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Identidades y claves de las filas de df (ver identidades y claves_filas)."""
+    claves = claves_filas(df, col_caso, col_radicado)
+    return identidades(claves, hash_filas(df)), claves
+
+
+def comparar(
+    ids: np.ndarray,
+    claves: np.ndarray,
+    ids_previos: np.ndarray,
+    claves_previas: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Para cada fila de la exportación nueva: si está sin cambios (la misma
+    fila existía antes) y si es nueva (su CASO LIMS / RADICADO no existía).
+    Las que no son ninguna de las dos son filas modificadas.
+    """
+    return np.isin(ids, ids_previos), ~np.isin(claves, claves_previas)
+
+
+@dataclass
+class Estado:
+    """
+    Identidades y claves de las filas y decisiones de la última conciliación
+    aceptada: pares difusos por identidad y conciliaciones manuales por
+    clave (sobreviven a cambios en otras columnas de la fila).
+    """
+    lab_id: np.ndarray
+    lab_clave: np.ndarray
+    exh_id: np.ndarray
+    exh_clave: np.ndarray
+    par_lab: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    par_exh: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    similitud: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    manual: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def desde(
+        cls,
+        lab_id: np.ndarray,
+        lab_clave: np.ndarray,
+        exh_id: np.ndarray,
+        exh_clave: np.ndarray,
+        pares: Sequence[Tuple[int, int, float]],
+        manual: Sequence[int] = (),
+    ) -> "Estado":
+        """Estado de una conciliación: pares difusos (posiciones) y filas de laboratorio agregadas a mano."""
+        pos_lab = np.array([i for i, _, _ in pares], dtype=np.int64)
+        pos_exh = np.array([j for _, j, _ in pares], dtype=np.int64)
+        return cls(
+            lab_id, lab_clave, exh_id, exh_clave,
+            par_lab=lab_id[pos_lab],
+            par_exh=exh_id[pos_exh],
+            similitud=np.array([s for _, _, s in pares], dtype=np.float64),
+            manual=lab_clave[np.asarray(manual, dtype=np.int64)],
+        )
+
+    def guardar(self, ruta: str) -> None:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        tmp = ruta + ".tmp.npz"
+        np.savez(tmp, **{k: np.asarray(v) for k, v in self.__dict__.items()})
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> Optional["Estado"]:
+        """Estado guardado en 'ruta'; None si no existe o no se puede leer."""
+        try:
+            with np.load(ruta) as datos:
+                return cls(**{k: datos[k] for k in datos.files})
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+
+def ruta_estado(configuracion: Sequence, cache_dir: Optional[str] = None) -> str:
+    """Archivo de estado para una configuración (columnas de identidad y de comparación, parámetros)."""
+    clave = hashlib.sha1(repr(tuple(configuracion)).encode("utf-8")).hexdigest()[:20]
+    return os.path.join(cache_dir or CACHE_DIR, CARPETA, clave + ".npz")
+
+
+def emparejar_incremental(
+    valores_lab: Sequence[str],
+    pool: PoolCandidatos,
+    sensibilidad: float,
+    bloques_lab: Sequence[str],
+    estado: Estado,
+    lab_id: np.ndarray,
+    lab_clave: np.ndarray,
+    exh_id: np.ndarray,
+    exh_clave: np.ndarray,
+) -> Tuple[List[Tuple[int, int, float]], Dict[str, int]]:
+    """
+    Emparejamiento difuso que reutiliza las decisiones de 'estado':
+      1) se conservan los pares cuyas dos filas siguen sin cambios;
+      2) las filas de laboratorio nuevas, modificadas o cuya pareja cambió
+         se emparejan contra todos los candidatos libres;
+      3) las filas sin cambios que no tenían pareja solo se comparan con
+         los candidatos de exhumaciones nuevos, modificados o liberados
+         (con los demás ya no alcanzaron la sensibilidad).
+    El costo depende de las filas cambiadas, no del tamaño del registro.
+    Devuelve pares (posición lab, posición exh, similitud) como
+    emparejar_difuso y un resumen con los conteos de cada grupo.
+    """
+    valores_lab = np.asarray(valores_lab, dtype=object)
+    bloques_lab = np.asarray(bloques_lab, dtype=object)
+    igual_lab, nueva_lab = comparar(lab_id, lab_clave, estado.lab_id, estado.lab_clave)
+    igual_exh, nueva_exh = comparar(exh_id, exh_clave, estado.exh_id, estado.exh_clave)
+
+    # 1) Pares previos con ambas filas intactas
+    pl = pd.Index(lab_id).get_indexer(estado.par_lab)
+    pe = pd.Index(exh_id).get_indexer(estado.par_exh)
+    vigente = (pl >= 0) & (pe >= 0)
+    vigente[vigente] = igual_lab[pl[vigente]] & igual_exh[pe[vigente]]
+    pares = list(zip(pl[vigente].tolist(), pe[vigente].tolist(), estado.similitud[vigente].tolist()))
+
+    pool.reiniciar()
+    pool.disponibles[pe[vigente]] = False
+    emparejada = np.zeros(len(valores_lab), dtype=bool)
+    emparejada[pl[vigente]] = True
+    # Filas de laboratorio y candidatos cuyo par anterior se rompió
+    pareja_rota_lab = np.zeros(len(valores_lab), dtype=bool)
+    pareja_rota_lab[pl[~vigente & (pl >= 0)]] = True
+    liberados = np.zeros(len(pool), dtype=bool)
+    liberados[pe[~vigente & (pe >= 0)]] = True
+
+    def emparejar(mascara: np.ndarray) -> None:
+        posiciones = np.flatnonzero(mascara)
+        if not len(posiciones):
+            return
+        for i, j, s in emparejar_difuso(valores_lab[posiciones], pool, sensibilidad, bloques_lab=bloques_lab[posiciones]):
+            pares.append((int(posiciones[i]), j, s))
+            emparejada[posiciones[i]] = True
+
+    # 2) Filas nuevas / modificadas / con pareja rota contra todos los libres
+    rehacer = ~emparejada & (~igual_lab | pareja_rota_lab)
+    emparejar(rehacer)
+
+    # 3) Sin cambios y sin pareja: solo contra candidatos nuevos, modificados o liberados
+    resto = ~emparejada & ~rehacer
+    pool.disponibles &= ~igual_exh | liberados
+    if not pool.disponibles.any():
+        resto[:] = False
+    emparejar(resto)
+    pool.disponibles[:] = ~_tomados(pares, len(pool))
+
+    pares.sort(key=lambda par: par[0])
+    resumen = {
+        "lab_nuevas": int(nueva_lab.sum()),
+        "lab_modificadas": int((~igual_lab & ~nueva_lab).sum()),
+        "exh_nuevas": int(nueva_exh.sum()),
+        "exh_modificadas": int((~igual_exh & ~nueva_exh).sum()),
+        "pares_conservados": int(vigente.sum()),
+        "lab_reemparejadas": int(rehacer.sum()),
+        "lab_contra_nuevos": int(resto.sum()),
+    }
+    return pares, resumen
+
+
+def _tomados(pares: Sequence[Tuple[int, int, float]], n: int) -> np.ndarray:
+    tomados = np.zeros(n, dtype=bool)
+    if pares:
+        tomados[[j for _, j, _ in pares]] = True
+    return tomados
@@ -0,0 +1,78 @@
+# -------------------------------------------------------------
+# Indicadores de las tarjetas y gráficos (sin Streamlit)
+# Conteos por patrón, quinquenios y reagrupaciones que antes se
+# calculaban fila a fila en cada rerun de los tableros; trabajan
+# sobre marcas precalculadas o sobre conteos del cubo.
+# -------------------------------------------------------------
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from geih.agregados import bandera
+from geih.categorias import SIN_DATO
+
+
+def marcas_patrones(serie: pd.Series, patrones: Dict[str, str], regex: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Una máscara por patrón (nombre -> patrón) sobre toda la columna. Se
+    calculan una vez por carga; la vista solo suma las filas filtradas
+    (ver conteo_marcas).
+    """
+    return {nombre: bandera(serie, patron, regex=regex) for nombre, patron in patrones.items()}
+
+
+def conteo_marcas(marcas: np.ndarray, mascara: Optional[np.ndarray] = None) -> int:
+    """Filas marcadas dentro de la vista (mascara None = todas las filas)."""
+    return int(marcas.sum() if mascara is None else marcas[mascara].sum())
+
+
+def por_quinquenio(conteos_anio: pd.Series) -> pd.DataFrame:
+    """
+    Conteos por período de 5 años (PERIODO "1995-1999", CANTIDAD) a partir
+    de conteos por año (p. ej. cubo.conteo("AÑO") o value_counts). Los años
+    no numéricos o nulos van a "SIN DATO". Ordenado por etiqueta.
+    """
+    if conteos_anio.empty:
+        return pd.DataFrame({"PERIODO": pd.Series(dtype=object), "CANTIDAD": pd.Series(dtype=np.int64)})
+    anios = pd.to_numeric(pd.Series(conteos_anio.index, dtype=object), errors="coerce")
+    inicio = (anios // 5) * 5
+    etiquetas = [
+        SIN_DATO if pd.isna(x) else f"{int(x)}-{int(x) + 4}"
+        for x in inicio
+    ]
+    agrupado = pd.Series(conteos_anio.to_numpy(), index=etiquetas).groupby(level=0).sum()
+    return agrupado.rename_axis("PERIODO").reset_index(name="CANTIDAD")
+
+
+def reagrupar(conteos: pd.Series, grupo: Callable[[Any], Any]) -> pd.Series:
+    """Suma conteos ya agregados bajo otra etiqueta (p. ej. variantes de ZONA), sin tocar las filas."""
+    return conteos.groupby(conteos.index.map(grupo), sort=False).sum()
+
+
+def completar_columnas(df: pd.DataFrame, columnas: Iterable[str], relleno: Any = None) -> pd.DataFrame:
+    """Agrega (en sitio) las columnas que faltan con 'relleno' y devuelve df."""
+    for c in columnas:
+        if c not in df.columns:
+            df[c] = relleno
+    return df
+
+
+def opciones_filtro(series: Sequence[pd.Series], enteros: bool = False) -> List[Any]:
+    """
+    Valores distintos no nulos de varias columnas, ordenados, para un
+    selectbox. Con enteros=True solo los convertibles a int (años).
+    """
+    valores = set()
+    for s in series:
+        valores.update(s.dropna().unique().tolist())
+    if not enteros:
+        return sorted(v for v in valores if pd.notna(v))
+    validos = set()
+    for v in valores:
+        try:
+            validos.add(int(v))
+        except (ValueError, TypeError):
+            continue
+    return sorted(validos)
@@ -0,0 +1,196 @@
+# -------------------------------------------------------------
+# Ingesta por trozos de exportaciones grandes (LIMS nacional)
+# Solo se leen las columnas que usa el tablero; cada trozo se
+# normaliza y se escribe directo en la caché Arrow, sin tener el
+# CSV completo en memoria.
+# -------------------------------------------------------------
+
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+from geih.cache import leer_con_cache, pa
+from geih.categorias import COLUMNAS_CATEGORICAS, categoria
+from geih.dialecto import leer_muestra, resolver_dialecto
+
+TAM_TROZO = 50_000
+# Archivos a partir de este tamaño se cargan por trozos
+UMBRAL_TROZOS = int(float(os.environ.get("GEIH_UMBRAL_TROZOS_MB", 64)) * 1024 * 1024)
+
+
+def usar_trozos(src: str, umbral: int = UMBRAL_TROZOS) -> bool:
+    """True si src es un archivo local lo bastante grande para leerlo por trozos."""
+    try:
+        return os.path.getsize(src) >= umbral
+    except OSError:
+        return False
+
+
+def trozos_csv(
+    src: str,
+    renombrar: Callable[[Sequence[str]], List[str]],
+    conservar: Callable[[str], bool],
+    esperadas: Iterable[str] = (),
+    tam_trozo: int = TAM_TROZO,
+    cache_dir: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Recorre el CSV en trozos de 'tam_trozo' filas. El dialecto se detecta
+    sobre una muestra; del encabezado se leen solo las columnas cuyo
+    nombre final (renombrar, sobre el encabezado completo) cumple 'conservar'. Los valores llegan
+    como texto: los tipos se deciden al volcar (volcar_trozos).
+    """
+    dialecto = resolver_dialecto(src, leer_muestra(src), esperadas, cache_dir)
+    opciones = dict(encoding=dialecto.encoding, sep=dialecto.sep)
+    encabezado = pd.read_csv(src, nrows=0, **opciones).columns
+    nombres = renombrar(list(encabezado))
+    posiciones = [i for i, n in enumerate(nombres) if conservar(n)]
+    columnas = [nombres[i] for i in posiciones]
+
+    lector = pd.read_csv(src, usecols=posiciones, dtype=str, chunksize=tam_trozo, **opciones)
+    vacio = True
+    for trozo in lector:
+        trozo.columns = columnas
+        vacio = False
+        yield trozo
+    if vacio:
+        yield pd.DataFrame(columns=columnas, dtype=str)
+
+
+class _Tipos:
+    """Tipo final de cada columna, inferido trozo a trozo como lo haría read_csv."""
+
+    def __init__(self, columnas: List[str], categoricas: Iterable[str]):
+        unicas = {c for c in columnas if columnas.count(c) == 1}
+        self.categoricas = [i for i, c in enumerate(columnas) if c in set(categoricas) & unicas]
+        self.numerica = [i not in self.categoricas for i in range(len(columnas))]
+        self.entera = list(self.numerica)
+        self.valores: Dict[int, Set[str]] = {i: set() for i in self.categoricas}
+
+    def observar(self, trozo: pd.DataFrame) -> pd.DataFrame:
+        """Limpia las categóricas del trozo y actualiza la inferencia de tipos."""
+        for i in range(trozo.shape[1]):
+            col = trozo.iloc[:, i]
+            if i in self.valores:
+                num = pd.to_numeric(col, errors="coerce")
+                if num.notna().sum() == col.notna().sum():
+                    col = num  # como read_csv: LEY "600.0" -> 600 -> "600"
+                limpia = categoria(col)
+                self.valores[i].update(limpia.cat.categories)
+                trozo.isetitem(i, limpia.astype(object))
+            elif self.numerica[i]:
+                num = pd.to_numeric(col, errors="coerce")
+                self.numerica[i] = num.notna().sum() == col.notna().sum()
+                self.entera[i] = self.entera[i] and self.numerica[i] and num.dtype.kind in "iu"
+        return trozo
+
+    def convertir(self, lote: "pa.RecordBatch", diccionarios: Dict[int, "pa.Array"]) -> List["pa.Array"]:
+        arrays = []
+        for i, arr in enumerate(lote.columns):
+            if i in diccionarios:
+                dic = diccionarios[i]
+                codigos = pd.Categorical(arr.to_pandas(), categories=dic.to_pandas()).codes
+                indices = pa.array(codigos, type=pa.int32(), mask=codigos < 0)
+                arrays.append(pa.DictionaryArray.from_arrays(indices, dic))
+            elif self.numerica[i]:
+                tipo = pa.int64() if self.entera[i] else pa.float64()
+                num = pd.to_numeric(arr.to_pandas(), errors="coerce")
+                arrays.append(pa.array(num.to_numpy(dtype=np.float64 if tipo == pa.float64() else np.int64), type=tipo))
+            else:
+                arrays.append(arr)
+        return arrays
+
+
+def volcar_trozos(
+    trozos: Iterable[pd.DataFrame],
+    ruta_arrow: str,
+    categoricas: Iterable[str] = COLUMNAS_CATEGORICAS,
+) -> None:
+    """
+    Escribe los trozos en un archivo Arrow IPC en dos pasadas, ambas con
+    memoria acotada a un trozo:
+      1) texto tal cual a un archivo temporal, limpiando las columnas
+         categóricas (categoria) y anotando qué columnas son numéricas;
+      2) del temporal (mapeado en memoria) al definitivo, con números
+         como int64/float64 y categóricas como diccionario común ordenado,
+         que to_pandas devuelve como 'category'.
+    """
+    temporal = ruta_arrow + ".texto"
+    tipos = None
+    try:
+        escritor = None
+        with pa.OSFile(temporal, "wb") as sink:
+            for trozo in trozos:
+                if tipos is None:
+                    tipos = _Tipos([str(c) for c in trozo.columns], categoricas)
+                trozo = tipos.observar(trozo)
+                arrays = [pa.array(trozo.iloc[:, i], type=pa.string(), from_pandas=True) for i in range(trozo.shape[1])]
+                lote = pa.RecordBatch.from_arrays(arrays, names=[str(c) for c in trozo.columns])
+                if escritor is None:
+                    escritor = pa.ipc.new_file(sink, lote.schema)
+                escritor.write_batch(lote)
+            if escritor is not None:
+                escritor.close()
+
+        diccionarios = {i: pa.array(sorted(v), type=pa.string()) for i, v in tipos.valores.items()}
+        lector = pa.ipc.open_file(pa.memory_map(temporal, "r"))
+        escritor = None
+        with pa.OSFile(ruta_arrow, "wb") as sink:
+            for k in range(lector.num_record_batches):
+                lote = lector.get_batch(k)
+                lote = pa.RecordBatch.from_arrays(tipos.convertir(lote, diccionarios), names=lote.schema.names)
+                if escritor is None:
+                    escritor = pa.ipc.new_file(sink, lote.schema)
+                escritor.write_batch(lote)
+            if escritor is not None:
+                escritor.close()
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _en_memoria(trozos: Iterable[pd.DataFrame], categoricas: Iterable[str]) -> pd.DataFrame:
+    # Respaldo sin pyarrow o sin disco: mismas columnas, sin cota de memoria
+    df = pd.concat(list(trozos), ignore_index=True)
+    for i in range(df.shape[1]):
+        df.isetitem(i, _numerica(df.iloc[:, i]))
+    for col in set(categoricas):
+        if col in df.columns and isinstance(df[col], pd.Series):
+            df[col] = categoria(df[col])
+    return df
+
+
+def _numerica(col: pd.Series) -> pd.Series:
+    num = pd.to_numeric(col, errors="coerce")
+    return num if num.notna().sum() == col.notna().sum() else col
+
+
+def cargar_por_trozos(
+    src: str,
+    renombrar: Callable[[Sequence[str]], List[str]],
+    conservar: Callable[[str], bool],
+    etiqueta: str,
+    esperadas: Iterable[str] = (),
+    categoricas: Iterable[str] = COLUMNAS_CATEGORICAS,
+    tam_trozo: int = TAM_TROZO,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Carga src por trozos a través de la caché en disco (leer_con_cache):
+    si la copia sigue vigente se mapea en memoria; si no, se vuelca trozo
+    a trozo y luego se mapea. Las columnas salen renombradas, solo las que
+    cumplen 'conservar', con las categóricas como 'category'.
+    """
+    def trozos(s: str) -> Iterator[pd.DataFrame]:
+        return trozos_csv(s, renombrar, conservar, esperadas, tam_trozo, cache_dir)
+
+    categoricas = list(categoricas)
+    return leer_con_cache(
+        src,
+        lambda s: _en_memoria(trozos(s), categoricas),
+        etiqueta + "|trozos",
+        cache_dir,
+        volcar=None if pa is None else lambda s, ruta: volcar_trozos(trozos(s), ruta, categoricas),
+    )
@@ -0,0 +1,156 @@
+# -------------------------------------------------------------
+# Mapa de calor a partir de conteos dispersos (fila, columna)
+# Solo viajan al navegador las celdas con datos: top-N + "OTROS",
+# y si la matriz sigue siendo grande, treemap o barras ordenadas.
+# -------------------------------------------------------------
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+OTROS = "OTROS"
+# Celdas (filas x columnas) a partir de las cuales el heatmap deja de ser legible
+MAX_CELDAS = 2500
+# Hasta cuántas celdas se escribe el número dentro de cada una
+MAX_CELDAS_TEXTO = 400
+VISTAS = ("auto", "calor", "treemap", "barras")
+
+
+def conteos_pares(df: pd.DataFrame, fila: str, columna: str) -> pd.Series:
+    """Conteos dispersos por (fila, columna): solo las combinaciones presentes."""
+    conteos = df.groupby([fila, columna], observed=True, sort=False).size()
+    return conteos[conteos > 0]
+
+
+def _top(etiquetas: pd.Index, conteos: pd.Series, nivel: int, maximo: Optional[int], otros: str) -> pd.Index:
+    if maximo is None:
+        return etiquetas
+    totales = conteos.groupby(level=nivel, sort=False).sum()
+    if len(totales) <= maximo:
+        return etiquetas
+    mantener = totales.sort_values(ascending=False, kind="stable").index[:maximo]
+    return pd.Index(etiquetas.astype(object)).where(etiquetas.isin(mantener), otros)
+
+
+def agrupar_otros(
+    conteos: pd.Series,
+    max_filas: Optional[int] = None,
+    max_columnas: Optional[int] = None,
+    otros: str = OTROS,
+) -> pd.Series:
+    """
+    Conserva las 'max_filas' filas y 'max_columnas' columnas con más
+    registros y suma el resto en 'otros'. Entrada y salida son Series con
+    índice (fila, columna) sin ceros; nunca se arma la matriz densa.
+    """
+    nombres = list(conteos.index.names)
+    filas = _top(conteos.index.get_level_values(0), conteos, 0, max_filas, otros)
+    columnas = _top(conteos.index.get_level_values(1), conteos, 1, max_columnas, otros)
+    agrupado = conteos.groupby([filas, columnas], sort=False).sum()
+    agrupado.index.names = nombres
+    return agrupado
+
+
+def _orden(etiquetas: pd.Series, otros: str) -> list:
+    # De mayor a menor total; "otros" siempre al final
+    orden = etiquetas.sort_values(ascending=False, kind="stable").index.tolist()
+    if otros in orden:
+        orden.remove(otros)
+        orden.append(otros)
+    return orden
+
+
+def matriz(conteos: pd.Series, otros: str = OTROS) -> pd.DataFrame:
+    """Matriz densa (filas x columnas) ordenada por total; solo para conteos ya acotados."""
+    filas = _orden(conteos.groupby(level=0, sort=False).sum(), otros)
+    columnas = _orden(conteos.groupby(level=1, sort=False).sum(), otros)
+    return conteos.unstack(fill_value=0).reindex(index=filas, columns=columnas, fill_value=0)
+
+
+def _figura_calor(conteos: pd.Series, titulo: str, etiquetas: Dict[str, str], colorscale: Optional[str], texto: bool) -> go.Figure:
+    m = matriz(conteos)
+    z = m.to_numpy(dtype=np.float64, copy=True)
+    z[z == 0] = np.nan  # celdas vacías sin color ni hover
+    traza = dict(
+        z=z,
+        x=m.columns.astype(str).tolist(),
+        y=m.index.astype(str).tolist(),
+        colorscale=colorscale,
+        hoverongaps=False,
+        colorbar_title=etiquetas.get("color", "CANTIDAD"),
+    )
+    if texto and m.size <= MAX_CELDAS_TEXTO:
+        traza.update(texttemplate="%{z}")
+    fig = go.Figure(data=go.Heatmap(**traza))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=etiquetas.get("x", m.columns.name),
+        yaxis_title=etiquetas.get("y", m.index.name),
+        yaxis_autorange="reversed",
+        height=max(420, min(18 * len(m.index), 1200)),
+    )
+    return fig
+
+
+def _figura_treemap(conteos: pd.Series, titulo: str) -> go.Figure:
+    # El nivel con menos etiquetas agrupa al otro (p. ej. departamento -> municipio)
+    unicos = [conteos.index.get_level_values(i).nunique() for i in (0, 1)]
+    nivel = int(unicos[1] < unicos[0])
+    hijos = conteos.index.get_level_values(1 - nivel).astype(str)
+    grupos = conteos.index.get_level_values(nivel).astype(str)
+    padres = conteos.groupby(level=nivel, sort=False).sum()
+    fig = go.Figure(go.Treemap(
+        ids=list(padres.index.astype(str)) + list(grupos + "/" + hijos),
+        labels=list(padres.index.astype(str)) + list(hijos),
+        parents=[""] * len(padres) + list(grupos),
+        values=np.concatenate([padres.to_numpy(), conteos.to_numpy()]),
+        branchvalues="total",
+    ))
+    fig.update_layout(title=titulo, height=600, margin=dict(t=50, l=10, r=10, b=10))
+    return fig
+
+
+def _figura_barras(conteos: pd.Series, titulo: str, etiquetas: Dict[str, str], max_barras: int = 50) -> go.Figure:
+    top = conteos.sort_values(ascending=False, kind="stable").head(max_barras)
+    nombres = [f"{f} ({c})" for f, c in top.index]
+    fig = go.Figure(go.Bar(x=top.to_numpy(), y=nombres, orientation="h", text=top.to_numpy(), textposition="outside"))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=etiquetas.get("color", "CANTIDAD"),
+        yaxis_autorange="reversed",
+        height=max(420, 20 * len(top)),
+    )
+    return fig
+
+
+def figura_mapa_calor(
+    conteos: pd.Series,
+    titulo: str = "",
+    etiquetas: Optional[Dict[str, str]] = None,
+    max_filas: Optional[int] = None,
+    max_columnas: Optional[int] = None,
+    vista: str = "auto",
+    colorscale: Optional[str] = None,
+    texto: bool = True,
+) -> go.Figure:
+    """
+    Figura para conteos dispersos con índice (fila, columna).
+    Primero agrupa en "OTROS" lo que quede fuera del top-N; luego:
+      - "calor": heatmap compacto (sin celdas vacías, texto solo si es pequeño);
+      - "treemap": el nivel con menos etiquetas como padre, una caja por celda con datos;
+      - "barras": las combinaciones más frecuentes, ordenadas;
+      - "auto": heatmap si caben MAX_CELDAS celdas, si no treemap.
+    'etiquetas' acepta las claves x, y y color (como px.imshow).
+    """
+    etiquetas = etiquetas or {}
+    conteos = agrupar_otros(conteos, max_filas, max_columnas)
+    if vista == "auto":
+        celdas = conteos.index.get_level_values(0).nunique() * conteos.index.get_level_values(1).nunique()
+        vista = "calor" if celdas <= MAX_CELDAS else "treemap"
+    if vista == "treemap":
+        return _figura_treemap(conteos, titulo)
+    if vista == "barras":
+        return _figura_barras(conteos, titulo, etiquetas)
+    return _figura_calor(conteos, titulo, etiquetas, colorscale, texto)
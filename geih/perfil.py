@@ -0,0 +1,141 @@
+# -------------------------------------------------------------
+# Perfil de una ejecución de los tableros (opcional)
+# Tiempos por sección (vueltas de cronómetro entre marcas) y
+# aciertos/fallos de las cachés de carga; cada ejecución se
+# agrega como una línea a un JSONL para analizarla fuera.
+# -------------------------------------------------------------
+
+import contextvars
+import functools
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from geih.cache import BASE_DIR
+
+# Se activa con la variable de entorno o con ?perfil=1 en la URL (ver geih.componentes)
+VARIABLE_ENTORNO = "GEIH_PERFIL"
+PARAMETRO_URL = "perfil"
+RUTA_LOG = os.environ.get("GEIH_PERFIL_LOG", os.path.join(BASE_DIR, "data", ".perfil", "tiempos.jsonl"))
+
+# Perfil de la ejecución en curso; cada ejecución de Streamlit corre en su
+# propio hilo, así que sesiones simultáneas no se mezclan
+_actual: contextvars.ContextVar = contextvars.ContextVar("geih_perfil", default=None)
+
+
+def activado_por_entorno() -> bool:
+    return os.environ.get(VARIABLE_ENTORNO, "").strip().lower() in ("1", "true", "si", "sí")
+
+
+class Perfil:
+    """
+    Cronómetro de una ejecución: seccion(nombre) cierra la sección abierta
+    y abre la siguiente, así el código del tablero no cambia de sangría.
+    Una sección que se repite acumula su tiempo.
+    """
+
+    def __init__(self, tablero: str):
+        self.tablero = tablero
+        self.inicio = time.perf_counter()
+        self.marca_tiempo = time.time()
+        self.secciones: Dict[str, float] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self._abierta: Optional[str] = None
+        self._desde = self.inicio
+        self.total: Optional[float] = None
+
+    def seccion(self, nombre: str) -> None:
+        ahora = time.perf_counter()
+        self._cerrar(ahora)
+        self._abierta, self._desde = nombre, ahora
+
+    def _cerrar(self, ahora: float) -> None:
+        if self._abierta is not None:
+            self.secciones[self._abierta] = self.secciones.get(self._abierta, 0.0) + ahora - self._desde
+            self._abierta = None
+
+    def llamada(self, cache: str) -> None:
+        self.caches.setdefault(cache, {"llamadas": 0, "fallos": 0})["llamadas"] += 1
+
+    def fallo(self, cache: str) -> None:
+        self.caches.setdefault(cache, {"llamadas": 0, "fallos": 0})["fallos"] += 1
+
+    def terminar(self) -> Dict[str, Any]:
+        """Cierra la última sección y devuelve el resumen (ver resumen)."""
+        ahora = time.perf_counter()
+        self._cerrar(ahora)
+        self.total = ahora - self.inicio
+        return self.resumen()
+
+    def resumen(self) -> Dict[str, Any]:
+        """Tiempos en ms y, por caché, llamadas, aciertos y fallos."""
+        total = self.total if self.total is not None else time.perf_counter() - self.inicio
+        return {
+            "ts": round(self.marca_tiempo, 3),
+            "tablero": self.tablero,
+            "total_ms": round(total * 1000, 2),
+            "secciones": {n: round(s * 1000, 2) for n, s in self.secciones.items()},
+            "caches": {
+                n: {**c, "aciertos": c["llamadas"] - c["fallos"]}
+                for n, c in self.caches.items()
+            },
+        }
+
+    def escribir(self, ruta: str = RUTA_LOG) -> Optional[str]:
+        """Agrega el resumen como una línea JSON; None si no se puede escribir."""
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.resumen(), ensure_ascii=False) + "\n")
+        except OSError:
+            return None
+        return ruta
+
+
+def iniciar(tablero: str, activo: bool) -> Optional[Perfil]:
+    """Perfil de esta ejecución (None si está desactivado); queda como el actual."""
+    perfil = Perfil(tablero) if activo else None
+    _actual.set(perfil)
+    return perfil
+
+
+def actual() -> Optional[Perfil]:
+    return _actual.get()
+
+
+def seccion(nombre: str) -> None:
+    """Marca el inicio de 'nombre' en el perfil actual; no hace nada si está desactivado."""
+    perfil = _actual.get()
+    if perfil is not None:
+        perfil.seccion(nombre)
+
+
+def contar_cache(nombre: str, decorador: Callable[[Callable], Callable]) -> Callable[[Callable], Callable]:
+    """
+    Aplica 'decorador' (p. ej. st.cache_data(...)) y cuenta en el perfil
+    actual las llamadas y las veces que se ejecutó el cuerpo: los fallos
+    de la caché. Sin perfil activo solo cuesta una consulta al ContextVar.
+    """
+    def envolver(funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def cuerpo(*args, **kwargs):
+            perfil = _actual.get()
+            if perfil is not None:
+                perfil.fallo(nombre)
+            return funcion(*args, **kwargs)
+
+        cacheada = decorador(cuerpo)
+
+        @functools.wraps(funcion)
+        def llamada(*args, **kwargs):
+            perfil = _actual.get()
+            if perfil is not None:
+                perfil.llamada(nombre)
+            return cacheada(*args, **kwargs)
+
+        if hasattr(cacheada, "clear"):
+            llamada.clear = cacheada.clear
+        return llamada
+
+    return envolver
@@ -0,0 +1,90 @@
+# -------------------------------------------------------------
+# Servicio de datos para mapas de puntos
+# Agrupa los puntos en celdas de una rejilla que depende del zoom
+# y, si quedan más de MAX_MARCADORES, la hace más gruesa hasta que
+# quepan: al navegador llega un número acotado de marcadores,
+# sin importar cuántas filas tenga el dataset.
+# -------------------------------------------------------------
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Celdas por tesela de 256 px (8 -> una celda cada ~32 px de pantalla)
+CELDAS_POR_TESELA = 8
+# Tope de marcadores por mapa (por celda y categoría)
+MAX_MARCADORES = 2000
+
+
+def _mercator_y(lat: np.ndarray) -> np.ndarray:
+    # Latitud -> y de Web Mercator en "grados" (misma escala que la longitud)
+    lat = np.clip(lat, -85.0511, 85.0511)
+    return np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))
+
+
+def tamano_celda(zoom: float) -> float:
+    """Lado de la celda en grados de longitud (y Mercator) para un zoom."""
+    return 360.0 / (2.0 ** zoom) / CELDAS_POR_TESELA
+
+
+def _n_celdas(cx: np.ndarray, cy: np.ndarray, cat: Optional[np.ndarray], nivel: int) -> int:
+    # Celdas distintas tras juntar 2**nivel x 2**nivel celdas de la rejilla base
+    partes = {"cx": cx >> nivel, "cy": cy >> nivel}
+    if cat is not None:
+        partes["cat"] = cat
+    return len(pd.DataFrame(partes).drop_duplicates())
+
+
+def agrupar_en_celdas(
+    df: pd.DataFrame,
+    zoom: float,
+    lat: str = "Lat",
+    lon: str = "Long",
+    categoria: Optional[str] = None,
+    nombre: Optional[str] = None,
+    max_marcadores: Optional[int] = MAX_MARCADORES,
+) -> pd.DataFrame:
+    """
+    Marcadores agregados: un marcador por celda de la rejilla del zoom (y
+    por categoría, si se da) con las columnas lat, lon (centroide de sus
+    puntos), N, la categoría y un nombre: el del punto si la celda tiene
+    uno solo, "N puntos" si agrupa varios. Si salen más de max_marcadores,
+    cada paso junta 2x2 celdas (la rejilla de un zoom menos) hasta que
+    quepan (nunca menos marcadores que categorías distintas); None no pone
+    tope. Los puntos sin coordenadas se descartan.
+    """
+    la = pd.to_numeric(df[lat], errors="coerce").to_numpy(dtype=np.float64)
+    lo = pd.to_numeric(df[lon], errors="coerce").to_numpy(dtype=np.float64)
+    validos = ~(np.isnan(la) | np.isnan(lo))
+    la, lo = la[validos], lo[validos]
+
+    tam = tamano_celda(zoom)
+    cx = np.floor(lo / tam).astype(np.int64)
+    cy = np.floor(_mercator_y(la) / tam).astype(np.int64)
+    cat = pd.factorize(df[categoria].to_numpy()[validos])[0] if categoria is not None else None
+    nivel = 0
+    if max_marcadores is not None and len(cx):
+        # floor(x / 2t) == floor(x / t) >> 1: la rejilla gruesa sale de los índices base.
+        # Pasado 'tope' todo cae en una celda (solo quedan las categorías)
+        tope = int(max(np.ptp(cx), np.ptp(cy))).bit_length() + 1
+        while nivel < tope and _n_celdas(cx, cy, cat, nivel) > max_marcadores:
+            nivel += 1
+
+    partes = {"cx": cx >> nivel, "cy": cy >> nivel, lat: la, lon: lo}
+    claves = ["cx", "cy"]
+    if categoria is not None:
+        partes[categoria] = df[categoria].to_numpy()[validos]
+        claves.append(categoria)
+    if nombre is not None:
+        partes[nombre] = df[nombre].to_numpy()[validos]
+    puntos = pd.DataFrame(partes)
+
+    agregados = {lat: (lat, "mean"), lon: (lon, "mean"), "N": (lat, "size")}
+    if nombre is not None:
+        agregados[nombre] = (nombre, "first")
+    celdas = puntos.groupby(claves, sort=False, dropna=False).agg(**agregados).reset_index()
+    if nombre is not None:
+        varios = celdas["N"] > 1
+        celdas[nombre] = celdas[nombre].astype(object).where(~varios, celdas["N"].astype(str) + " puntos")
+    return celdas.drop(columns=["cx", "cy"]).sort_values("N", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,90 @@
+# -------------------------------------------------------------
+# Tabla paginada sobre un DataFrame en caché
+# Orden y filtro se resuelven en el servidor como posiciones; al
+# navegador solo se envía la ventana de la página actual.
+# -------------------------------------------------------------
+
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from geih.filtros import MotorFiltros
+
+TAM_PAGINA = 50
+
+
+def paginas(total: int, tam: int = TAM_PAGINA) -> int:
+    """Número de páginas para 'total' filas (al menos una, aunque no haya filas)."""
+    return max(1, -(-total // tam))
+
+
+class TablaPaginada:
+    """
+    Índices de orden y filtro de un DataFrame, construidos bajo demanda y
+    guardados para los siguientes reruns:
+      - orden: posiciones ordenadas por columna y sentido (estable, nulos
+        al final), una vez por combinación;
+      - filtro: máscaras de MotorFiltros para {columna: valor} y texto libre.
+    Las columnas se identifican por posición, así los encabezados
+    repetidos no son ambiguos.
+    """
+
+    def __init__(self, df: pd.DataFrame, filtrables: Sequence[str] = ()):
+        self.df = df
+        self.n = len(df)
+        self.motor = MotorFiltros(df, categoricas=filtrables)
+        self._ordenes: Dict[Hashable, np.ndarray] = {}
+        self._nulos: Optional[float] = None
+
+    def orden(self, columna: Optional[int], ascendente: bool = True) -> Optional[np.ndarray]:
+        """Posiciones de las filas ordenadas por la columna en esa posición (None: sin orden)."""
+        if columna is None:
+            return None
+        clave = (columna, ascendente)
+        if clave not in self._ordenes:
+            serie = self.df.iloc[:, columna].reset_index(drop=True)
+            try:
+                ordenada = serie.sort_values(ascending=ascendente, kind="stable", na_position="last")
+            except TypeError:
+                # Tipos mezclados (p. ej. números y texto en un CSV sucio): orden como texto
+                ordenada = serie.astype(str).where(serie.notna()).sort_values(
+                    ascending=ascendente, kind="stable", na_position="last"
+                )
+            self._ordenes[clave] = ordenada.index.to_numpy()
+        return self._ordenes[clave]
+
+    def posiciones(
+        self,
+        filtros: Optional[Dict[str, Any]] = None,
+        consulta: str = "",
+        orden: Optional[int] = None,
+        ascendente: bool = True,
+    ) -> np.ndarray:
+        """Posiciones de las filas que pasan los filtros, en el orden pedido."""
+        mascara = self.motor.mascara(filtros or {}, consulta)
+        pos = self.orden(orden, ascendente)
+        if pos is None:
+            return np.arange(self.n) if mascara is None else np.flatnonzero(mascara)
+        return pos if mascara is None else pos[mascara[pos]]
+
+    def ventana(
+        self,
+        posiciones: np.ndarray,
+        pagina: int = 1,
+        tam: int = TAM_PAGINA,
+        columnas: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Filas de la página (empezando en 1) como DataFrame pequeño; solo 'columnas' si se dan."""
+        pagina = min(max(1, int(pagina)), paginas(len(posiciones), tam))
+        inicio = (pagina - 1) * tam
+        filas = self.df.iloc[posiciones[inicio:inicio + tam]]
+        return filas if columnas is None else filas[list(columnas)]
+
+    def porcentaje_nulos(self) -> float:
+        """Porcentaje de celdas nulas; igual a isnull().mean().mean() * 100, columna por columna."""
+        if self._nulos is None:
+            celdas = self.df.size
+            nulos = sum(int(self.df.iloc[:, i].isna().sum()) for i in range(self.df.shape[1]))
+            self._nulos = 100.0 * nulos / celdas if celdas else 0.0
+        return self._nulos
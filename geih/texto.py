@@ -0,0 +1,73 @@
+# -------------------------------------------------------------
+# Normalización de texto (acentos, espacios, mayúsculas)
+# Una sola implementación para encabezados, valores sueltos y
+# columnas: las Series se factorizan, se normaliza cada valor
+# distinto una vez y el resultado se reparte por los códigos.
+# Los valores ya normalizados quedan en una LRU acotada que
+# sobrevive a los reruns del proceso.
+# -------------------------------------------------------------
+
+import functools
+import os
+import re
+import unicodedata
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Marcas diacríticas combinantes que deja la descomposición NFD
+_DIACRITICOS = re.compile("[\u0300-\u036f]")
+
+# Entradas (texto, opciones) normalizadas que se recuerdan entre reruns
+TAM_CACHE = int(os.environ.get("GEIH_CACHE_TEXTO", 1 << 16))
+
+
+@functools.lru_cache(maxsize=TAM_CACHE)
+def _normalizar(texto: str, mayusculas: Optional[bool], quitar_tildes: bool) -> str:
+    if quitar_tildes and not texto.isascii():
+        texto = _DIACRITICOS.sub("", unicodedata.normalize("NFD", texto))
+    texto = " ".join(texto.split())
+    if mayusculas is None:
+        return texto
+    return texto.upper() if mayusculas else texto.lower()
+
+
+def normalizar_texto(x, mayusculas: Optional[bool] = True, quitar_tildes: bool = True) -> str:
+    """
+    Quita tildes, colapsa espacios y pasa a mayúsculas (minúsculas con
+    mayusculas=False, sin cambio con None) un valor suelto. Nulos -> "".
+    """
+    if x is None or x is pd.NA or (isinstance(x, float) and x != x):
+        return ""
+    return _normalizar(x if isinstance(x, str) else str(x), mayusculas, quitar_tildes)
+
+
+def normalizar_unicos(
+    serie: pd.Series, mayusculas: Optional[bool] = True, quitar_tildes: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (códigos, valores): cada valor distinto de 'serie' normalizado una sola
+    vez (ver normalizar_texto) y el código de cada fila en 'valores'; los
+    nulos tienen código -1. Las categóricas usan sus propias categorías.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    valores = np.array(
+        [_normalizar(u if isinstance(u, str) else str(u), mayusculas, quitar_tildes) for u in unicos],
+        dtype=object,
+    )
+    return codigos, valores
+
+
+def normalizar_serie(serie: pd.Series, mayusculas: bool = True) -> pd.Series:
+    """
+    Quita tildes, colapsa espacios y pasa a mayúsculas (o minúsculas) una
+    Serie completa normalizando solo sus valores distintos. Los nulos
+    quedan como cadena vacía.
+    """
+    codigos, valores = normalizar_unicos(serie, mayusculas)
+    salida = np.append(valores, "")[codigos]  # código -1 -> ""
+    return pd.Series(salida, index=serie.index, name=serie.name, dtype=str)
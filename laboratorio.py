@@ -1,29 +1,118 @@
 import streamlit as st
 import pandas as pd
-import difflib
+import numpy as np
 from io import BytesIO
-import unicodedata  # para normalizar texto
+
+from geih.componentes import tabla_paginada
+from geih.cruce import CLAVE_1, CLAVE_2, IndiceClaves, cruzar, unir
+from geih.emparejamiento import (
+    MODOS_BLOQUEO,
+    PoolCandidatos,
+    armar_aproximados,
+    claves_bloqueo,
+    emparejar_difuso,
+    texto_concatenado,
+    total_comparaciones,
+)
+from geih.etapas import Tuberia, hash_bytes
+from geih.exportacion import MIME_CSV, MIME_XLSX, a_csv, a_xlsx
+from geih.incremental import Estado, emparejar_incremental, identificar, ruta_estado
 
 st.title("Comparar, Analizar y Unir Archivos CSV")
 
-# ---------- Utilidades ----------
-def quitar_tildes(s: str) -> str:
-    if s is None:
-        return ""
-    return "".join(c for c in unicodedata.normalize("NFD", str(s)) if unicodedata.category(c) != "Mn")
-
-def norm_caso(s: str) -> str:
-    # normaliza campos de texto tipo "caso" (criterio 1)
-    s = "" if s is None else str(s)
-    s = s.replace("\n", " ").replace("\r", " ")
-    s = " ".join(s.split()).strip().lower()
-    s = quitar_tildes(s)
-    return s
-
-def norm_radicado(s: str) -> str:
-    # normaliza campos tipo "radicado" (criterio 2)
-    s = "" if s is None else str(s)
-    return s.strip()
+# ---------- Etapas ----------
+# lectura -> claves -> cruce exacto -> difuso -> conciliación.
+# Cada resultado queda en session_state con la clave del contenido subido
+# y de los parámetros de la etapa: un control solo recalcula lo que depende de él.
+tuberia = Tuberia(st.session_state)
+
+def leer_csv_subido(datos: bytes, **kwargs) -> pd.DataFrame:
+    # utf-8 y, si falla la decodificación, latin1
+    try:
+        return pd.read_csv(BytesIO(datos), encoding="utf-8", **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(BytesIO(datos), encoding="latin1", **kwargs)
+
+def etiquetas_filas(df: pd.DataFrame, col_crit1: str, col_crit2: str) -> list:
+    # "[Criterio 2: r] Criterio 1: c" por fila, para el selector de conciliación
+    c = df[col_crit1].astype(object).map(str)
+    r = df[col_crit2].astype(object).map(str)
+    return ("[Criterio 2: " + r + "] Criterio 1: " + c).tolist()
+
+def cruce_exacto(indice_lab, indice_exh, df_lab, df_exh, col_crit1_lab, col_crit2_lab):
+    # Un solo hash join: coincidencias (inner) y no coincidentes (anti-join)
+    cruce = cruzar(indice_lab, indice_exh)
+    coincidencias = unir(df_lab, df_exh, cruce, indice_lab, sufijos=("_lab", "_exh"))
+    no_coincidentes_lab = df_lab.iloc[cruce.sin_pareja]
+    opciones = etiquetas_filas(no_coincidentes_lab, col_crit1_lab, col_crit2_lab)
+    return cruce, coincidencias, no_coincidentes_lab, opciones
+
+def candidatos_difusos(df_lab, df_exh, columnas_lab, columnas_exh, modo_bloqueo, col_bloque_lab, col_bloque_exh):
+    # Candidatos preparados una vez: texto concatenado, disponibles y bloques
+    valores_lab = texto_concatenado(df_lab, columnas_lab)
+    pool_exh = PoolCandidatos(df_exh, columnas_exh)
+    if modo_bloqueo == "columna":
+        bloques_lab = claves_bloqueo(df_lab[col_bloque_lab].tolist(), "columna")
+        bloques_exh = claves_bloqueo(df_exh[col_bloque_exh].tolist(), "columna")
+    else:
+        bloques_lab = claves_bloqueo(valores_lab, modo_bloqueo)
+        bloques_exh = claves_bloqueo(pool_exh.valores, modo_bloqueo)
+    pool_exh.bloquear(bloques_exh)
+    return valores_lab, pool_exh, bloques_lab, total_comparaciones(bloques_lab, bloques_exh)
+
+def coincidencias_difusas(df_lab, valores_lab, pool_exh, bloques_lab, sensibilidad, estado=None, ids=None):
+    if estado is not None:
+        # Incremental: se conservan los pares de filas sin cambios
+        pares, resumen = emparejar_incremental(valores_lab, pool_exh, sensibilidad, bloques_lab, estado, *ids)
+        return armar_aproximados(df_lab, pool_exh, pares), pares, resumen
+    pool_exh.reiniciar()  # el pool se comparte entre sensibilidades
+    progress_bar = st.progress(0, text="Comparando registros...")
+    pares = emparejar_difuso(
+        valores_lab,
+        pool_exh,
+        sensibilidad,
+        bloques_lab=bloques_lab,
+        progreso=lambda x: progress_bar.progress(x, text="Comparando registros...")
+    )
+    progress_bar.empty()
+    return armar_aproximados(df_lab, pool_exh, pares), pares, None
+
+def guardar_estado(ruta, ids, pares, manual):
+    # Decisiones aceptadas: base de la próxima conciliación incremental
+    Estado.desde(*ids, pares, manual).guardar(ruta)
+    return ruta
+
+def conciliar(coincidencias, no_coincidentes_lab, indice_lab, cruce, sel_idx, aproximados):
+    # Tomamos las filas seleccionadas de Archivo laboratorio
+    agregar_lab = no_coincidentes_lab.iloc[sel_idx].copy()
+
+    # Renombramos columnas con sufijo _lab para concatenar con 'coincidencias'
+    ren = {c: f"{c}_lab" for c in agregar_lab.columns}
+    agregar_lab_suf = agregar_lab.rename(columns=ren)
+
+    # Asegurar columnas clave con prefijo (ya calculadas en el índice)
+    claves_sel = indice_lab.claves(cruce.sin_pareja[sel_idx])
+    agregar_lab_suf[CLAVE_1] = claves_sel[CLAVE_1].to_numpy()
+    agregar_lab_suf[CLAVE_2] = claves_sel[CLAVE_2].to_numpy()
+
+    # Reindexar columnas para encajar con 'coincidencias'
+    cols_final = list(coincidencias.columns)
+    for c in agregar_lab_suf.columns:
+        if c not in cols_final:
+            cols_final.append(c)
+
+    # --- Coincidencias aproximadas (difusas) ---
+    if aproximados is not None and len(aproximados) > 0:
+        df_aproximados = aproximados.reindex(columns=cols_final)
+    else:
+        df_aproximados = pd.DataFrame(columns=cols_final)
+
+    # Unión de todos los resultados
+    coincidencias_final = pd.concat(
+        [coincidencias.reindex(columns=cols_final), agregar_lab_suf.reindex(columns=cols_final), df_aproximados],
+        ignore_index=True
+    )
+    return agregar_lab_suf, df_aproximados, coincidencias_final
 
 # ---------- Carga ----------
 file_lab = st.file_uploader("Sube **Archivo laboratorio**.csv", type=['csv'])
@@ -33,24 +122,18 @@ df_lab = None     # antes df_lunes
 df_exh = None     # antes df_martes
 
 if file_lab:
+    datos_lab = file_lab.getvalue()
     try:
-        df_lab = pd.read_csv(file_lab, encoding="utf-8")
-    except UnicodeDecodeError:
-        try:
-            df_lab = pd.read_csv(file_lab, encoding="latin1")
-        except Exception as e:
-            st.error(f"Error al leer **Archivo laboratorio**: {e}")
+        df_lab, clave_lab = tuberia.ejecutar("lectura_lab", [hash_bytes(datos_lab)], (), lambda: leer_csv_subido(datos_lab))
     except Exception as e:
         st.error(f"Error al leer **Archivo laboratorio**: {e}")
 
 if file_exh:
+    datos_exh = file_exh.getvalue()
     try:
-        df_exh = pd.read_csv(file_exh, encoding="utf-8", on_bad_lines='skip')
-    except UnicodeDecodeError:
-        try:
-            df_exh = pd.read_csv(file_exh, encoding="latin1", on_bad_lines='skip')
-        except Exception as e:
-            st.error(f"Error al leer **Exhumaciones**: {e}")
+        df_exh, clave_exh = tuberia.ejecutar(
+            "lectura_exh", [hash_bytes(datos_exh)], (), lambda: leer_csv_subido(datos_exh, on_bad_lines='skip')
+        )
     except Exception as e:
         st.error(f"Error al leer **Exhumaciones**: {e}")
 
@@ -95,116 +178,80 @@ if df_lab is not None and df_exh is not None:
             index=(df_exh.columns.tolist().index("Radicado") if "Radicado" in df_exh.columns else 0)
         )
 
+    # Los botones solo valen en el rerun del clic: el cruce y la conciliación
+    # quedan activos en session_state y sus resultados en la tubería
     if st.button("Ejecutar cruce exacto"):
-        # Claves normalizadas
-        lab = df_lab.copy()
-        exh = df_exh.copy()
-
-        lab["_key_crit1"] = lab[col_crit1_lab].map(norm_caso)       # antes _key_caso
-        lab["_key_crit2"] = lab[col_crit2_lab].map(norm_radicado)   # antes _key_radicado
-
-        exh["_key_crit1"] = exh[col_crit1_exh].map(norm_caso)
-        exh["_key_crit2"] = exh[col_crit2_exh].map(norm_radicado)
-
-        # Coincidencias (inner join)
-        coincidencias = lab.merge(
-            exh,
-            on=["_key_crit1", "_key_crit2"],
-            how="inner",
-            suffixes=("_lab", "_exh")
+        st.session_state["cruce_exacto"] = True
+        st.session_state["conciliacion"] = False
+
+    cruce_activo = st.session_state.get("cruce_exacto", False)
+    if cruce_activo:
+        # Claves normalizadas (_key_crit1 / _key_crit2) por archivo y par de columnas
+        indice_lab, clave_indice_lab = tuberia.ejecutar(
+            "claves_lab", [clave_lab], (col_crit1_lab, col_crit2_lab),
+            lambda: IndiceClaves(df_lab[col_crit1_lab], df_lab[col_crit2_lab])
         )
-
-        # No coincidentes de Archivo laboratorio (left-anti)
-        anti = lab.merge(
-            exh[["_key_crit1", "_key_crit2"]],
-            on=["_key_crit1", "_key_crit2"],
-            how="left",
-            indicator=True
+        indice_exh, clave_indice_exh = tuberia.ejecutar(
+            "claves_exh", [clave_exh], (col_crit1_exh, col_crit2_exh),
+            lambda: IndiceClaves(df_exh[col_crit1_exh], df_exh[col_crit2_exh])
+        )
+        (cruce, coincidencias, no_coincidentes_lab, opciones), clave_cruce = tuberia.ejecutar(
+            "cruce", [clave_indice_lab, clave_indice_exh], (),
+            lambda: cruce_exacto(indice_lab, indice_exh, df_lab, df_exh, col_crit1_lab, col_crit2_lab)
         )
-        no_coincidentes_lab = lab.loc[anti["_merge"] == "left_only"].drop(columns=["_key_crit1", "_key_crit2"], errors="ignore")
 
         st.success(f"Coincidencias exactas: {len(coincidencias)} | No coincidentes (Archivo laboratorio): {len(no_coincidentes_lab)}")
 
         tab1, tab2 = st.tabs(["Coincidencias", "No coincidentes (Archivo laboratorio)"])
         with tab1:
-            st.dataframe(coincidencias)
+            tabla_paginada(coincidencias, "coincidencias")
         with tab2:
-            st.dataframe(no_coincidentes_lab)
-
-        # ----- Conciliación manual de no coincidentes (Archivo laboratorio) -----
-        st.markdown("### Conciliación: agregar manualmente no coincidentes de **Archivo laboratorio** al resultado")
-
-        def etiqueta_fila(row):
-            c = str(row.get(col_crit1_lab, ""))
-            r = str(row.get(col_crit2_lab, ""))
-            return f"[Criterio 2: {r}] Criterio 1: {c}"
+            tabla_paginada(no_coincidentes_lab, "no_coincidentes_lab")
 
-        opciones = [etiqueta_fila(row) for _, row in no_coincidentes_lab.iterrows()]
-        seleccion = st.multiselect("Selecciona filas para agregarlas al resultado", opciones)
+    st.markdown("---")
 
-        if st.button("Aplicar conciliación y preparar resultado final"):
-            # Tomamos las filas seleccionadas de Archivo laboratorio
-            sel_idx = [opciones.index(s) for s in seleccion] if seleccion else []
-            agregar_lab = no_coincidentes_lab.iloc[sel_idx].copy() if sel_idx else no_coincidentes_lab.iloc[0:0].copy()
-
-            # Renombramos columnas con sufijo _lab para concatenar con 'coincidencias'
-            ren = {c: f"{c}_lab" for c in agregar_lab.columns}
-            agregar_lab_suf = agregar_lab.rename(columns=ren)
-
-            # Asegurar columnas clave con prefijo
-            agregar_lab_suf["_key_crit1"] = agregar_lab[col_crit1_lab].map(norm_caso)
-            agregar_lab_suf["_key_crit2"] = agregar_lab[col_crit2_lab].map(norm_radicado)
-
-            # Reindexar columnas para encajar con 'coincidencias'
-            cols_final = list(coincidencias.columns)
-            for c in agregar_lab_suf.columns:
-                if c not in cols_final:
-                    cols_final.append(c)
-
-            # --- Coincidencias aproximadas (difusas) ---
-            if 'aproximados' in locals() and len(aproximados) > 0:
-                df_aproximados = pd.DataFrame(aproximados).reindex(columns=cols_final)
-            else:
-                df_aproximados = pd.DataFrame(columns=cols_final)
-
-            # Unión de todos los resultados
-            coincidencias_final = pd.concat(
-                [coincidencias.reindex(columns=cols_final), agregar_lab_suf.reindex(columns=cols_final), df_aproximados],
-                ignore_index=True
+    # ─────────────────────────────────────────────────────────────
+    # Modo incremental: identidad de las filas entre exportaciones
+    # ─────────────────────────────────────────────────────────────
+    incremental = st.checkbox(
+        "Conciliación incremental: conservar las decisiones de la última conciliación "
+        "y emparejar solo las filas nuevas o modificadas"
+    )
+    ruta_incremental = None
+    if incremental:
+        colE, colF = st.columns(2)
+        with colE:
+            col_id_caso_lab = st.selectbox(
+                "Caso (identidad) en **Archivo laboratorio**",
+                options=df_lab.columns.tolist(),
+                index=(df_lab.columns.tolist().index("CASO LIMS") if "CASO LIMS" in df_lab.columns else 0)
             )
-
-            st.success(f"Resultado final listo: {len(coincidencias_final)} filas (exactas, manuales y aproximadas)")
-            st.dataframe(coincidencias_final)
-
-            # Descargas
-            # CSV
-            csv_final = coincidencias_final.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                "Descargar resultado final (CSV)",
-                data=csv_final,
-                file_name="coincidencias_final.csv",
-                mime="text/csv"
+            col_id_rad_lab = st.selectbox(
+                "Radicado (identidad) en **Archivo laboratorio**",
+                options=df_lab.columns.tolist(),
+                index=(df_lab.columns.tolist().index("RADICADO") if "RADICADO" in df_lab.columns else 0)
             )
-
-            # XLSX (incluye hojas útiles)
-            buf = BytesIO()
-            with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
-                coincidencias.to_excel(writer, index=False, sheet_name="coincidencias_exactas")
-                agregar_lab_suf.to_excel(writer, index=False, sheet_name="agregados_lab")
-                df_aproximados.to_excel(writer, index=False, sheet_name="coincidencias_aproximadas")
-                coincidencias_final.to_excel(writer, index=False, sheet_name="resultado_final")
-                for sheet in ["coincidencias_exactas", "agregados_lab", "coincidencias_aproximadas", "resultado_final"]:
-                    ws = writer.sheets[sheet]
-                    ws.set_zoom(90)
-            buf.seek(0)
-            st.download_button(
-                "Descargar resultado final (XLSX)",
-                data=buf.getvalue(),
-                file_name="coincidencias_final.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        with colF:
+            caso_exh = "CASO LIMS" if "CASO LIMS" in df_exh.columns else "CASO LABORATORIO"
+            col_id_caso_exh = st.selectbox(
+                "Caso (identidad) en **Exhumaciones**",
+                options=df_exh.columns.tolist(),
+                index=(df_exh.columns.tolist().index(caso_exh) if caso_exh in df_exh.columns else 0)
             )
-
-    st.markdown("---")
+            col_id_rad_exh = st.selectbox(
+                "Radicado (identidad) en **Exhumaciones**",
+                options=df_exh.columns.tolist(),
+                index=(df_exh.columns.tolist().index("RADICADO") if "RADICADO" in df_exh.columns else 0)
+            )
+        identidad = (col_id_caso_lab, col_id_rad_lab, col_id_caso_exh, col_id_rad_exh)
+        (lab_id, lab_clave), clave_id_lab = tuberia.ejecutar(
+            "identidades_lab", [clave_lab], identidad[:2], lambda: identificar(df_lab, col_id_caso_lab, col_id_rad_lab)
+        )
+        (exh_id, exh_clave), clave_id_exh = tuberia.ejecutar(
+            "identidades_exh", [clave_exh], identidad[2:], lambda: identificar(df_exh, col_id_caso_exh, col_id_rad_exh)
+        )
+        ids = (lab_id, lab_clave, exh_id, exh_clave)
+        ruta_incremental = ruta_estado(identidad)
 
     # ─────────────────────────────────────────────────────────────
     # Coincidencia aproximada (difusa)
@@ -222,41 +269,137 @@ if df_lab is not None and df_exh is not None:
         default=['NOMBRE OCCISO'] if 'NOMBRE OCCISO' in df_exh.columns else []
     )
 
+    aproximados = None
+    pares_difusos = []
+    clave_difuso = ""
     if columnas_lab and columnas_exh:
         sensibilidad = st.slider(
             "Grado de sensibilidad (0.0–1.0):",
             min_value=0.0, max_value=1.0, value=0.8, step=0.01
         )
-        total_comparaciones = len(df_lab) * len(df_exh)
-        tiempo_estimado = total_comparaciones / 10000
-        st.info(f"Se realizarán aprox. {total_comparaciones:,} comparaciones. Tiempo estimado: {tiempo_estimado:.1f} s.")
+        modo_bloqueo = st.selectbox(
+            "Bloqueo de candidatos (solo se comparan filas del mismo bloque):",
+            options=list(MODOS_BLOQUEO.keys()),
+            format_func=lambda m: MODOS_BLOQUEO[m],
+            # exhaustivo mientras el volumen lo permita; luego bloqueo por inicial
+            index=(list(MODOS_BLOQUEO).index("ninguno") if len(df_lab) * len(df_exh) <= 25_000_000 else 0)
+        )
 
-        aproximados = []
-        usados_exh = set()
-        progress_bar = st.progress(0, text="Comparando registros...")
+        col_bloque_lab = col_bloque_exh = None
+        if modo_bloqueo == "columna":
+            colC, colD = st.columns(2)
+            with colC:
+                col_bloque_lab = st.selectbox(
+                    "Columna de bloqueo en **Archivo laboratorio**",
+                    options=df_lab.columns.tolist(),
+                    index=(df_lab.columns.tolist().index("MUNICIPIO EXHUMACION") if "MUNICIPIO EXHUMACION" in df_lab.columns else 0)
+                )
+            with colD:
+                col_bloque_exh = st.selectbox(
+                    "Columna de bloqueo en **Exhumaciones**",
+                    options=df_exh.columns.tolist(),
+                    index=(df_exh.columns.tolist().index("MUNICIPIO EXHUMACION") if "MUNICIPIO EXHUMACION" in df_exh.columns else 0)
+                )
+
+        (valores_lab, pool_exh, bloques_lab, n_comparaciones), clave_candidatos = tuberia.ejecutar(
+            "candidatos", [clave_lab, clave_exh],
+            (tuple(columnas_lab), tuple(columnas_exh), modo_bloqueo, col_bloque_lab, col_bloque_exh),
+            lambda: candidatos_difusos(df_lab, df_exh, columnas_lab, columnas_exh, modo_bloqueo, col_bloque_lab, col_bloque_exh)
+        )
+        st.info(f"Se realizarán aprox. {n_comparaciones:,} comparaciones (de {len(df_lab) * len(df_exh):,} sin bloqueo).")
 
-        for idx_lab, row_lab in df_lab.iterrows():
-            valor_lab = " ".join([str(row_lab[col]) for col in columnas_lab])
+        if incremental:
+            # Un estado por configuración: otras columnas o parámetros empiezan de cero
+            ruta_incremental = ruta_estado(
+                identidad + (tuple(columnas_lab), tuple(columnas_exh), modo_bloqueo, col_bloque_lab, col_bloque_exh, sensibilidad)
+            )
+        (aproximados, pares_difusos, resumen), clave_difuso = tuberia.ejecutar(
+            "difuso", [clave_candidatos] + ([clave_id_lab, clave_id_exh] if incremental else []), (sensibilidad, ruta_incremental),
+            lambda: coincidencias_difusas(
+                df_lab, valores_lab, pool_exh, bloques_lab, sensibilidad,
+                estado=Estado.cargar(ruta_incremental) if incremental else None, ids=ids if incremental else None
+            )
+        )
+        if resumen is not None:
+            st.info(
+                f"Incremental — laboratorio: {resumen['lab_nuevas']} nuevas, {resumen['lab_modificadas']} modificadas; "
+                f"exhumaciones: {resumen['exh_nuevas']} nuevas, {resumen['exh_modificadas']} modificadas. "
+                f"Pares conservados: {resumen['pares_conservados']}, filas reemparejadas: {resumen['lab_reemparejadas']}."
+            )
 
-            valores_exh_disponibles = df_exh.loc[~df_exh.index.isin(usados_exh), columnas_exh].astype(str).agg(" ".join, axis=1)
-            valores_exh_disponibles = valores_exh_disponibles.tolist()
+        st.success(f"Coincidencias aproximadas: {len(aproximados)}")
+        if len(aproximados):
+            tabla_paginada(aproximados, "aproximados")
 
-            mejores = difflib.get_close_matches(
-                valor_lab,
-                valores_exh_disponibles,
-                n=1,
-                cutoff=sensibilidad
+    # ─────────────────────────────────────────────────────────────
+    # Conciliación y resultado final (exactas, manuales y aproximadas)
+    # ─────────────────────────────────────────────────────────────
+    if cruce_activo:
+        st.markdown("---")
+        # ----- Conciliación manual de no coincidentes (Archivo laboratorio) -----
+        st.markdown("### Conciliación: agregar manualmente no coincidentes de **Archivo laboratorio** al resultado")
+
+        # En modo incremental se conservan las filas agregadas a mano la última vez
+        previas = []
+        if incremental:
+            estado_previo = Estado.cargar(ruta_incremental)
+            if estado_previo is not None:
+                marcadas = np.isin(lab_clave[cruce.sin_pareja], estado_previo.manual)
+                previas = list(dict.fromkeys(opciones[i] for i in np.flatnonzero(marcadas)))
+        seleccion = st.multiselect("Selecciona filas para agregarlas al resultado", opciones, default=previas)
+
+        if st.button("Aplicar conciliación y preparar resultado final"):
+            st.session_state["conciliacion"] = True
+
+        if st.session_state.get("conciliacion"):
+            primera = {}
+            for i, etiqueta in enumerate(opciones):
+                primera.setdefault(etiqueta, i)
+            sel_idx = [primera[s] for s in seleccion]
+
+            (agregar_lab_suf, df_aproximados, coincidencias_final), clave_conciliacion = tuberia.ejecutar(
+                "conciliacion", [clave_cruce, clave_difuso], tuple(sel_idx),
+                lambda: conciliar(coincidencias, no_coincidentes_lab, indice_lab, cruce, sel_idx, aproximados)
+            )
+            if incremental:
+                # Una escritura por conciliación aceptada, no por rerun
+                tuberia.ejecutar(
+                    "estado_incremental", [clave_conciliacion, clave_id_lab, clave_id_exh], (ruta_incremental,),
+                    lambda: guardar_estado(ruta_incremental, ids, pares_difusos, cruce.sin_pareja[sel_idx])
+                )
+                st.caption("Decisiones guardadas para la próxima conciliación incremental.")
+
+            st.success(f"Resultado final listo: {len(coincidencias_final)} filas (exactas, manuales y aproximadas)")
+            tabla_paginada(coincidencias_final, "coincidencias_final")
+
+            # Descargas: bytes guardados por versión del resultado (clave de la conciliación)
+            csv_final, _ = tuberia.ejecutar("csv", [clave_conciliacion], (), lambda: a_csv(coincidencias_final))
+            st.download_button(
+                "Descargar resultado final (CSV)",
+                data=csv_final,
+                file_name="coincidencias_final.csv",
+                mime=MIME_CSV
             )
-            if mejores:
-                valor_exh = mejores[0]
-                mask_disponibles = ~df_exh.index.isin(usados_exh)
-                indices_disponibles = df_exh.index[mask_disponibles]
-                idx_exh = None
-                for i, v in zip(indices_disponibles, valores_exh_disponibles):
-                    if v == valor_exh:
-                        idx_exh = i
-                        break
-                if idx_exh is not None:
-                    usados_exh.add(idx_exh)
-                    similitud = difflib.SequenceMatcher(None, valor_lab, valor_exh).ratio()
-                    # aquí continuarías con tu lógica para armar 'aproximados'
+
+            # XLSX (incluye hojas útiles): se arma solo al pedirlo y una vez por resultado
+            if st.button("Preparar resultado final (XLSX)"):
+                st.session_state["xlsx_pedido"] = clave_conciliacion
+            if st.session_state.get("xlsx_pedido") == clave_conciliacion:
+                xlsx_final, _ = tuberia.ejecutar(
+                    "xlsx", [clave_conciliacion], (),
+                    lambda: a_xlsx({
+                        "coincidencias_exactas": coincidencias,
+                        "agregados_lab": agregar_lab_suf,
+                        "coincidencias_aproximadas": df_aproximados,
+                        "resultado_final": coincidencias_final,
+                    })
+                )
+                st.download_button(
+                    "Descargar resultado final (XLSX)",
+                    data=xlsx_final,
+                    file_name="coincidencias_final.xlsx",
+                    mime=MIME_XLSX
+                )
+
+    if tuberia.recalculadas:
+        st.caption("Etapas recalculadas en esta ejecución: " + ", ".join(tuberia.recalculadas))
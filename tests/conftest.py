@@ -0,0 +1,10 @@
+# -------------------------------------------------------------
+# Pruebas de los módulos de geih (sin Streamlit)
+# Se ejecutan desde la raíz del repositorio: python -m pytest -q
+# -------------------------------------------------------------
+
+import os
+import sys
+
+# geih se importa desde la raíz, como en los tableros
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
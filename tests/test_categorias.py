@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from geih.categorias import SIN_DATO, categoria, categorizar, conteos
+
+
+def test_vocabulario_canonico():
+    serie = pd.Series([" urbano", "URBANO  ", "Rural zona", "", None, "rural zona", "Bogotá"])
+    limpia = categoria(serie)
+    assert isinstance(limpia.dtype, pd.CategoricalDtype)
+    assert limpia.tolist() == ["URBANO", "URBANO", "RURAL ZONA", SIN_DATO, SIN_DATO, "RURAL ZONA", "BOGOTÁ"]
+    assert categoria(limpia) is limpia
+
+
+def test_enteros_flotantes_sin_decimal():
+    assert categoria(pd.Series([600.0, np.nan, 1448.0])).tolist() == ["600", SIN_DATO, "1448"]
+
+
+def test_categorizar_y_conteos_sin_ausentes():
+    df = categorizar(pd.DataFrame({"ZONA": ["a", "b", "a"], "OTRA": ["x", "y", "z"]}))
+    assert isinstance(df["ZONA"].dtype, pd.CategoricalDtype)
+    assert not isinstance(df["OTRA"].dtype, pd.CategoricalDtype)
+    assert conteos(df["ZONA"][df["ZONA"] == "A"]).to_dict() == {"A": 2}
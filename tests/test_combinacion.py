@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from geih.combinacion import COLUMNA_ARCHIVO, alinear_encabezados, combinar
+
+FECHAS = b"CASO LIMS;FECHA EXHUMACION\nX1;19/06/2014\nX2;04/01/1996\n"
+FECHAS_ISO = b"CASO LIMS,FECHA EXHUMACION\nX3,2015-03-10\n"
+VACIA = b"CASO LIMS;FECHA EXHUMACION\nX4;\nX5;  \n"
+TEXTO = b"CASO LIMS;FECHA EXHUMACION\nX6;pendiente\n"
+
+
+@pytest.mark.parametrize("orden", [("a", "b"), ("b", "a")])
+def test_columna_vacia_no_anula_las_fechas(orden):
+    archivos = {"a": ("a.csv", FECHAS), "b": ("b.csv", VACIA)}
+    combinado = combinar([archivos[k] for k in orden])
+    fechas = combinado.set_index("CASO LIMS")["FECHA EXHUMACION"]
+    assert fechas.dtype == "datetime64[ns]"
+    assert fechas["X1"] == pd.Timestamp("2014-06-19")
+    assert fechas["X2"] == pd.Timestamp("1996-01-04")  # día antes que mes
+    assert fechas[["X4", "X5"]].isna().all()
+
+
+def test_formatos_distintos_por_archivo():
+    combinado = combinar([("a.csv", FECHAS), ("c.csv", FECHAS_ISO)])
+    fechas = combinado.set_index("CASO LIMS")["FECHA EXHUMACION"]
+    assert fechas["X3"] == pd.Timestamp("2015-03-10")
+    assert fechas["X1"] == pd.Timestamp("2014-06-19")
+
+
+@pytest.mark.parametrize("orden", [("a", "t"), ("t", "a")])
+def test_texto_conserva_los_valores_de_cada_archivo(orden):
+    archivos = {"a": ("a.csv", FECHAS), "t": ("t.csv", TEXTO)}
+    combinado = combinar([archivos[k] for k in orden])
+    valores = combinado.set_index("CASO LIMS")["FECHA EXHUMACION"]
+    assert valores["X1"] == "19/06/2014"
+    assert valores["X6"] == "pendiente"
+
+
+def test_columnas_alineadas_y_origen():
+    otro = "CASO;MUNICIPIO DE EXHUMACIÓN\nX7;Medellín\n".encode("latin-1")
+    combinado = combinar([("a.csv", FECHAS), ("o.csv", otro)])
+    assert list(combinado.columns) == ["CASO LIMS", "FECHA EXHUMACION", "MUNICIPIO EXHUMACION", COLUMNA_ARCHIVO]
+    assert combinado[COLUMNA_ARCHIVO].tolist() == ["a.csv", "a.csv", "o.csv"]
+    assert combinado["CASO LIMS"].tolist() == ["X1", "X2", "X7"]
+
+
+def test_alinear_encabezados_sin_repetidos():
+    assert alinear_encabezados(["CASO LIMS", "Caso", "Año"]) == ["CASO LIMS", "CASO", "AÑO"]
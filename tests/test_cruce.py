@@ -0,0 +1,68 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from geih.cruce import CLAVE_1, CLAVE_2, IndiceClaves, cruzar, unir
+
+
+# Normalizaciones del cruce original (fila a fila)
+def norm_caso(s):
+    s = "" if s is None else str(s)
+    s = " ".join(s.replace("\n", " ").replace("\r", " ").split()).strip().lower()
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+
+
+def norm_radicado(s):
+    return ("" if s is None else str(s)).strip()
+
+
+def merge_original(lab, exh, c1_lab, c2_lab, c1_exh, c2_exh):
+    lab, exh = lab.copy(), exh.copy()
+    lab[CLAVE_1] = lab[c1_lab].map(norm_caso)
+    lab[CLAVE_2] = lab[c2_lab].map(norm_radicado)
+    exh[CLAVE_1] = exh[c1_exh].map(norm_caso)
+    exh[CLAVE_2] = exh[c2_exh].map(norm_radicado)
+    coincidencias = lab.merge(exh, on=[CLAVE_1, CLAVE_2], how="inner", suffixes=("_lab", "_exh"))
+    # Claves sin repetir: con duplicados el merge original desalineaba la máscara del anti-join
+    anti = lab.merge(exh[[CLAVE_1, CLAVE_2]].drop_duplicates(), on=[CLAVE_1, CLAVE_2], how="left", indicator=True)
+    no_coincidentes = lab.loc[(anti["_merge"] == "left_only").to_numpy()].drop(columns=[CLAVE_1, CLAVE_2])
+    return coincidencias, no_coincidentes
+
+
+LAB = pd.DataFrame({
+    "CASO": ["Médellín  1", "caso\n2", "CASO 3", None, "caso 5", "caso 2"],
+    "RADICADO": [" 10", "20", "30", None, "", "20"],
+    "NOMBRE": ["a", "b", "c", "d", "e", "f"],
+})
+EXH = pd.DataFrame({
+    "CASO LIMS": ["medellin 1", "CASO 2", "caso 2", np.nan, "caso 5", "caso 9"],
+    "RADICADO": ["10 ", "20", "20", np.nan, " ", "90"],
+    "NOMBRE": ["x", "y", "z", "w", "v", "u"],
+})
+
+
+def test_cruce_igual_a_merge():
+    indice_lab = IndiceClaves(LAB["CASO"], LAB["RADICADO"])
+    cruce = cruzar(indice_lab, IndiceClaves(EXH["CASO LIMS"], EXH["RADICADO"]))
+    esperado, sin_pareja = merge_original(LAB, EXH, "CASO", "RADICADO", "CASO LIMS", "RADICADO")
+
+    obtenido = unir(LAB, EXH, cruce, indice_lab)
+    pdt.assert_frame_equal(obtenido, esperado, check_dtype=False)
+    pdt.assert_frame_equal(LAB.iloc[cruce.sin_pareja], sin_pareja)
+
+
+def test_nulos_cruzan_con_nulos_no_con_blancos():
+    izq = IndiceClaves(pd.Series([None, ""]), pd.Series([None, ""]))
+    der = IndiceClaves(pd.Series([np.nan]), pd.Series([np.nan]))
+    cruce = cruzar(izq, der)
+    assert cruce.izquierda.tolist() == [0]
+    assert cruce.sin_pareja.tolist() == [1]
+
+
+def test_muchos_a_muchos_en_orden_de_merge():
+    izq = IndiceClaves(pd.Series(["a", "b", "a"]), pd.Series(["1", "1", "1"]))
+    der = IndiceClaves(pd.Series(["a", "a", "b"]), pd.Series(["1", "1", "1"]))
+    cruce = cruzar(izq, der)
+    assert list(zip(cruce.izquierda.tolist(), cruce.derecha.tolist())) == [(0, 0), (0, 1), (1, 2), (2, 0), (2, 1)]
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from geih.cubo import Cubo
+from geih.filtros import TODOS, MotorFiltros
+
+DF = pd.DataFrame({
+    "AÑO": [2019, np.nan, np.nan, 2020, 2019, 2020],
+    "DEPARTAMENTO": ["A", "B", "B", "A", "B", None],
+    "CUERPOS": [1, 2, 0, 3, 1, 4],
+})
+
+
+def test_conteo_igual_a_value_counts():
+    cubo = Cubo(DF, ("AÑO", "DEPARTAMENTO"), ("CUERPOS",))
+    vista = DF[DF["AÑO"] == 2019]
+    esperado = vista["DEPARTAMENTO"].value_counts()
+    obtenido = cubo.conteo("DEPARTAMENTO", {"AÑO": 2019, "DEPARTAMENTO": TODOS})
+    pdt.assert_series_equal(obtenido.sort_index(), esperado.sort_index(), check_index_type=False)
+    assert cubo.total({"AÑO": 2020}, medida="CUERPOS") == 7
+
+
+def test_valor_ausente_da_vacio_como_motor_filtros():
+    cubo = Cubo(DF, ("AÑO", "DEPARTAMENTO"))
+    filtros = {"AÑO": 1999}
+    assert cubo.conteo("DEPARTAMENTO", filtros).empty
+    assert cubo.total(filtros) == 0
+    assert cubo.moda("DEPARTAMENTO", filtros) == (None, 0)
+    assert not MotorFiltros(DF).mascara(filtros).any()
+
+
+def test_resultados_acotados():
+    cubo = Cubo(DF, ("AÑO", "DEPARTAMENTO"), max_resultados=2)
+    for anio in (2019, 2020, 1999, 2019):
+        cubo.conteo("DEPARTAMENTO", {"AÑO": anio})
+    assert len(cubo._resultados) == 2
@@ -0,0 +1,78 @@
+import difflib
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from geih.emparejamiento import PoolCandidatos, claves_bloqueo, emparejar_difuso
+
+
+def bucle_difflib(lab, exh, sensibilidad):
+    """El cruce difuso original: get_close_matches fila a fila con 'usados_exh'."""
+    usados, pares = set(), []
+    for i, valor in enumerate(lab):
+        disponibles = [(k, x) for k, x in enumerate(exh) if k not in usados]
+        mejores = difflib.get_close_matches(valor, [x for _, x in disponibles], n=1, cutoff=sensibilidad)
+        if mejores:
+            k = next(k for k, x in disponibles if x == mejores[0])
+            usados.add(k)
+            pares.append((i, k, difflib.SequenceMatcher(None, valor, mejores[0]).ratio()))
+    return pares
+
+
+def texto_azar(rng, alfabeto="ABCDE ", largo=(3, 12)):
+    return "".join(rng.choice(alfabeto) for _ in range(rng.randint(*largo)))
+
+
+def pool_de(valores):
+    return PoolCandidatos(pd.DataFrame({"c": valores}), ["c"])
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_equivale_a_get_close_matches(semilla):
+    rng = random.Random(semilla)
+    lab = [texto_azar(rng) for _ in range(40)]
+    exh = [texto_azar(rng) for _ in range(60)]
+    sensibilidad = rng.choice([0.4, 0.6, 0.75, 0.9])
+    assert emparejar_difuso(lab, pool_de(exh), sensibilidad) == bucle_difflib(lab, exh, sensibilidad)
+
+
+def test_empates_como_difflib():
+    # Igual ratio: gana el texto mayor; textos iguales: la primera fila
+    lab = ["ABC", "ABC", "ABC"]
+    exh = ["ABX", "ABY", "ABY", "ABX"]
+    assert emparejar_difuso(lab, pool_de(exh), 0.5) == bucle_difflib(lab, exh, 0.5)
+    assert [j for _, j, _ in emparejar_difuso(lab, pool_de(exh), 0.5)] == [1, 2, 0]
+
+
+def test_textos_largos_con_autojunk():
+    # Desde 200 caracteres difflib descarta los caracteres frecuentes (autojunk)
+    rng = random.Random(7)
+    lab = [texto_azar(rng, "AB C", (200, 260)) for _ in range(8)]
+    exh = [texto_azar(rng, "AB C", (200, 260)) for _ in range(12)]
+    assert emparejar_difuso(lab, pool_de(exh), 0.6) == bucle_difflib(lab, exh, 0.6)
+
+
+def test_reiniciar_vuelve_a_habilitar_el_pool():
+    lab = ["JUAN PEREZ", "ANA GOMEZ"]
+    pool = pool_de(["ANA GOMEZ", "JUAN PEREZ", "JUAN PERES"])
+    primero = emparejar_difuso(lab, pool, 0.8)
+    assert not pool.disponibles[[j for _, j, _ in primero]].any()
+    pool.reiniciar()
+    assert pool.disponibles.all()
+    assert emparejar_difuso(lab, pool, 0.8) == primero
+
+
+def test_bloqueo_solo_compara_el_mismo_bloque():
+    lab = ["ANA GOMEZ", "BETO RUIZ"]
+    exh = ["BNA GOMEZ", "ANA GOMES"]
+    pool = pool_de(exh)
+    pool.bloquear(claves_bloqueo(exh, "inicial"))
+    pares = emparejar_difuso(lab, pool, 0.5, bloques_lab=claves_bloqueo(lab, "inicial"))
+    assert [(i, j) for i, j, _ in pares] == [(0, 1)]
+
+
+def test_sin_filas():
+    assert emparejar_difuso([], pool_de(["A"]), 0.5) == []
+    assert emparejar_difuso(["A"], pool_de([]), 0.5) == []
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from geih.esquema import ESQUEMA, Campo, Esquema
+
+
+def test_sinonimos_y_preferencia():
+    resolucion = ESQUEMA.resolver(["Caso", "CASO LIMS", "Municipio de Exhumación", "año"])
+    assert resolucion.nombres == ("CASO", "CASO LIMS", "MUNICIPIO EXHUMACION", "AÑO")
+    assert resolucion.columna("CASO LIMS") == "CASO LIMS"
+
+
+def test_coincidencia_parcial_solo_si_se_pide():
+    resolucion = ESQUEMA.resolver(["MUNICIPIO EXHUMACION", "OBSERVACIONES"])
+    assert resolucion.columna("MUNICIPIO DE LA DILIGENCIA") is None
+    assert resolucion.columna("MUNICIPIO DE LA DILIGENCIA", parcial=True) == "MUNICIPIO EXHUMACION"
+
+
+def test_nombres_estables_al_volver_a_resolver():
+    nombres = ESQUEMA.nombres(["CASO LIMS", "Caso Lims", "Informe ADN", "informe adn"])
+    assert len(set(nombres)) == len(nombres)
+    assert ESQUEMA.nombres(nombres) == nombres
+
+
+def test_resolucion_en_cache_por_huella():
+    esquema = Esquema([Campo("ZONA")], max_resoluciones=1)
+    primera = esquema.resolver(["zona"])
+    assert esquema.resolver(["zona"]) is primera
+    esquema.resolver(["otra"])
+    assert esquema.resolver(["zona"]) is not primera
+
+
+def test_proyectar_tipos_y_relleno():
+    df = pd.DataFrame({"Año": ["2019", "x", None], "Zona": ["Urbano", "rural ", None], "EXTRA": [1, 2, 3]})
+    vista = ESQUEMA.proyectar(df, ["AÑO", "ZONA", "CUERPOS"], relleno={"CUERPOS": 0})
+    assert list(vista.columns) == ["AÑO", "ZONA", "EXTRA", "CUERPOS"]
+    assert str(vista["AÑO"].dtype) == "Int64"
+    assert vista["AÑO"].tolist()[0] == 2019 and vista["AÑO"].isna().tolist()[1:] == [True, True]
+    assert isinstance(vista["ZONA"].dtype, pd.CategoricalDtype)
+    assert vista["CUERPOS"].tolist() == [0, 0, 0]
+    assert ESQUEMA.proyectar(df, ["ZONA"], resto=False).columns.tolist() == ["ZONA"]
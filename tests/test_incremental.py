@@ -0,0 +1,41 @@
+import pandas as pd
+
+from geih.emparejamiento import PoolCandidatos, claves_bloqueo, emparejar_difuso
+from geih.incremental import Estado, emparejar_incremental, identificar
+
+LAB = pd.DataFrame({"CASO": ["C1", "C2", "C3"], "RADICADO": ["1", "2", "3"], "NOMBRE": ["JUAN PEREZ", "ANA GOMEZ", "LUIS DIAZ"]})
+EXH = pd.DataFrame({"CASO": ["E1", "E2", "E3"], "RADICADO": ["7", "8", "9"], "NOMBRE": ["ANA GOMES", "JUAN PERES", "PEDRO ROJAS"]})
+
+
+def conciliar(lab, exh, estado=None, pool=None):
+    if pool is None:
+        pool = PoolCandidatos(exh, ["NOMBRE"])
+        pool.bloquear(claves_bloqueo(pool.valores, "inicial"))
+    valores = lab["NOMBRE"].to_numpy(dtype=object)
+    bloques = claves_bloqueo(valores, "inicial")
+    lab_id, lab_clave = identificar(lab, "CASO", "RADICADO")
+    exh_id, exh_clave = identificar(exh, "CASO", "RADICADO")
+    if estado is None:
+        pares = emparejar_difuso(valores, pool, 0.8, bloques_lab=bloques)
+        return pares, Estado.desde(lab_id, lab_clave, exh_id, exh_clave, pares), pool
+    pares, resumen = emparejar_incremental(valores, pool, 0.8, bloques, estado, lab_id, lab_clave, exh_id, exh_clave)
+    return pares, resumen, pool
+
+
+def test_sin_cambios_conserva_los_pares_con_el_pool_compartido():
+    pares, estado, pool = conciliar(LAB, EXH)
+    assert [(i, j) for i, j, _ in pares] == [(0, 1), (1, 0)]
+    # El mismo pool (ya con filas retiradas) se reutiliza, como en laboratorio.py
+    de_nuevo, resumen, _ = conciliar(LAB, EXH, estado, pool)
+    assert de_nuevo == pares
+    assert resumen["pares_conservados"] == 2
+    assert resumen["lab_reemparejadas"] == 0
+
+
+def test_fila_modificada_se_vuelve_a_emparejar():
+    pares, estado, _ = conciliar(LAB, EXH)
+    exh = EXH.copy()
+    exh.loc[2, "NOMBRE"] = "LUIS DIAS"
+    nuevos, resumen, _ = conciliar(LAB, exh, estado)
+    assert [(i, j) for i, j, _ in nuevos] == [(0, 1), (1, 0), (2, 2)]
+    assert resumen["exh_modificadas"] == 1
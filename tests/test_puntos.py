@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from geih.puntos import agrupar_en_celdas
+
+rng = np.random.default_rng(0)
+N = 20000
+PUNTOS = pd.DataFrame({
+    "Lat": rng.uniform(1, 11, N),
+    "Long": rng.uniform(-78, -70, N),
+    "CATEGORIA": rng.choice(["A", "B", "C"], N),
+    "NOMBRE": np.arange(N).astype(str),
+})
+
+
+def test_tope_de_marcadores_en_zoom_alto():
+    marcadores = agrupar_en_celdas(PUNTOS, 16, categoria="CATEGORIA", nombre="NOMBRE", max_marcadores=500)
+    assert len(marcadores) <= 500
+    assert marcadores["N"].sum() == N
+    assert set(marcadores["CATEGORIA"]) == {"A", "B", "C"}
+
+
+def test_sin_tope_un_marcador_por_punto_aislado():
+    pocos = PUNTOS.head(50)
+    marcadores = agrupar_en_celdas(pocos, 16, nombre="NOMBRE", max_marcadores=None)
+    assert len(marcadores) == 50
+    assert set(marcadores["NOMBRE"]) == set(pocos["NOMBRE"])
+
+
+def test_nombre_de_celda_agrupada_y_sin_coordenadas():
+    df = pd.DataFrame({"Lat": [6.25, 6.25, np.nan], "Long": [-75.56, -75.56, -75.0], "NOMBRE": ["x", "y", "z"]})
+    marcadores = agrupar_en_celdas(df, 12, nombre="NOMBRE")
+    assert marcadores[["N", "NOMBRE"]].values.tolist() == [[2, "2 puntos"]]